@@ -0,0 +1,228 @@
+from autosurfer.logger import logger
+from autosurfer.agent.brain.task_planner import async_next_action, async_stream_next_action
+from autosurfer.agent.browser.adapters import (
+    AsyncBaseBrowserAdapter,
+    AsyncPlaywrightAdapter,
+    BrowserSettings,
+    create_async_browser_adapter,
+)
+from autosurfer.agent.browser.action_errors import ActionExecutionError
+from autosurfer.agent.browser.action_executor import element_ids
+from autosurfer.agent.browser.async_action_executor import AsyncBrowserActionExecutor
+from autosurfer.agent.browser.captcha_handler import AsyncCaptchaHandler
+from autosurfer.agent.browser_agent import BaseAutoSurferAgent
+from autosurfer.llm.plan_stream import AsyncPlanStream
+import asyncio
+import time
+from typing import Any, List, Optional
+
+
+class AsyncAutoSurferAgent(BaseAutoSurferAgent):
+    """Asyncio agent: every browser and LLM wait yields to the event loop, so
+    many agents can share one process (see ``run_objectives``)."""
+
+    def __init__(self, objective: str, browser_session: AsyncBaseBrowserAdapter, max_retries: int = 3, enable_memory: bool = False, cache_plans: bool = True, stream_plans: bool = True):
+        super().__init__(objective, browser_session,
+                         max_retries, enable_memory, cache_plans, stream_plans)
+
+    async def run(self):
+        logger.info(f"🎯 Objective: {self.objective}")
+        page = self.browser_session.page
+        executor = AsyncBrowserActionExecutor(
+            page=page,
+            browser_session=self.browser_session.browser
+        )
+        captcha_handler = AsyncCaptchaHandler(page)
+
+        # Blocking rules can depend on what the objective is about
+        interceptor = getattr(self.browser_session, "interceptor", None)
+        if interceptor:
+            interceptor.set_objective(self.objective)
+
+        try:
+            retry_count = 0
+            consecutive_failures = 0
+            # more_elements action of the previous step: served from its snapshot
+            element_view = None
+
+            # The post-action snapshot of one step is the pre-action state of the next
+            snapshot = await executor.snapshot(
+                scan_captcha=captcha_handler.needs_scan(page.url))
+
+            while True:
+                logger.info(f"📍 Current URL: {snapshot.url}")
+                logger.info(f"📄 Page Title: {snapshot.title}")
+
+                if not await captcha_handler.handle_snapshot(snapshot):
+                    logger.error("❌ Task terminated due to captcha detection")
+                    break
+
+                page_context = {
+                    "url": snapshot.url,
+                    "title": snapshot.title,
+                    "timestamp": time.time(),
+                    "retry_count": retry_count,
+                    "consecutive_failures": consecutive_failures
+                }
+
+                planner = async_stream_next_action if self.stream_plans else async_next_action
+
+                async def request_plan():
+                    return await planner(
+                        objective=self.objective,
+                        ui_elements=snapshot.elements,
+                        memory=self.memory,
+                        page_context=page_context,
+                        use_cache=self.cache_plans,
+                        prompt_builder=self.prompt_builder,
+                        element_view=element_view
+                    )
+
+                plan = await request_plan()
+
+                execution_success = False
+                error_message = None
+                # Retries resume at the failed action, not the start of the plan
+                resume_at = 0
+                for attempt in range(self.max_retries):
+                    try:
+                        if isinstance(plan, AsyncPlanStream):
+                            plan = await executor.execute_stream(plan)
+                        else:
+                            await executor.execute(plan, start_at=resume_at)
+                        execution_success = True
+                        consecutive_failures = 0
+                        logger.info(
+                            f"✅ Action executed successfully on attempt {attempt + 1}")
+                        break
+                    except ActionExecutionError as e:
+                        error_message = str(e)
+                        resume_at = e.index
+                        replan = False
+                        if e.plan is not None:
+                            plan = e.plan
+                        elif isinstance(plan, AsyncPlanStream):
+                            # The response did not parse: nothing of it ran
+                            plan = plan.current_plan()
+                            replan = True
+                        logger.warn(f"❌ Attempt {attempt + 1} failed: {e}")
+
+                        if not await captcha_handler.handle_captcha_detection():
+                            logger.error(
+                                "❌ Task terminated due to captcha detection after action failure")
+                            break
+
+                        if attempt < self.max_retries - 1:
+                            await executor.recover(e)
+                            if replan:
+                                plan = await request_plan()
+                        else:
+                            consecutive_failures += 1
+                            logger.error(
+                                f"❌ All retry attempts failed for action: {e}")
+
+                if execution_success and any(it.action.type in {"click", "fill", "click_element", "fill_element", "fill_form", "press"} for it in plan.actions):
+                    captcha_handler.invalidate_cache()
+
+                if execution_success:
+                    self.prompt_builder.record_used(
+                        page_context["url"], (element for item in plan.actions
+                                              for element in element_ids(item.action)))
+                else:
+                    self._plan_failed(plan)
+
+                if not execution_success and not await captcha_handler.handle_captcha_detection():
+                    break
+
+                element_view = self._requested_view(
+                    plan) if execution_success else None
+                previous_snapshot = snapshot
+                # A plan that only asked for more elements left the page as it was
+                if element_view is None or self._touched_page(plan):
+                    snapshot = await executor.snapshot(
+                        scan_captcha=captcha_handler.needs_scan(page.url))
+
+                if any(it.action.type == "goto" for it in plan.actions):
+                    logger.info(f"📍 URL after navigation: {snapshot.url}")
+                    logger.info(f"📄 Title after navigation: {snapshot.title}")
+
+                retry_count = attempt + 1
+
+                memory_entry = self._build_memory_entry(
+                    plan, execution_success, attempt, error_message,
+                    before=previous_snapshot, after=snapshot, wait_ms=executor.wait_ms)
+
+                self._remember(memory_entry)
+
+                if self._should_stop(plan, consecutive_failures):
+                    break
+
+        except Exception as e:
+            logger.error(f"Agent execution failed: {e}")
+            raise
+        finally:
+            if self.memory:
+                self.memory.save_to_file()
+
+            logger.debug(
+                f"Selector strategy stats: {executor.selector_stats.summary()}")
+            logger.debug(
+                f"Navigation strategies: {executor.navigator.summary()}")
+            executor.selector_cache.save()
+            self._save_plan_cache()
+            logger.info(f"Planner prompts: {self.prompt_builder.summary()}")
+            if interceptor:
+                logger.info(
+                    f"Request interception: {interceptor.stats.summary()}")
+            logger.info("Agent execution finished!")
+            await self.browser_session.close()
+
+
+async def run_objectives(
+    objectives: List[str],
+    provider: str = "playwright",
+    settings: Optional[BrowserSettings] = None,
+    enable_memory: bool = False,
+    max_concurrency: int = 8,
+    cache_plans: bool = True,
+    stream_plans: bool = True,
+) -> List[Any]:
+    """Run several objectives concurrently in this process.
+
+    With the Playwright provider a single Chromium is launched and each
+    objective gets its own isolated context; BrowserBase gets one remote
+    session per objective. Returns one entry per objective: ``None`` on
+    success or the exception it raised.
+    """
+    settings = settings or BrowserSettings()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    root: Optional[AsyncPlaywrightAdapter] = None
+
+    if provider == "playwright":
+        # Only the browser: every objective opens its own context on it
+        root = AsyncPlaywrightAdapter(settings)
+        await root.launch()
+
+    async def _run_one(objective: str):
+        async with semaphore:
+            if root:
+                session = await root.new_session()
+            else:
+                session = await create_async_browser_adapter(provider, settings)
+            agent = AsyncAutoSurferAgent(
+                objective=objective,
+                browser_session=session,
+                enable_memory=enable_memory,
+                cache_plans=cache_plans,
+                stream_plans=stream_plans,
+            )
+            await agent.run()
+
+    try:
+        return await asyncio.gather(
+            *(_run_one(objective) for objective in objectives),
+            return_exceptions=True,
+        )
+    finally:
+        if root:
+            await root.close()
@@ -0,0 +1,143 @@
+from autosurfer.config import Config
+from autosurfer.agent.brain.memory import AgentMemory
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import math
+import re
+
+# Words of objectives that say nothing about which element is meant
+STOPWORDS = frozenset("""
+a an and are as at be by can do for from go how i in into is it me my of on
+or please the then to up what with you your click press tap open page site
+website find tell show get
+""".split())
+
+_WORD = re.compile(r"[^\W_]+")
+_CAMEL = re.compile(r"(?<=[a-z])(?=[A-Z])")
+
+# Recent memory describes where the agent is, not what it is after
+MEMORY_WEIGHT = 0.5
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    # NumPy is optional: scoring falls back to plain Python without it
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+@lru_cache(maxsize=8192)
+def tokens(text: str) -> Tuple[str, ...]:
+    """Lowercased words of ``text`` (camelCase and snake_case split, plural
+    s dropped), without stopwords"""
+    words = []
+    for word in _WORD.findall(_CAMEL.sub(" ", text).lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return tuple(words)
+
+
+def element_tokens(element: Any) -> List[str]:
+    words: List[str] = []
+    for key in ("text", "label", "id", "testid"):
+        value = element.get(key)
+        if value:
+            words.extend(tokens(value))
+    return words
+
+
+def query_terms(objective: str, memory: Optional[AgentMemory] = None) -> Dict[str, float]:
+    """Query term weights: objective words, then recent memory at a lower weight"""
+    weights = {word: 1.0 for word in tokens(objective)}
+    if memory:
+        recent = [memory.current_progress] + \
+            [entry.description for entry in memory.get_recent_entries(3)]
+        for word in tokens(" ".join(recent)):
+            weights.setdefault(word, MEMORY_WEIGHT)
+    return weights
+
+
+class ElementRanker:
+    """Orders elements by relevance to the objective, combined with the
+    annotator's priority, so the element the objective needs makes the cut
+    even when it is far down the page.
+
+    Relevance is BM25 of the query terms over each element's text, label
+    (aria-label, placeholder, title or alt), id and testid. Everything is
+    local and in memory; scoring is vectorized with NumPy when it is
+    installed. Relevance and priority are each scaled to [0, 1] and mixed by
+    ``relevance_weight``; without any matching term the annotator order is
+    kept.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, relevance_weight: float = Config.RANK_RELEVANCE_WEIGHT):
+        self.relevance_weight = relevance_weight
+
+    def relevance(self, documents: Sequence[Sequence[str]], query: Dict[str, float]) -> List[float]:
+        """BM25 score of every document for the weighted query"""
+        column = {term: i for i, term in enumerate(query)}
+        weights = list(query.values())
+        # (row, column) of every occurrence of a query term
+        hits = [(row, column[word]) for row, words in enumerate(documents)
+                for word in words if word in column]
+        lengths = [len(words) for words in documents]
+        if not hits:
+            return [0.0] * len(documents)
+
+        n = len(documents)
+        avgdl = (sum(lengths) / n) or 1.0
+        np = _numpy()
+        if np is not None:
+            rows, cols = np.array(hits).T
+            tf = np.zeros((n, len(column)))
+            np.add.at(tf, (rows, cols), 1)
+            df = np.count_nonzero(tf, axis=0)
+            idf = np.log1p((n - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b *
+                              np.array(lengths, dtype=float) / avgdl)
+            scores = (tf * (self.k1 + 1) / (tf + norm[:, None])
+                      ) @ (idf * np.array(weights))
+            return scores.tolist()
+
+        tf: List[Dict[int, int]] = [{} for _ in range(n)]
+        for row, col in hits:
+            tf[row][col] = tf[row].get(col, 0) + 1
+        df = [0] * len(column)
+        for counts in tf:
+            for col in counts:
+                df[col] += 1
+        idf = [math.log1p((n - d + 0.5) / (d + 0.5)) for d in df]
+        scores = []
+        for counts, length in zip(tf, lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / avgdl)
+            scores.append(sum(count * (self.k1 + 1) / (count + norm) * idf[col] * weights[col]
+                              for col, count in counts.items()))
+        return scores
+
+    def rank(self, elements: Sequence[Any], objective: str, memory: Optional[AgentMemory] = None) -> List[Any]:
+        """``elements`` most relevant first; ties keep their order"""
+        query = query_terms(objective, memory)
+        if len(elements) < 2 or not query:
+            return list(elements)
+        relevance = self.relevance(
+            [element_tokens(element) for element in elements], query)
+        top = max(relevance)
+        if top <= 0:
+            return list(elements)
+
+        priorities = [element.get("priority") or 0 for element in elements]
+        highest = max(priorities) or 1
+        w = self.relevance_weight
+        combined = [w * r / top + (1 - w) * p / highest
+                    for r, p in zip(relevance, priorities)]
+        order = sorted(range(len(elements)), key=lambda i: -combined[i])
+        return [elements[i] for i in order]
@@ -24,6 +24,8 @@ class MemoryEntry:
     ui_state_hash: Optional[str] = None
     scroll_position: Optional[int] = None
     retry_count: Optional[int] = None
+    # Wall time spent in wait actions during this step
+    wait_ms: Optional[float] = None
 
 
 @dataclass
@@ -48,9 +50,9 @@ class AgentMemory:
                 self.accomplishments.append(entry.description)
             elif entry.action_type == "goto":
                 self.current_progress = f"Navigated to: {entry.page_title or entry.page_url}"
-            elif entry.action_type == "click":
+            elif entry.action_type in ("click", "click_element"):
                 self.current_progress = f"Clicked: {entry.description}"
-            elif entry.action_type == "fill":
+            elif entry.action_type in ("fill", "fill_element", "fill_form"):
                 self.current_progress = f"Filled form: {entry.description}"
         else:
             self.failures.append(
@@ -0,0 +1,427 @@
+from autosurfer.logger import logger
+from autosurfer.config import Config
+from autosurfer.llm.prompts import SYSTEM_PROMPT
+from autosurfer.agent.brain.memory import AgentMemory
+from autosurfer.agent.brain.element_ranker import ElementRanker
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple
+import math
+import re
+import time
+
+if TYPE_CHECKING:
+    from langchain_core.messages import BaseMessage
+
+# Tokenizer of the gpt-4o family
+TOKEN_ENCODING = "o200k_base"
+
+ELEMENT_COLUMNS = "index|tag|text|attrs"
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Tags of the element kinds a more_elements view can ask for; "text" is
+# everything else
+KIND_TAGS = {
+    "inputs": frozenset(("input", "textarea", "select")),
+    "buttons": frozenset(("button",)),
+    "links": frozenset(("a",)),
+}
+_KIND_TAGS_ALL = frozenset().union(*KIND_TAGS.values())
+
+# Sections that give way, in this order, when the prompt is over budget:
+# oldest actions first, then the last lines of the memory context
+TRIM_ORDER = ("history", "memory")
+
+
+@lru_cache(maxsize=None)
+def _encoder():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(TOKEN_ENCODING)
+    except Exception as e:
+        # e.g. offline without a cached encoding file
+        logger.debug(f"No local tokenizer ({e}); estimating token counts")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Tokens of ``text`` for the planner model, counted locally"""
+    encoder = _encoder()
+    if encoder is None:
+        # About four characters per token in English text
+        return (len(text) + 3) // 4
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def _cell(value: Optional[str], limit: int) -> str:
+    value = _WHITESPACE.sub(" ", (value or "").replace("|", "/")).strip()
+    return value if len(value) <= limit else value[:limit - 1] + "…"
+
+
+def in_view(element: Any, kind: Optional[str] = None, text: Optional[str] = None) -> bool:
+    """Whether the element belongs to a more_elements view"""
+    tag = element.get("tag")
+    if kind == "text":
+        if tag in _KIND_TAGS_ALL:
+            return False
+    elif kind and tag not in KIND_TAGS[kind]:
+        return False
+    if text:
+        needle = text.lower()
+        return any(needle in (element.get(key) or "").lower()
+                   for key in ("text", "label", "id", "testid"))
+    return True
+
+
+@dataclass
+class PromptMetrics:
+    prompt_tokens: int
+    build_ms: float
+    elements_shown: int
+    elements_total: int
+    # Elements sent as changes to the previous table rather than in full
+    delta: bool = False
+    # Reported by the API once the call completed (None: no call was made)
+    api_prompt_tokens: Optional[int] = None
+    cached_tokens: Optional[int] = None
+
+    def record_usage(self, usage: Optional[Dict[str, Any]]):
+        """Take the token usage the API reported (langchain usage_metadata)"""
+        if not usage:
+            return
+        self.api_prompt_tokens = usage.get("input_tokens")
+        self.cached_tokens = (usage.get("input_token_details")
+                              or {}).get("cache_read", 0)
+        logger.debug(
+            f"Planner call: {self.api_prompt_tokens} prompt tokens "
+            f"({self.cached_tokens} cached)")
+
+
+@dataclass
+class ElementBase:
+    """The last full element table sent, which delta prompts refer to"""
+    url: Optional[str]
+    table: str
+    # Row cells of every element of that snapshot, listed or not
+    cells: Dict[int, Tuple[str, str, str]]
+    shown: List[int]
+
+
+@dataclass
+class Prompt:
+    messages: List["BaseMessage"]
+    metrics: PromptMetrics
+
+
+@dataclass
+class PromptBuilder:
+    """Renders the planner prompt within a token budget.
+
+    Content goes stable-first (system prompt, objective, memory, then the
+    page) so that consecutive calls share the longest possible prefix, which
+    the provider's prompt cache serves at a fraction of the latency and
+    cost. Elements are listed as a compact table, one ``index|tag|text|attrs``
+    row each, with identical elements merged into one row. Elements are
+    ranked against the objective and memory (see ElementRanker) and listed
+    a page of ``max_elements`` at a time, rows being added until the token
+    budget is reached; the planner asks for other pages or a filtered view
+    with a more_elements action, served from the same elements. Every
+    section counts against the budget; over it, the action history and then
+    the memory context are trimmed (TRIM_ORDER) before table rows are, and
+    empty sections are left out.
+
+    With ``delta``, a step on the same page as the last full table repeats
+    that table unchanged (so it stays in the cached prefix, right after the
+    objective) and lists only the elements added, removed or changed since,
+    by stable id. A full table is sent again after navigation, for a
+    more_elements view, and when the changes outnumber ``delta_max_ratio``
+    of the table's elements. Metrics of every prompt built are kept in
+    ``calls``.
+    """
+    token_budget: int = Config.PROMPT_TOKEN_BUDGET
+    max_elements: int = Config.PROMPT_MAX_ELEMENTS
+    text_chars: int = Config.PROMPT_TEXT_CHARS
+    ranker: Optional[ElementRanker] = field(
+        default_factory=lambda: ElementRanker() if Config.RANK_ELEMENTS else None)
+    delta: bool = Config.PROMPT_DELTA
+    delta_max_ratio: float = Config.PROMPT_DELTA_MAX_RATIO
+    base: Optional[ElementBase] = None
+    calls: List[PromptMetrics] = field(default_factory=list)
+    # Elements in the first prompt on the current page, and how many of the
+    # elements acted on there were among them
+    page_url: Optional[str] = None
+    first_shown: Set[int] = field(default_factory=set)
+    used_elements: int = 0
+    used_first_shown: int = 0
+
+    def cells(self, element: Any) -> Tuple[str, str, str]:
+        """tag, text and attrs of the element's table row"""
+        attrs = []
+        if element.get("id"):
+            attrs.append(f"#{_cell(element['id'], self.text_chars)}")
+        if element.get("testid"):
+            attrs.append(
+                f"testid={_cell(element['testid'], self.text_chars)}")
+        if element.get("label"):
+            attrs.append(
+                f"label=\"{_cell(element['label'], self.text_chars)}\"")
+        return (element.get("tag") or "unknown",
+                _cell(element.get("text"), self.text_chars), " ".join(attrs))
+
+    def element_rows(self, ui_elements: Iterable[Any]) -> List[Tuple[str, List[int]]]:
+        """Table rows and the indexes of the elements each one stands for"""
+        rows: Dict[Tuple[str, str, str], List[int]] = {}
+        for element in ui_elements:
+            rows.setdefault(self.cells(element), []).append(
+                element.get("index"))
+        return [(f"{','.join(map(str, indexes))}|{tag}|{text}|{attrs}", indexes)
+                for (tag, text, attrs), indexes in rows.items()]
+
+    def sections(self, objective: str, memory: Optional[AgentMemory], page_context: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Everything but the element table by name, most stable first;
+        empty sections are left out"""
+        memory_context = ""
+        action_history = ""
+        if memory:
+            # The objective is already the first section
+            memory_context = memory.get_progress_context().replace(
+                f"Objective: {objective}\n", "", 1)
+            action_history = memory.get_action_history()
+
+            accomplishments = memory.get_accomplishments_summary()
+            failures = memory.get_failures_summary()
+            if accomplishments != "No accomplishments yet":
+                memory_context += f"\n{accomplishments}"
+            if failures != "No failures yet":
+                memory_context += f"\n{failures}"
+
+        context_info = []
+        if page_context:
+            context_info.append(
+                f"Current URL: {page_context.get('url', 'Unknown')}")
+            context_info.append(
+                f"Page Title: {page_context.get('title', 'Unknown')}")
+            if page_context.get('retry_count', 0) > 0:
+                context_info.append(
+                    f"Retry Count: {page_context.get('retry_count')}")
+            if page_context.get('consecutive_failures', 0) > 0:
+                context_info.append(
+                    f"Consecutive Failures: {page_context.get('consecutive_failures')}")
+        context_text = "\n".join(
+            context_info) if context_info else "No additional context"
+
+        sections = {"objective": f"Objective: {objective}"}
+        if memory_context.strip():
+            sections["memory"] = f"Memory Context:\n{memory_context.strip()}"
+        if action_history.strip():
+            sections["history"] = action_history.strip()
+        sections["page"] = f"Page Context:\n{context_text}"
+        return sections
+
+    def trim(self, sections: Dict[str, str], excess: int) -> Dict[str, str]:
+        """Drop lines of the sections in TRIM_ORDER until ``excess`` tokens
+        are saved; a section left with its header only is dropped"""
+        sections = dict(sections)
+        for name in TRIM_ORDER:
+            if excess <= 0:
+                break
+            if name not in sections:
+                continue
+            header, *lines = sections[name].splitlines()
+            while lines and excess > 0:
+                if name == "history":
+                    # An action goes with the error lines below it
+                    line = lines.pop(0)
+                    while lines and lines[0].startswith("     "):
+                        line += lines.pop(0)
+                else:
+                    line = lines.pop()
+                excess -= count_tokens(line) + 1
+            if lines:
+                sections[name] = "\n".join([header, *lines])
+            else:
+                del sections[name]
+                excess -= count_tokens(header) + 1
+        return sections
+
+    def table_header(self, shown: int, matching: int, total: int, page: int, view: Optional[Any]) -> str:
+        pages = max(1, math.ceil(matching / self.max_elements))
+        header = f"Available UI Elements (page {page} of {pages}"
+        if view is not None and (view.kind or view.text):
+            header += f", {view.kind or 'all'}"
+            if view.text:
+                header += f" containing {view.text!r}"
+            header += f": {matching} of {total} elements"
+        header += f"; {shown} shown; {ELEMENT_COLUMNS})"
+        remaining = matching - page * self.max_elements
+        if remaining > 0:
+            header += f" - {remaining} more, see more_elements"
+        return header + ":\n"
+
+    def full_table(self, ui_elements: List[Any], view: Optional[Any], used: int) -> Tuple[str, List[int]]:
+        """One page of the (filtered) elements, within the token budget"""
+        matching = ui_elements
+        if view is not None:
+            matching = [element for element in ui_elements
+                        if in_view(element, view.kind, view.text)]
+        page = max(view.page, 1) if view is not None else 1
+        listed = matching[(page - 1) * self.max_elements:page * self.max_elements]
+
+        used += count_tokens(self.table_header(
+            len(listed), len(matching), len(ui_elements), page, view))
+        table = []
+        shown: List[int] = []
+        for row, indexes in self.element_rows(listed):
+            cost = count_tokens(row) + 1
+            if used + cost > self.token_budget:
+                break
+            table.append(row)
+            used += cost
+            shown.extend(indexes)
+        header = self.table_header(
+            len(shown), len(matching), len(ui_elements), page, view)
+        return header + "\n".join(table), shown
+
+    def changes(self, ui_elements: List[Any]) -> Optional[Tuple[str, List[int]]]:
+        """Elements added, removed or changed since the base table, or None
+        when there are too many changes and a full table is due"""
+        base = self.base
+        current = {element.get("index"): element for element in ui_elements}
+        listed = set(base.shown)
+        added = [element for uid, element in current.items()
+                 if uid not in base.cells]
+        changed = [element for uid, element in current.items()
+                   if uid in listed and self.cells(element) != base.cells[uid]]
+        removed = [uid for uid in base.shown if uid not in current]
+        if len(added) + len(changed) + len(removed) > self.delta_max_ratio * max(len(base.shown), 1):
+            return None
+
+        lines = []
+        for label, elements in (("added", added), ("changed", changed)):
+            if elements:
+                lines.append(f"{label}:")
+                lines.extend(row for row, _ in self.element_rows(elements))
+        if removed:
+            lines.append(f"removed: {', '.join(map(str, removed))}")
+        if lines:
+            text = f"Element changes since the list above ({ELEMENT_COLUMNS}):\n" + \
+                "\n".join(lines)
+        else:
+            text = "No element changes since the list above"
+        shown = [uid for uid in base.shown if uid in current] + \
+            [element.get("index") for element in added]
+        return text, shown
+
+    def build(self, objective: str, ui_elements: List[Any], memory: Optional[AgentMemory] = None, page_context: Optional[Dict[str, Any]] = None, view: Optional[Any] = None) -> Prompt:
+        """Prompt for the elements of a snapshot; ``view`` is the
+        more_elements action of the previous step, if any"""
+        from langchain_core.messages import HumanMessage, SystemMessage
+
+        start = time.perf_counter()
+        sections = self.sections(objective, memory, page_context)
+
+        if self.ranker:
+            ui_elements = self.ranker.rank(ui_elements, objective, memory)
+
+        # The table has to fit next to the system prompt and the sections
+        # that are never trimmed; memory and history give way to it
+        fixed = count_tokens(SYSTEM_PROMPT) + sum(
+            count_tokens(text) for name, text in sections.items() if name not in TRIM_ORDER)
+        url = (page_context or {}).get("url")
+        changes = None
+        if self.delta and view is None and self.base is not None and self.base.url == url:
+            changes = self.changes(ui_elements)
+        if changes is not None:
+            table_tokens = count_tokens(self.base.table) + \
+                count_tokens(changes[0])
+        else:
+            table, shown = self.full_table(ui_elements, view, fixed)
+            table_tokens = count_tokens(table)
+
+        excess = count_tokens(SYSTEM_PROMPT) + table_tokens + \
+            sum(count_tokens(text) for text in sections.values()) - self.token_budget
+        if excess > 0:
+            sections = self.trim(sections, excess)
+            used = count_tokens(SYSTEM_PROMPT) + \
+                sum(count_tokens(text) for text in sections.values())
+            if used + table_tokens > self.token_budget:
+                # Still over: fewer rows of a full table
+                changes = None
+                table, shown = self.full_table(ui_elements, view, used)
+
+        if changes is not None:
+            changes_text, shown = changes
+            table = self.base.table
+        elif view is None:
+            self.base = ElementBase(
+                url=url,
+                table=table,
+                cells={element.get("index"): self.cells(element)
+                       for element in ui_elements},
+                shown=shown,
+            )
+        else:
+            # A view is no base for changes: the next step lists the page
+            # in full again
+            self.base = None
+        self._track_page(page_context, shown)
+
+        # The table outlives memory and page context while on one page
+        texts = list(sections.values())
+        texts.insert(1, table)
+        if changes is not None:
+            texts.append(changes_text)
+        messages = [
+            SystemMessage(content=SYSTEM_PROMPT),
+            HumanMessage(content=[{"type": "text", "text": text}
+                         for text in texts]),
+        ]
+
+        metrics = PromptMetrics(
+            prompt_tokens=count_tokens(SYSTEM_PROMPT) +
+            sum(count_tokens(text) for text in texts),
+            build_ms=(time.perf_counter() - start) * 1000,
+            elements_shown=len(shown),
+            elements_total=len(ui_elements),
+            delta=changes is not None,
+        )
+        self.calls.append(metrics)
+        logger.debug(
+            f"Prompt: {metrics.prompt_tokens} tokens, {len(shown)}/{len(ui_elements)} elements"
+            f"{' (delta)' if metrics.delta else ''}, built in {metrics.build_ms:.1f}ms")
+        return Prompt(messages=messages, metrics=metrics)
+
+    def _track_page(self, page_context: Optional[Dict[str, Any]], shown: List[int]):
+        url = (page_context or {}).get("url")
+        if url != self.page_url:
+            self.page_url = url
+            self.first_shown = set(shown)
+
+    def record_used(self, url: str, elements: Iterable[int]):
+        """Elements an executed action used on ``url``: counts whether each
+        was already in the first prompt on that page, i.e. did not take
+        extra rounds (scrolling, retries) to reach the planner"""
+        if url != self.page_url:
+            return
+        for element in elements:
+            self.used_elements += 1
+            self.used_first_shown += element in self.first_shown
+
+    def summary(self) -> Dict[str, Any]:
+        calls = len(self.calls)
+        if not calls:
+            return {"calls": 0}
+        api_calls = [m for m in self.calls if m.api_prompt_tokens is not None]
+        api_tokens = sum(m.api_prompt_tokens for m in api_calls)
+        cached = sum(m.cached_tokens or 0 for m in api_calls)
+        return {
+            "calls": calls,
+            "avg_prompt_tokens": round(sum(m.prompt_tokens for m in self.calls) / calls),
+            "avg_build_ms": round(sum(m.build_ms for m in self.calls) / calls, 2),
+            "delta_prompts": sum(m.delta for m in self.calls),
+            "api_calls": len(api_calls),
+            "cached_token_rate": round(cached / api_tokens, 3) if api_tokens else 0.0,
+            "used_in_first_prompt": (round(self.used_first_shown / self.used_elements, 3)
+                                     if self.used_elements else None),
+        }
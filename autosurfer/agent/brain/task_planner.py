@@ -1,76 +1,102 @@
-from autosurfer.llm.client import get_llm_client
-from langchain_core.messages import SystemMessage, HumanMessage
-from autosurfer.llm.response_schema.browser_actions import NextActions
-from autosurfer.llm.prompts import SYSTEM_PROMPT
+from autosurfer.config import Config
+from autosurfer.llm.client import OPENAI_MODEL, get_llm_client
+from autosurfer.llm.plan_cache import get_plan_cache, plan_key
+from autosurfer.llm.plan_stream import AsyncPlanStream, PlanStream
+from autosurfer.llm.response_schema.browser_actions import MoreElementsAction, NextActions
 from autosurfer.agent.brain.memory import AgentMemory
-from typing import Dict, Any, Optional
-
-llm = get_llm_client("openai")
-
-
-def next_action(objective: str, ui_elements: list, memory: Optional[AgentMemory] = None, page_context: Optional[Dict[str, Any]] = None) -> NextActions:
-    context_info = []
-
-    if page_context:
-        context_info.append(
-            f"Current URL: {page_context.get('url', 'Unknown')}")
-        context_info.append(
-            f"Page Title: {page_context.get('title', 'Unknown')}")
-
-        if page_context.get('retry_count', 0) > 0:
-            context_info.append(
-                f"Retry Count: {page_context.get('retry_count')}")
-        if page_context.get('consecutive_failures', 0) > 0:
-            context_info.append(
-                f"Consecutive Failures: {page_context.get('consecutive_failures')}")
-
-    context_text = "\n".join(
-        context_info) if context_info else "No additional context"
-
-    # Format UI elements for better readability
-    formatted_elements = []
-    # Limit to first 20 elements
-    for i, element in enumerate(ui_elements[:20]):
-        element_info = f"{i}: {element.get('tag', 'unknown')}"
-        if element.get('id'):
-            element_info += f" id='{element['id']}'"
-        if element.get('text'):
-            element_info += f" text='{element['text'][:50]}'"
-        if element.get('testid'):
-            element_info += f" testid='{element['testid']}'"
-        formatted_elements.append(element_info)
-
-    # Include memory context
-    memory_context = ""
-    action_history = ""
-
-    if memory:
-        memory_context = memory.get_progress_context()
-        action_history = memory.get_action_history()
-
-        # Add accomplishments and failures if any
-        accomplishments = memory.get_accomplishments_summary()
-        failures = memory.get_failures_summary()
-
-        if accomplishments != "No accomplishments yet":
-            memory_context += f"\n{accomplishments}"
-
-        if failures != "No failures yet":
-            memory_context += f"\n{failures}"
-
-    messages = [
-        SystemMessage(content=SYSTEM_PROMPT),
-        HumanMessage(
-            content=[
-                {"type": "text", "text": f"Objective: {objective}"},
-                {"type": "text", "text": f"Memory Context:\n{memory_context}"},
-                {"type": "text", "text": f"Page Context:\n{context_text}"},
-                {"type": "text", "text": f"Available UI Elements:\n" +
-                    "\n".join(formatted_elements)},
-                {"type": "text", "text": action_history}
-            ]
-        )
-    ]
-
-    response = llm.invoke(messages)
-    return response
+from autosurfer.agent.brain.prompt_builder import Prompt, PromptBuilder, PromptMetrics
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict, Any, List, Optional
+
+if TYPE_CHECKING:
+    from langchain_core.messages import BaseMessage
+
+
+@lru_cache(maxsize=None)
+def get_planner_llm():
+    """Planner client, built on first use rather than at import so importing
+    the agent needs neither langchain nor OPENAI_API_KEY"""
+    return get_llm_client("openai")
+
+
+@lru_cache(maxsize=None)
+def get_streaming_planner_llm():
+    return get_llm_client("openai", streaming=True)
+
+
+def __getattr__(name: str):
+    # `llm` used to be a module attribute created at import time
+    if name == "llm":
+        return get_planner_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def build_messages(objective: str, ui_elements: list, memory: Optional[AgentMemory] = None, page_context: Optional[Dict[str, Any]] = None) -> List["BaseMessage"]:
+    """Planner prompt with the default budget (see PromptBuilder)"""
+    return PromptBuilder().build(objective, ui_elements, memory, page_context).messages
+
+
+def _parsed(result: Dict[str, Any], metrics: PromptMetrics) -> NextActions:
+    """NextActions out of a structured-output result that kept the raw message"""
+    metrics.record_usage(getattr(result["raw"], "usage_metadata", None))
+    if result.get("parsing_error"):
+        raise result["parsing_error"]
+    if result.get("parsed") is None:
+        raise ValueError("Planner response did not contain a plan")
+    return result["parsed"]
+
+
+def next_action(objective: str, ui_elements: list, memory: Optional[AgentMemory] = None, page_context: Optional[Dict[str, Any]] = None, use_cache: bool = True, prompt_builder: Optional[PromptBuilder] = None, element_view: Optional[MoreElementsAction] = None) -> NextActions:
+    prompt = (prompt_builder or PromptBuilder()).build(
+        objective, ui_elements, memory, page_context, element_view)
+    messages = prompt.messages
+
+    def compute() -> NextActions:
+        return _parsed(get_planner_llm().invoke(messages), prompt.metrics)
+
+    if not (use_cache and Config.PLAN_CACHE):
+        return compute()
+    # Identical prompts (retries, reruns, agents on the same page) share a plan
+    return get_plan_cache().get_or_compute(plan_key(messages, OPENAI_MODEL), compute)
+
+
+async def async_next_action(objective: str, ui_elements: list, memory: Optional[AgentMemory] = None, page_context: Optional[Dict[str, Any]] = None, use_cache: bool = True, prompt_builder: Optional[PromptBuilder] = None, element_view: Optional[MoreElementsAction] = None) -> NextActions:
+    prompt = (prompt_builder or PromptBuilder()).build(
+        objective, ui_elements, memory, page_context, element_view)
+    messages = prompt.messages
+
+    async def compute() -> NextActions:
+        return _parsed(await get_planner_llm().ainvoke(messages), prompt.metrics)
+
+    if not (use_cache and Config.PLAN_CACHE):
+        return await compute()
+    return await get_plan_cache().aget_or_compute(plan_key(messages, OPENAI_MODEL), compute)
+
+
+def _cached_stream(prompt: Prompt, stream_cls, chunks: Callable[[], Any], use_cache: bool):
+    stream_args = {"on_usage": prompt.metrics.record_usage}
+    if not (use_cache and Config.PLAN_CACHE):
+        return stream_cls(chunks(), **stream_args)
+    cache = get_plan_cache()
+    key = plan_key(prompt.messages, OPENAI_MODEL)
+    plan = cache.get(key)
+    if plan is not None:
+        return stream_cls.of(plan)
+    # Only a response read to the end is cached; streams are not coalesced
+    return stream_cls(chunks(), on_complete=lambda plan: cache.put(key, plan), **stream_args)
+
+
+def stream_next_action(objective: str, ui_elements: list, memory: Optional[AgentMemory] = None, page_context: Optional[Dict[str, Any]] = None, use_cache: bool = True, prompt_builder: Optional[PromptBuilder] = None, element_view: Optional[MoreElementsAction] = None) -> PlanStream:
+    """Like next_action, but the actions are handed out while the response
+    is still being generated, so the first one can run early"""
+    prompt = (prompt_builder or PromptBuilder()).build(
+        objective, ui_elements, memory, page_context, element_view)
+    return _cached_stream(
+        prompt, PlanStream, lambda: get_streaming_planner_llm().stream(prompt.messages), use_cache)
+
+
+async def async_stream_next_action(objective: str, ui_elements: list, memory: Optional[AgentMemory] = None, page_context: Optional[Dict[str, Any]] = None, use_cache: bool = True, prompt_builder: Optional[PromptBuilder] = None, element_view: Optional[MoreElementsAction] = None) -> AsyncPlanStream:
+    prompt = (prompt_builder or PromptBuilder()).build(
+        objective, ui_elements, memory, page_context, element_view)
+    return _cached_stream(
+        prompt, AsyncPlanStream, lambda: get_streaming_planner_llm().astream(prompt.messages), use_cache)
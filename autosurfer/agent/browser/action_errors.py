@@ -0,0 +1,61 @@
+# Failure classes that pick the recovery before a retry
+DETACHED = "detached"
+NAVIGATION = "navigation"
+TIMEOUT = "timeout"
+OTHER = "other"
+
+# Substrings of Playwright error messages, matched case-insensitively
+_NAVIGATION_MARKERS = (
+    "execution context was destroyed",
+    "frame was detached",
+    "navigation interrupted",
+    "interrupted by another navigation",
+    "net::err_aborted",
+)
+_DETACHED_MARKERS = (
+    "not attached to the dom",
+    "element is detached",
+    "element handle refers to a detached",
+    "jshandle is disposed",
+)
+
+
+class ElementNotFound(Exception):
+    """No selector strategy matched a visible element in time"""
+
+
+def __getattr__(name: str):
+    # Playwright's Error and TimeoutError (the same classes as in
+    # playwright.async_api), resolved on first use so that importing the
+    # agent does not load Playwright; callers name them as
+    # ``action_errors.Error`` in except clauses, evaluated only on failure
+    if name in ("Error", "TimeoutError"):
+        from playwright import sync_api
+        return getattr(sync_api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def classify_error(error: BaseException) -> str:
+    from playwright.sync_api import TimeoutError
+
+    message = str(error).lower()
+    if any(marker in message for marker in _NAVIGATION_MARKERS):
+        return NAVIGATION
+    if any(marker in message for marker in _DETACHED_MARKERS):
+        return DETACHED
+    if isinstance(error, (TimeoutError, ElementNotFound)) or "timeout" in message:
+        return TIMEOUT
+    return OTHER
+
+
+class ActionExecutionError(Exception):
+    """An action of a plan failed; ``index`` is where a retry resumes"""
+
+    def __init__(self, index: int, action_type: str, cause: BaseException):
+        super().__init__(f"{action_type} (action {index + 1}): {cause}")
+        self.index = index
+        self.action_type = action_type
+        self.cause = cause
+        self.kind = classify_error(cause)
+        # Set when the plan was still streaming: the whole plan, to retry from
+        self.plan = None
@@ -1,125 +1,357 @@
 from autosurfer.logger import logger
-from autosurfer.llm.response_schema.browser_actions import NextActions
-from playwright.sync_api import Page, Browser, TimeoutError
+from autosurfer.config import Config
+from autosurfer.llm.plan_stream import PlanStream
+from autosurfer.llm.response_schema.browser_actions import ActionItem, NextActions
+from autosurfer.agent.browser import action_errors
+from autosurfer.agent.browser.action_errors import (
+    DETACHED,
+    NAVIGATION,
+    ActionExecutionError,
+    ElementNotFound,
+)
+from autosurfer.agent.browser.annotation_mirror import (
+    ANNOTATOR_JS,
+    ANNOTATOR_VERSION,
+    AnnotationMirror,
+    RENDER_DELTA_JS,
+    render_delta_args,
+)
+from autosurfer.agent.browser.element_table import ElementTable
+from autosurfer.agent.browser.navigation import NOOP, Navigator, same_page
+from autosurfer.agent.browser.settle import PageSettler, SettleResult
+from autosurfer.agent.browser.page_snapshot import PageSnapshot, SNAPSHOT_JS, snapshot_args
+from autosurfer.agent.browser.selector_resolver import (
+    SELECTOR_TIMEOUT_MS,
+    Candidate,
+    SelectorStats,
+    click_selector_candidates,
+    combined_locator,
+    fill_selector_candidates,
+    get_selector_cache,
+    host_of,
+    playwright_selector,
+    visible_locator,
+)
 import time
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
 from pathlib import Path
 
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser, Locator, Page
+
+FILL_FORM_JS = (Path(__file__).parent / "dom" / "fillForm.js").read_text()
+SCROLL_AND_SETTLE_JS = (Path(__file__).parent /
+                        "dom" / "scrollAndSettle.js").read_text()
+
+# How often wait_for_element_count counts the matches
+ELEMENT_COUNT_POLL_MS = 100
+
+
+def count_reached(current: int, expected: Optional[int], initial: int) -> bool:
+    """The count reached ``expected``, or (expected None) moved away from
+    ``initial``"""
+    return current != initial if expected is None else current == expected
+
+
+# Element registered under an annotator id, or null when stale
+RESOLVE_ELEMENT_JS = """
+    ([uid, session]) => window.domAnnotator ? window.domAnnotator.resolve(uid, session) : null
+"""
+
+SCROLL_INFO_JS = """
+    () => {
+        return {
+            scrollY: window.scrollY,
+            scrollHeight: document.body.scrollHeight,
+            clientHeight: document.documentElement.clientHeight,
+            windowHeight: window.innerHeight,
+            isAtBottom: window.scrollY + window.innerHeight >= document.body.scrollHeight,
+            isAtTop: window.scrollY === 0
+        }
+    }
+"""
+
+
+def scroll_args(sync: Dict[str, Any], selector: Optional[str] = None, direction: Optional[str] = None,
+                to: Optional[str] = None, by: Optional[int] = None) -> Dict[str, Any]:
+    """Argument passed to SCROLL_AND_SETTLE_JS; ``sync`` comes from
+    AnnotationMirror.sync_args()"""
+    return {
+        "annotatorVersion": ANNOTATOR_VERSION,
+        "sync": sync,
+        "selector": selector,
+        "direction": direction,
+        "to": to,
+        "by": by,
+        "idleMs": Config.SCROLL_IDLE_MS,
+        "timeoutMs": Config.SCROLL_TIMEOUT_MS,
+    }
+
+
+def action_args(action: Any) -> Tuple:
+    """Map an action model to the positional arguments of its handler"""
+    if action.type == "goto":
+        return (action.url,)
+    if action.type == "click":
+        return (action.selector,)
+    if action.type == "fill":
+        return (action.selector, action.value)
+    if action.type == "click_element":
+        return (action.element, action.selector)
+    if action.type == "fill_element":
+        return (action.element, action.value, action.selector)
+    if action.type == "fill_form":
+        return (action.fields,)
+    if action.type == "press":
+        return (action.key,)
+    if action.type == "wait":
+        return (action.seconds,)
+    if action.type == "wait_for_selector":
+        return (action.selector, action.state, action.timeout)
+    if action.type == "wait_for_text":
+        return (action.text, action.timeout)
+    if action.type == "wait_for_url":
+        return (action.url, action.timeout)
+    if action.type == "wait_for_network_quiet":
+        return (action.timeout,)
+    if action.type == "wait_for_element_count":
+        return (action.selector, action.count, action.timeout)
+    if action.type == "scroll":
+        return (action.direction, action.selector)
+    if action.type == "more_elements":
+        return (action.page, action.kind, action.text)
+    if action.type == "done":
+        return (action.summary,)
+    return ()
+
+
+
+def url_matcher(url: str) -> Union[str, Callable[[str], bool]]:
+    """Glob patterns go to Playwright as they are; anything else matches as a
+    substring of the current URL"""
+    if "*" in url:
+        return url
+    return lambda current: url in current
+
+
+def describe_field(field: Any) -> str:
+    return f"[{field.element}]" if field.element is not None else str(field.selector)
+
+
+def check_form_results(fields: List[Any], results: List[Dict[str, Any]]):
+    """Log the per-field results of FILL_FORM_JS and raise if any field failed"""
+    failed = []
+    for field, result in zip(fields, results):
+        name = describe_field(field)
+        if result.get("ok"):
+            logger.debug(f"Filled {name} ({result.get('kind')})")
+        else:
+            failed.append(f"{name}: {result.get('error')}")
+    if not failed:
+        return
+    message = "Could not fill form fields: " + "; ".join(failed)
+    if any(r.get("error") == "not found" for r in results):
+        raise ElementNotFound(message)
+    raise Exception(message)
+
+
+def element_ids(action: Any) -> List[int]:
+    """Annotated elements the action names by [index]"""
+    if action.type in ("click_element", "fill_element"):
+        return [action.element]
+    if action.type == "fill_form":
+        return [f.element for f in action.fields if f.element is not None]
+    return []
+
+
+def addresses_elements(action: Any) -> bool:
+    return bool(element_ids(action))
+
+
+def stale_action(action: Any, planned_url: str, current_url: str) -> bool:
+    """A streamed action planned for ``planned_url`` no longer applies: the
+    page changed under it (not through a goto of the plan) and the [index]
+    it names belongs to the previous page's annotations"""
+    return addresses_elements(action) and not same_page(planned_url, current_url)
+
 
 class BrowserActionExecutor:
-    def __init__(self, page: Page, browser_session: Browser):
+    def __init__(self, page: "Page", browser_session: "Browser"):
         self.page = page
         self.browser = browser_session
         self._dispatch = {
             "goto": self._goto,
             "click": self._click,
             "fill": self._fill,
+            "click_element": self._click_element,
+            "fill_element": self._fill_element,
+            "fill_form": self._fill_form,
             "press": self._press,
             "wait": self._wait,
+            "wait_for_selector": self._wait_for_selector,
+            "wait_for_text": self._wait_for_text,
+            "wait_for_url": self._wait_for_url,
+            "wait_for_network_quiet": self._wait_for_network_quiet,
+            "wait_for_element_count": self._wait_for_element_count,
             "scroll": self._scroll,
             "scroll_to_bottom": self._scroll_to_bottom,
             "scroll_to_top": self._scroll_to_top,
+            "more_elements": self._more_elements,
             "done": self._done,
         }
 
-        # Track whether the JS annotation manager has been initialised with auto-refresh
-        self._annotations_init: bool = False
-
-    # ------------------------------------------------------------------
-    # Utility: wait until the page's scroll position is idle for
-    # `idle_ms` milliseconds, or until `timeout_ms` total.
-    # ------------------------------------------------------------------
-    def _wait_for_scroll_idle(self, idle_ms: int = 200, timeout_ms: int = 2000):
-        start_time = time.time()
-        last_scroll_y = self.page.evaluate("() => window.scrollY")
-        idle_start = time.time()
-
-        while True:
-            time.sleep(0.05)
-            current_scroll_y = self.page.evaluate("() => window.scrollY")
-
-            if current_scroll_y == last_scroll_y:
-                # Unchanged scroll position
-                if (time.time() - idle_start) * 1000 >= idle_ms:
-                    break
-            else:
-                last_scroll_y = current_scroll_y
-                idle_start = time.time()
-
-            if (time.time() - start_time) * 1000 >= timeout_ms:
-                logger.debug("Scroll idle wait timed out, continuing anyway")
-                break
-
-    def execute(self, next_actions: NextActions):
-        for item in next_actions.actions:
-            logger.info(f"[Agent Thought] {item.thought}")
-            fn = self._dispatch.get(item.action.type)
-            if not fn:
-                logger.warn(f"Unknown action type: {item.action.type}")
-                continue
+        # Python-side copy of the in-page element registry (delta transfer)
+        self.annotations = AnnotationMirror()
+
+        # Per-field results of the last fill_form action
+        self.last_form_results: List[Dict[str, Any]] = []
+
+        # Which selector strategies win their races, in this run and (per
+        # host) across runs
+        self.selector_stats = SelectorStats()
+        self.selector_cache = get_selector_cache()
+
+        # Event-driven replacement for fixed sleeps and networkidle waits
+        self.settler = PageSettler(page)
+        self.last_settle: Optional[SettleResult] = None
+
+        # Skips redundant gotos and prefers history back (see navigation)
+        self.navigator = Navigator(page)
+
+        # Wall time spent in wait actions since the plan started
+        self.wait_ms: float = 0.0
+
+        # Scroll info reported by the last scroll action
+        self.last_scroll: Optional[Dict[str, Any]] = None
+
+    def settle(self, timeout_ms: Optional[int] = None) -> SettleResult:
+        """Wait until the page is stable (or ``timeout_ms`` passes) and
+        report how long that took."""
+        self.last_settle = self.settler.settle(timeout_ms)
+        return self.last_settle
+
+    def execute(self, next_actions: NextActions, start_at: int = 0):
+        """Run the plan from action ``start_at``. A failure is raised as
+        ActionExecutionError naming the failed action, so a retry can resume
+        there instead of repeating the actions that already succeeded."""
+        actions = next_actions.actions
+        if start_at == 0:
+            self.wait_ms = 0.0
+        for index in range(start_at, len(actions)):
+            if self._run(index, actions[index]):
+                return
+
+    def execute_stream(self, stream: PlanStream) -> NextActions:
+        """Run the actions of a streamed plan as they arrive and return the
+        plan. Each action runs as soon as it validates while the rest is
+        still being generated. An action addressing elements of a page that
+        has since changed cancels the rest of the stream; a failed action is
+        raised once the response is complete, so the ActionExecutionError
+        carries the whole plan (``plan``) for the retry. A response that
+        does not parse before any action arrived raises ActionExecutionError
+        without a plan."""
+        self.wait_ms = 0.0
+        planned_url = self.page.url
+        navigated = False
+        items = iter(stream)
+        try:
+            for index, item in enumerate(items):
+                if not navigated and stale_action(item.action, planned_url, self.page.url):
+                    logger.info(
+                        f"Page changed to {self.page.url} under the plan; "
+                        f"cancelling it from action {index + 1} ({item.action.type})")
+                    return NextActions(actions=stream.received[:index])
+                try:
+                    if self._run(index, item):
+                        return stream.current_plan()
+                except ActionExecutionError as e:
+                    for _ in items:
+                        pass
+                    e.plan = stream.current_plan()
+                    raise
+                navigated = navigated or item.action.type == "goto"
+            return stream.current_plan()
+        except ActionExecutionError:
+            raise
+        except Exception as e:
+            # The response did not parse or validate before any action
+            # arrived: there is no plan to retry from (``plan`` stays None)
+            logger.error(f"Planner response is not a valid plan: {str(e).splitlines()[0]}")
+            raise ActionExecutionError(0, "plan", e) from e
+        finally:
+            items.close()
+            stream.close()
+
+    def _run(self, index: int, item: ActionItem) -> bool:
+        """Run one action of a plan; True if it ends the plan (done)"""
+        logger.info(f"[Agent Thought] {item.thought}")
+        fn = self._dispatch.get(item.action.type)
+        if not fn:
+            logger.warn(f"Unknown action type: {item.action.type}")
+            return False
+
+        try:
+            fn(*action_args(item.action))
+            # Both end the plan: what follows a view request was planned
+            # without seeing the elements it asks for
+            if item.action.type in ("done", "more_elements"):
+                return True
 
-            try:
-                if item.action.type == "goto":
-                    fn(item.action.url)
-                elif item.action.type == "click":
-                    fn(item.action.selector)
-                elif item.action.type == "fill":
-                    fn(item.action.selector, item.action.value)
-                elif item.action.type == "press":
-                    fn(item.action.key)
-                elif item.action.type == "wait":
-                    fn(item.action.seconds)
-                elif item.action.type == "scroll":
-                    fn(item.action.direction, item.action.selector)
-                elif item.action.type == "scroll_to_bottom":
-                    fn()
-                elif item.action.type == "scroll_to_top":
-                    fn()
-                elif item.action.type == "done":
-                    fn(item.action.summary)
-                    return
-
-                time.sleep(0.5)
+            self.settle()
 
+        except Exception as e:
+            logger.error(f"Failed to execute {item.action.type}: {e}")
+            raise ActionExecutionError(index, item.action.type, e) from e
+        return False
+
+    def recover(self, error: ActionExecutionError):
+        """Get ready to retry the failed action, depending on how it failed"""
+        logger.info(
+            f"Recovering from {error.kind} failure before retrying action {error.index + 1}")
+        if error.kind == DETACHED:
+            # Nothing to wait for: the retry resolves the element again
+            return
+        if error.kind == NAVIGATION:
+            # Wait for the document that won the race to commit
+            try:
+                self.page.wait_for_url(
+                    lambda _: True, wait_until="domcontentloaded", timeout=Config.SETTLE_TIMEOUT_MS)
             except Exception as e:
-                logger.error(f"Failed to execute {item.action.type}: {e}")
-                raise
+                logger.debug(f"Waiting for navigation failed: {e}")
+        self.settle()
+
+    def _evaluate_annotated(self, script: str, arg: Dict[str, Any]) -> Dict[str, Any]:
+        """Evaluate a script that needs the current annotator, injecting it
+        only when the page reports it missing or outdated"""
+        payload = self.page.evaluate(script, arg)
+        if payload.get("annotatorMissing"):
+            # Init script did not run on this document (e.g. about:blank) or
+            # an older build is installed
+            self.page.evaluate(ANNOTATOR_JS)
+            payload = self.page.evaluate(script, arg)
+        return payload
 
     def annotate_ui(self):
         # Ensure page settled
-        try:
-            self.page.wait_for_load_state("networkidle", timeout=10000)
-        except Exception:
-            pass
+        self.settle()
 
-        # Inject annotation script (idempotent)
-        js_path = Path(__file__).parent / "dom" / "annotateDom.js"
-        self.page.evaluate(js_path.read_text())
+        # Render and fetch only the elements that changed since the last call
+        delta = self._evaluate_annotated(
+            RENDER_DELTA_JS, render_delta_args(self.annotations.sync_args()))
+        if delta.get("annotatorMissing"):
+            return ElementTable()
+        return self.annotations.apply(delta)
 
-        # Enable auto-refresh once per page instance
-        if not self._annotations_init:
-            try:
-                self.page.evaluate(
-                    "window.domAnnotator && window.domAnnotator.enableAutoRefresh(150)")
-                self._annotations_init = True
-            except Exception as e:
-                logger.debug(f"Could not enable auto-refresh: {e}")
-
-        # Retrieve elements from JS cache; if empty run a fresh render
-        elements = self.page.evaluate(
-            "() => { const mgr = window.domAnnotator; if (!mgr) return []; const els = mgr.getElements ? mgr.getElements() : []; if (els.length === 0) { return mgr.render({highlight:true}); } return els; }")
-
-        return [
-            {
-                "index": el["index"],
-                "tag": el["tag"],
-                "id": el.get("id"),
-                "testid": el.get("data-testid"),
-                "text": el.get("text"),
-                "xpath": el.get("xpath"),
-            }
-            for el in elements
-        ]
+    def snapshot(self, scan_captcha: bool = False) -> PageSnapshot:
+        """Capture URL, title, fresh elements, scroll info, captcha signals and
+        DOM/UI digests in one in-page evaluate."""
+        self.settle()
+
+        payload = self._evaluate_annotated(
+            SNAPSHOT_JS, snapshot_args(scan_captcha, self.annotations.sync_args()))
+
+        elements = self.annotations.apply(payload["elementsDelta"])
+        return PageSnapshot.from_payload(payload, elements)
 
     # The old remove_annotation method is kept for backward compatibility but now
     # delegates to AnnotationManager.clear() if available.
@@ -132,83 +364,137 @@ class BrowserActionExecutor:
 
     def _goto(self, url):
         logger.info(f"Navigating to: {url}")
+        result = self.navigator.goto(url)
+        if result.strategy != NOOP:
+            self.settle()
+
+    def _selector_is_valid(self, selector: str) -> bool:
         try:
-            self.page.goto(url, wait_until="networkidle", timeout=30000)
-            # Wait a bit for any dynamic content to load
-            time.sleep(1)
-        except TimeoutError:
-            logger.warn(f"Navigation timeout for {url}, but continuing...")
-            # Try with a shorter timeout
-            self.page.goto(url, wait_until="domcontentloaded", timeout=15000)
+            self.page.locator(selector).count()
+            return True
+        except action_errors.Error:
+            return False
+
+    def _race(self, candidates: List[Candidate]) -> Tuple[Optional[str], Optional["Locator"]]:
+        """Wait once for any candidate to match a visible element, then return
+        the match of the most preferred strategy that is visible"""
+        try:
+            combined_locator(self.page, candidates).wait_for(
+                state="visible", timeout=SELECTOR_TIMEOUT_MS)
+        except action_errors.TimeoutError:
+            return None, None
+        except action_errors.Error:
+            # One malformed selector spoils the combined locator; race the rest
+            valid = [c for c in candidates if self._selector_is_valid(c[1])]
+            if not valid or len(valid) == len(candidates):
+                raise
+            return self._race(valid)
+
+        for strategy, selector in candidates:
+            locator = visible_locator(self.page, selector)
+            if locator.count():
+                return strategy, locator.first
+        # The match went away between the wait and the lookup
+        return None, None
+
+    def _race_selectors(self, selector: str, candidates: List[Candidate]) -> Optional["Locator"]:
+        """Resolve ``selector`` through its candidate strategies, trying the
+        one that was fastest on this host before without waiting first"""
+        host = host_of(self.page.url)
+        candidates, learned = self.selector_cache.order(
+            host, selector, candidates)
+        start = time.monotonic()
+
+        strategy, locator = None, None
+        raced = candidates
+        if learned:
+            raced = candidates[:1]
+            probe = visible_locator(self.page, candidates[0][1])
+            try:
+                if probe.count():
+                    strategy, locator = candidates[0][0], probe.first
+            except action_errors.Error:
+                pass
+        if not locator:
+            raced = candidates
+            strategy, locator = self._race(candidates)
+
+        elapsed_ms = (time.monotonic() - start) * 1000
+        self.selector_stats.record(raced, strategy, elapsed_ms)
+        self.selector_cache.record(host, selector, strategy, elapsed_ms)
+        if strategy:
+            logger.debug(
+                f"Selector strategy '{strategy}' won for {selector} in {elapsed_ms:.0f}ms")
+        return locator
 
     def _click(self, selector: str):
         logger.info(f"Clicking: {selector}")
 
-        # Try multiple selector strategies
-        selectors_to_try = []
-
-        if selector.startswith("/"):
-            selectors_to_try.append(f"xpath={selector}")
-        elif selector.startswith("text="):
-            selectors_to_try.append(selector)
-        elif selector.startswith(":has-text("):
-            selectors_to_try.append(selector)
-        else:
-            # Try the original selector first
-            selectors_to_try.append(selector)
-
-            # If it's a simple text, try text selector
-            if not any(char in selector for char in ["#", ".", "[", "="]):
-                selectors_to_try.append(f'text="{selector}"')
-                selectors_to_try.append(f':has-text("{selector}")')
-
-        for sel in selectors_to_try:
-            try:
-                # Wait for element to be visible and clickable
-                element = self.page.wait_for_selector(
-                    sel, timeout=5000, state="visible")
-                if element:
-                    element.click()
-                    return
-            except Exception as e:
-                logger.debug(f"Selector {sel} failed: {e}")
-                continue
-
-        # If all selectors fail, try to find by text content
-        try:
-            self.page.click(f'text="{selector}"')
-        except:
-            raise Exception(
+        locator = self._race_selectors(
+            selector, click_selector_candidates(selector))
+        if not locator:
+            raise ElementNotFound(
                 f"Could not click element with selector: {selector}")
+        locator.click(timeout=SELECTOR_TIMEOUT_MS)
 
     def _fill(self, selector: str, value: str):
         logger.info(f"Filling {selector} with: {value}")
 
-        # Try multiple selector strategies
-        selectors_to_try = []
-
-        if selector.startswith("/"):
-            selectors_to_try.append(f"xpath={selector}")
-        else:
-            selectors_to_try.append(selector)
-
-            # If it's a simple text, try to find input by placeholder or label
-            if not any(char in selector for char in ["#", ".", "[", "="]):
-                selectors_to_try.append(f'input[placeholder*="{selector}"]')
-                selectors_to_try.append(f'input[name*="{selector}"]')
-
-        for sel in selectors_to_try:
-            try:
-                element = self.page.wait_for_selector(
-                    sel, timeout=5000, state="visible")
-                if element:
-                    element.fill(value)
-                    return
-            except Exception as e:
-                logger.debug(f"Fill selector {sel} failed: {e}")
-                continue
-
-        raise Exception(f"Could not fill element with selector: {selector}")
+        locator = self._race_selectors(
+            selector, fill_selector_candidates(selector))
+        if not locator:
+            raise ElementNotFound(
+                f"Could not fill element with selector: {selector}")
+        locator.fill(value, timeout=SELECTOR_TIMEOUT_MS)
+
+    def _resolve_element(self, element: int):
+        """ElementHandle for an annotator id, or None if the id has gone stale
+        (element removed, new document)"""
+        handle = self.page.evaluate_handle(
+            RESOLVE_ELEMENT_JS, [element, self.annotations.session])
+        found = handle.as_element()
+        if not found:
+            handle.dispose()
+        return found
+
+    def _fallback_selector(self, element: int, selector: Optional[str]) -> str:
+        """Selector to use when an element id is stale: the planner's own, or
+        the element's XPath from the last snapshot"""
+        if selector:
+            return selector
+        row = self.annotations.elements().find(element)
+        if row and row.xpath:
+            return row.xpath
+        raise ElementNotFound(
+            f"Element [{element}] is no longer on the page")
+
+    def _click_element(self, element: int, selector: Optional[str] = None):
+        logger.info(f"Clicking element [{element}]")
+        handle = self._resolve_element(element)
+        if handle:
+            handle.click(timeout=SELECTOR_TIMEOUT_MS)
+            return
+        logger.debug(
+            f"Element [{element}] is stale, falling back to selectors")
+        self._click(self._fallback_selector(element, selector))
+
+    def _fill_element(self, element: int, value: str, selector: Optional[str] = None):
+        logger.info(f"Filling element [{element}] with: {value}")
+        handle = self._resolve_element(element)
+        if handle:
+            handle.fill(value, timeout=SELECTOR_TIMEOUT_MS)
+            return
+        logger.debug(
+            f"Element [{element}] is stale, falling back to selectors")
+        self._fill(self._fallback_selector(element, selector), value)
+
+    def _fill_form(self, fields: List[Any]):
+        logger.info(f"Filling form with {len(fields)} fields")
+        self.last_form_results = self.page.evaluate(FILL_FORM_JS, {
+            "session": self.annotations.session,
+            "fields": [field.model_dump() for field in fields],
+        })
+        check_form_results(fields, self.last_form_results)
 
     def _press(self, key: str):
         logger.info(f"Pressing key: {key}")
@@ -217,99 +503,123 @@ class BrowserActionExecutor:
     def _wait(self, seconds: float):
         logger.info(f"Waiting for {seconds} seconds")
         time.sleep(seconds)
+        self.wait_ms += seconds * 1000
+
+    def _wait_until(self, description: str, wait: Callable[[int], Any], timeout: float):
+        """Run a native Playwright waiter bounded by ``timeout`` seconds; a
+        timeout fails the action, as the condition it waited for never held"""
+        logger.info(f"Waiting for {description} (up to {timeout}s)")
+        start = time.monotonic()
+        try:
+            wait(int(timeout * 1000))
+            logger.info(
+                f"Done waiting for {description} after {(time.monotonic() - start) * 1000:.0f}ms")
+        except action_errors.TimeoutError:
+            logger.warn(f"Timed out after {timeout}s waiting for {description}")
+            raise
+        finally:
+            self.wait_ms += (time.monotonic() - start) * 1000
+
+    def _wait_for_selector(self, selector: str, state: str = "visible", timeout: float = 10):
+        locator = self.page.locator(playwright_selector(selector)).first
+        self._wait_until(f"{selector} to be {state}",
+                         lambda ms: locator.wait_for(state=state, timeout=ms), timeout)
+
+    def _wait_for_text(self, text: str, timeout: float = 10):
+        locator = self.page.get_by_text(text).first
+        self._wait_until(f'text "{text}"',
+                         lambda ms: locator.wait_for(state="visible", timeout=ms), timeout)
+
+    def _wait_for_url(self, url: str, timeout: float = 10):
+        self._wait_until(f"URL matching {url}", lambda ms: self.page.wait_for_url(
+            url_matcher(url), wait_until="domcontentloaded", timeout=ms), timeout)
+
+    def _wait_for_network_quiet(self, timeout: float = 10):
+        # The settler tracks requests from page events (long-polling and
+        # sockets excluded), which networkidle cannot do after the first load
+        start = time.monotonic()
+        result = self.settle(int(timeout * 1000))
+        self.wait_ms += (time.monotonic() - start) * 1000
+        if not result.stable:
+            logger.warn(
+                f"Network not quiet after {timeout}s ({result.pending_requests} requests pending)")
+
+    def _wait_for_element_count(self, selector: str, count: Optional[int] = None, timeout: float = 10):
+        # Counted through a locator so text= and :has-text() selectors work
+        # as they do for every other action
+        locator = self.page.locator(playwright_selector(selector))
+        initial = locator.count()
+        target = "to change" if count is None else f"to reach {count}"
+
+        def wait(ms: int):
+            deadline = time.monotonic() + ms / 1000
+            while not count_reached(locator.count(), count, initial):
+                if time.monotonic() >= deadline:
+                    raise action_errors.TimeoutError(
+                        f"Timed out after {ms}ms: count of {selector} ({initial}) {target}")
+                self.page.wait_for_timeout(ELEMENT_COUNT_POLL_MS)
+
+        self._wait_until(f"count of {selector} ({initial}) {target}", wait, timeout)
+
+    def _scroll_and_settle(self, **scroll: Any) -> Dict[str, Any]:
+        """Scroll, wait for the scroll to end and re-render the annotations in
+        one evaluate (see dom/scrollAndSettle.js)"""
+        payload = self._evaluate_annotated(
+            SCROLL_AND_SETTLE_JS, scroll_args(self.annotations.sync_args(), **scroll))
+        if payload.get("annotatorMissing"):
+            return payload
+        self.annotations.apply(payload["elementsDelta"])
+        self.last_scroll = payload["scroll"]
+        logger.debug(
+            f"Scroll settled by {payload['settledBy']} in {payload['elapsedMs']}ms")
+        return payload
 
     def _scroll(self, direction: str, selector: Optional[str] = None):
         if selector:
             logger.info(f"Scrolling to element: {selector}")
+            result = self._scroll_and_settle(selector=selector)
+            if result.get("found") is not False:
+                return
 
-            # Clear current annotations before scrolling to prevent drift
-            self.page.evaluate(
-                "window.domAnnotator && window.domAnnotator.clear()")
-
+            # The in-page lookup missed; try Playwright's selector engines
             try:
-                if selector.startswith("/"):
-                    self.page.locator(
-                        f"xpath={selector}").scroll_into_view_if_needed()
-                else:
-                    self.page.locator(selector).scroll_into_view_if_needed()
+                locator = self._race_selectors(
+                    selector, click_selector_candidates(selector))
+                if not locator:
+                    raise Exception("no visible match")
+                locator.scroll_into_view_if_needed()
+                self._scroll_and_settle()
             except Exception as e:
                 logger.warn(f"Could not scroll to {selector}: {e}")
                 # Fallback to general scroll
-                if direction == "down":
-                    self.page.evaluate("window.scrollBy(0, 500)")
-                elif direction == "up":
-                    self.page.evaluate("window.scrollBy(0, -500)")
-
-            # Wait for scroll to finish then re-annotate
-            self._wait_for_scroll_idle()
-            self.page.evaluate(
-                "window.domAnnotator && window.domAnnotator.render({highlight:true})")
+                self._scroll_and_settle(direction=direction, by=500)
         else:
             logger.info(f"Scrolling {direction}")
-
-            # Clear existing annotations before scrolling
-            self.page.evaluate(
-                "window.domAnnotator && window.domAnnotator.clear()")
-
-            if direction == "down":
-                window_height = self.page.evaluate("window.innerHeight")
-                self.page.evaluate(f"window.scrollBy(0, {window_height})")
-            elif direction == "up":
-                window_height = self.page.evaluate("window.innerHeight")
-                self.page.evaluate(f"window.scrollBy(0, -{window_height})")
-
-            logger.info(f"Scrolled {direction} by {window_height}px")
-
-            # Wait for scroll end then re-annotate
-            self._wait_for_scroll_idle()
-            self.page.evaluate(
-                "window.domAnnotator && window.domAnnotator.render({highlight:true})")
-            logger.info(f"Annotated new viewport after scrolling {direction}")
+            result = self._scroll_and_settle(direction=direction)
+            logger.info(
+                f"Scrolled {direction} by {abs(result.get('scrolledBy', 0))}px")
 
     def scroll_to_bottom(self):
         """Scroll to the very bottom of the page"""
-        logger.info("Scrolling to bottom of page")
-        self.page.evaluate(
-            "window.domAnnotator && window.domAnnotator.clear()")
-        self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        self._wait_for_scroll_idle()
-        self.page.evaluate(
-            "window.domAnnotator && window.domAnnotator.render({highlight:true})")
+        self._scroll_to_bottom()
 
     def scroll_to_top(self):
         """Scroll to the very top of the page"""
-        logger.info("Scrolling to top of page")
-        self.page.evaluate(
-            "window.domAnnotator && window.domAnnotator.clear()")
-        self.page.evaluate("window.scrollTo(0, 0)")
-        self._wait_for_scroll_idle()
-        self.page.evaluate(
-            "window.domAnnotator && window.domAnnotator.render({highlight:true})")
+        self._scroll_to_top()
 
     def get_scroll_info(self):
         """Get current scroll position and page dimensions"""
-        return self.page.evaluate("""
-            () => {
-                return {
-                    scrollY: window.scrollY,
-                    scrollHeight: document.body.scrollHeight,
-                    clientHeight: document.documentElement.clientHeight,
-                    windowHeight: window.innerHeight,
-                    isAtBottom: window.scrollY + window.innerHeight >= document.body.scrollHeight,
-                    isAtTop: window.scrollY === 0
-                }
-            }
-        """)
+        return self.page.evaluate(SCROLL_INFO_JS)
 
     def _scroll_to_bottom(self):
         """Scroll to the very bottom of the page"""
         logger.info("Scrolling to bottom of page")
-        self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        self._scroll_and_settle(to="bottom")
 
     def _scroll_to_top(self):
         """Scroll to the very top of the page"""
         logger.info("Scrolling to top of page")
-        self.page.evaluate("window.scrollTo(0, 0)")
+        self._scroll_and_settle(to="top")
 
     def _scroll_comprehensive(self, description: str):
         """Comprehensive scrolling through the entire page with DOM annotation at each position"""
@@ -325,5 +635,10 @@ class BrowserActionExecutor:
         logger.info(
             "Initial viewport annotated - agent can now interact with current viewport")
 
+    def _more_elements(self, page: int, kind: Optional[str], text: Optional[str]):
+        # Served by the prompt builder from the collected elements
+        logger.info(
+            f"Element list requested: page {page}, kind {kind or 'any'}, text {text or 'any'}")
+
     def _done(self, summary: str):
         logger.info(f"[DONE] {summary}")
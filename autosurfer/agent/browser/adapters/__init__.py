@@ -1,13 +1,25 @@
-from .base import BrowserAdapter, BrowserSettings, BaseBrowserAdapter
+from .base import BrowserAdapter, BrowserSettings, BaseBrowserAdapter, AsyncBaseBrowserAdapter
 from .playwright_adapter import PlaywrightAdapter
 from .browserbase_adapter import BrowserBaseAdapter
-from .factory import create_browser_adapter
+from .async_playwright_adapter import AsyncPlaywrightAdapter
+from .async_browserbase_adapter import AsyncBrowserBaseAdapter
+from .factory import create_browser_adapter, create_async_browser_adapter
+from .interception import InterceptionPolicy, PolicyOverride
+from .record_replay import MatchPolicy, RecordReplay
 
 __all__ = [
     'BrowserAdapter',
     'BrowserSettings',
     'BaseBrowserAdapter',
+    'AsyncBaseBrowserAdapter',
     'PlaywrightAdapter',
     'BrowserBaseAdapter',
-    'create_browser_adapter'
+    'AsyncPlaywrightAdapter',
+    'AsyncBrowserBaseAdapter',
+    'create_browser_adapter',
+    'create_async_browser_adapter',
+    'InterceptionPolicy',
+    'PolicyOverride',
+    'MatchPolicy',
+    'RecordReplay'
 ]
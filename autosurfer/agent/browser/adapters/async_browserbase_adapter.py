@@ -0,0 +1,64 @@
+from autosurfer.logger import logger
+from autosurfer.config import Config
+from .base import AsyncBaseBrowserAdapter, BrowserSettings
+import asyncio
+
+
+class AsyncBrowserBaseAdapter(AsyncBaseBrowserAdapter):
+    """Asyncio BrowserBase adapter using Playwright CDP connection"""
+
+    def __init__(self, settings: BrowserSettings):
+        super().__init__(settings)
+        self.playwright = None
+        self.session = None
+
+    async def start(self) -> "AsyncBrowserBaseAdapter":
+        try:
+            from browserbase import Browserbase
+            from playwright.async_api import async_playwright
+
+            api_key = Config.BROWSERBASE_API_KEY
+            project_id = Config.BROWSERBASE_PROJECT_ID
+
+            if not api_key:
+                raise ValueError(
+                    "BROWSERBASE_API_KEY environment variable is required")
+            if not project_id:
+                raise ValueError(
+                    "BROWSERBASE_PROJECT_ID environment variable is required")
+
+            # The BrowserBase SDK is synchronous; keep it off the event loop
+            self.browserbase = Browserbase(api_key=api_key)
+            self.session = await asyncio.to_thread(
+                self.browserbase.sessions.create, project_id=project_id)
+            logger.info(
+                f'[Async BrowserBase Adapter]: Session created - {self.session.id}')
+
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.connect_over_cdp(
+                self.session.connect_url)
+
+            # Use existing context and page
+            self.context = self.browser.contexts[0]
+            self.page = self.context.pages[0]
+
+            await self._apply_settings_to_page()
+
+            logger.info('[Async BrowserBase Adapter]: Initialized')
+            return self
+
+        except ImportError:
+            logger.error(
+                "BrowserBase not installed. Install with: pip install browserbase")
+            raise
+        except Exception as e:
+            logger.error(f"Error initializing BrowserBase: {e}")
+            raise
+
+    async def close(self):
+        await super().close()
+        if self.playwright:
+            await self.playwright.stop()
+        if self.session:
+            logger.info(
+                f"Session replay available at: https://browserbase.com/sessions/{self.session.id}")
@@ -0,0 +1,66 @@
+from typing import TYPE_CHECKING, Optional
+from autosurfer.logger import logger
+from .base import AsyncBaseBrowserAdapter, BrowserSettings
+from .playwright_adapter import DEFAULT_BROWSER_ARGS, ignored_default_args
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, Playwright
+
+
+class AsyncPlaywrightAdapter(AsyncBaseBrowserAdapter):
+    """Asyncio Playwright browser adapter.
+
+    Pass an already-launched ``browser`` to open an isolated context on it
+    instead of launching a new Chromium process; such sessions only close
+    their own context.
+    """
+
+    def __init__(self, settings: BrowserSettings, browser: Optional["Browser"] = None):
+        super().__init__(settings)
+        self.playwright: Optional["Playwright"] = None
+        self.browser: Optional["Browser"] = browser
+        self._owns_browser = browser is None
+
+    async def launch(self) -> "AsyncPlaywrightAdapter":
+        """Launch the browser without opening a context, e.g. to only serve
+        ``new_session`` contexts"""
+        if self.browser is None:
+            from playwright.async_api import async_playwright
+            self.playwright = await async_playwright().start()
+
+            browser_args = list(DEFAULT_BROWSER_ARGS)
+            if self.settings.args:
+                browser_args.extend(self.settings.args)
+
+            self.browser = await self.playwright.chromium.launch(
+                headless=self.settings.headless,
+                args=browser_args,
+                ignore_default_args=ignored_default_args(self.settings)
+            )
+        return self
+
+    async def start(self) -> "AsyncPlaywrightAdapter":
+        await self.launch()
+        await self.setup_browser()
+        logger.info('[Async Playwright Adapter]: Initialized')
+        return self
+
+    async def new_session(self) -> "AsyncPlaywrightAdapter":
+        """Open a new context/page on this adapter's browser"""
+        session = AsyncPlaywrightAdapter(self.settings, browser=self.browser)
+        return await session.start()
+
+    async def close(self):
+        if not self._owns_browser:
+            if self.record_replay:
+                self.record_replay.close()
+            try:
+                if self.context:
+                    await self.context.close()
+            except Exception as e:
+                logger.error(f"Error closing browser context: {e}")
+            return
+
+        await super().close()
+        if self.playwright:
+            await self.playwright.stop()
@@ -1,7 +1,17 @@
 from dataclasses import dataclass
 from typing import List, Optional, Protocol, Any
-from pathlib import Path
 from autosurfer.logger import logger
+from .interception import (
+    AsyncRequestInterceptor,
+    InterceptionPolicy,
+    RequestInterceptor,
+)
+from .record_replay import AsyncRecordReplayRouter, RecordReplay, RecordReplayRouter
+from autosurfer.agent.browser.annotation_mirror import ANNOTATOR_JS
+from autosurfer.agent.browser.settle import SETTLE_JS
+
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
 
 @dataclass
@@ -9,6 +19,10 @@ class BrowserSettings:
     headless: bool = False
     stealth_mode: bool = False
     args: Optional[List[str]] = None
+    # Requests to block in every context; None loads everything
+    interception: Optional[InterceptionPolicy] = None
+    # Record responses to, or replay them from, a network archive
+    record_replay: Optional[RecordReplay] = None
 
 
 class BrowserAdapter(Protocol):
@@ -30,14 +44,28 @@ class BaseBrowserAdapter:
         self.context = None
         self.page = None
 
-        # Load JS code once
-        js_path = Path(__file__).parent.parent / "dom" / "annotateDom.js"
-        self.js_code = js_path.read_text() if js_path.exists() else ""
+        # Loaded once per process and version-stamped (see annotation_mirror)
+        self.js_code = ANNOTATOR_JS
+
+        self.interceptor: Optional[RequestInterceptor] = None
+        if settings.interception:
+            self.interceptor = RequestInterceptor(settings.interception)
+
+        self.record_replay: Optional[RecordReplayRouter] = None
+        if settings.record_replay:
+            self.record_replay = RecordReplayRouter(settings.record_replay)
 
     def _apply_settings_to_page(self):
         """Apply common settings to existing page/context"""
         if self.js_code:
             self.context.add_init_script(self.js_code)
+        self.context.add_init_script(SETTLE_JS)
+
+        # Installed first so the interceptor's handler runs before it
+        if self.record_replay:
+            self.record_replay.install(self.context)
+        if self.interceptor:
+            self.interceptor.install(self.context)
 
         if self.settings.stealth_mode:
             try:
@@ -51,7 +79,7 @@ class BaseBrowserAdapter:
         """Setup browser, context, and page with common settings"""
         self.context = self.browser.new_context(
             viewport=None,
-            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+            user_agent=DEFAULT_USER_AGENT
         )
 
         self.page = self.context.new_page()
@@ -62,6 +90,8 @@ class BaseBrowserAdapter:
 
     def close(self):
         """Close browser resources"""
+        if self.record_replay:
+            self.record_replay.close()
         try:
             if self.context:
                 self.context.close()
@@ -69,3 +99,75 @@ class BaseBrowserAdapter:
                 self.browser.close()
         except Exception as e:
             logger.error(f"Error closing browser: {e}")
+
+
+class AsyncBaseBrowserAdapter:
+    """Base class for asyncio browser adapters (playwright.async_api).
+
+    Construction does no I/O; call ``await adapter.start()`` before use.
+    """
+
+    def __init__(self, settings: BrowserSettings):
+        self.settings = settings
+        self.browser = None
+        self.context = None
+        self.page = None
+
+        self.js_code = ANNOTATOR_JS
+
+        self.interceptor: Optional[AsyncRequestInterceptor] = None
+        if settings.interception:
+            self.interceptor = AsyncRequestInterceptor(settings.interception)
+
+        self.record_replay: Optional[AsyncRecordReplayRouter] = None
+        if settings.record_replay:
+            self.record_replay = AsyncRecordReplayRouter(
+                settings.record_replay)
+
+    async def start(self):
+        raise NotImplementedError
+
+    async def _apply_settings_to_page(self):
+        """Apply common settings to existing page/context"""
+        if self.js_code:
+            await self.context.add_init_script(self.js_code)
+        await self.context.add_init_script(SETTLE_JS)
+
+        # Installed first so the interceptor's handler runs before it
+        if self.record_replay:
+            await self.record_replay.install(self.context)
+        if self.interceptor:
+            await self.interceptor.install(self.context)
+
+        if self.settings.stealth_mode:
+            try:
+                from playwright_stealth.stealth import Stealth
+                await Stealth().apply_stealth_async(page_or_context=self.page)
+            except ImportError:
+                logger.warn(
+                    "playwright-stealth not installed, stealth mode disabled")
+
+    async def setup_browser(self):
+        """Setup context and page with common settings"""
+        self.context = await self.browser.new_context(
+            viewport=None,
+            user_agent=DEFAULT_USER_AGENT
+        )
+
+        self.page = await self.context.new_page()
+        self.page.set_default_timeout(30000)
+        self.page.set_default_navigation_timeout(30000)
+
+        await self._apply_settings_to_page()
+
+    async def close(self):
+        """Close browser resources"""
+        if self.record_replay:
+            self.record_replay.close()
+        try:
+            if self.context:
+                await self.context.close()
+            if self.browser:
+                await self.browser.close()
+        except Exception as e:
+            logger.error(f"Error closing browser: {e}")
@@ -1,6 +1,5 @@
 from autosurfer.logger import logger
 from autosurfer.config import Config
-from playwright.sync_api import sync_playwright
 from .base import BaseBrowserAdapter, BrowserSettings
 
 
@@ -12,6 +11,7 @@ class BrowserBaseAdapter(BaseBrowserAdapter):
 
         try:
             from browserbase import Browserbase
+            from playwright.sync_api import sync_playwright
 
             # Validate environment variables
             api_key = Config.BROWSERBASE_API_KEY
@@ -1,7 +1,9 @@
 from typing import Optional
-from .base import BrowserAdapter, BrowserSettings
+from .base import AsyncBaseBrowserAdapter, BrowserAdapter, BrowserSettings
 from .playwright_adapter import PlaywrightAdapter
 from .browserbase_adapter import BrowserBaseAdapter
+from .async_playwright_adapter import AsyncPlaywrightAdapter
+from .async_browserbase_adapter import AsyncBrowserBaseAdapter
 
 
 def create_browser_adapter(provider: str = "playwright", settings: Optional[BrowserSettings] = None) -> BrowserAdapter:
@@ -15,3 +17,16 @@ def create_browser_adapter(provider: str = "playwright", settings: Optional[Brow
 
     adapter_class = adapters.get(provider, PlaywrightAdapter)
     return adapter_class(settings)
+
+
+async def create_async_browser_adapter(provider: str = "playwright", settings: Optional[BrowserSettings] = None) -> AsyncBaseBrowserAdapter:
+    """Create and start an asyncio browser adapter based on provider"""
+    settings = settings or BrowserSettings()
+
+    adapters = {
+        "playwright": AsyncPlaywrightAdapter,
+        "browserbase": AsyncBrowserBaseAdapter
+    }
+
+    adapter_class = adapters.get(provider, AsyncPlaywrightAdapter)
+    return await adapter_class(settings).start()
@@ -0,0 +1,278 @@
+from autosurfer.logger import logger
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+import re
+
+# Resource types the DOM-text-driven agent never reads
+DEFAULT_BLOCKED_RESOURCE_TYPES = ("image", "media", "font")
+
+# Ad, analytics and tracking hosts; subdomains are blocked too
+DEFAULT_BLOCKED_DOMAINS = (
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googletagservices.com",
+    "adservice.google.com",
+    "amazon-adsystem.com",
+    "adnxs.com",
+    "criteo.com",
+    "criteo.net",
+    "taboola.com",
+    "outbrain.com",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "hotjar.com",
+    "mixpanel.com",
+    "segment.io",
+    "fullstory.com",
+    "newrelic.com",
+    "nr-data.net",
+    "connect.facebook.net",
+    "ads-twitter.com",
+    "ads.linkedin.com",
+    "bat.bing.com",
+    "clarity.ms",
+)
+
+# Typical transfer sizes (bytes) of blocked responses, used to estimate the
+# bandwidth saved since an aborted request never reports its size
+TYPICAL_BYTES = {
+    "image": 40_000,
+    "media": 500_000,
+    "font": 30_000,
+    "script": 25_000,
+    "stylesheet": 15_000,
+    "xhr": 2_000,
+    "fetch": 2_000,
+}
+DEFAULT_TYPICAL_BYTES = 5_000
+
+
+class DomainTrie:
+    """Domain set matched by suffix: adding ``example.com`` matches
+    ``example.com`` and every subdomain of it, ``*.example.com`` only its
+    subdomains, in one walk over the host's labels from the TLD down."""
+
+    _END = ""
+    _SUBDOMAINS = "*"
+
+    def __init__(self, domains: Iterable[str] = ()):
+        self._root: Dict[str, Any] = {}
+        self.size = 0
+        for domain in domains:
+            self.add(domain)
+
+    def add(self, domain: str):
+        labels = domain.strip(".").lower().split(".")
+        marker = self._END
+        if labels[0] == "*":
+            labels, marker = labels[1:], self._SUBDOMAINS
+        node = self._root
+        for label in reversed(labels):
+            node = node.setdefault(label, {})
+        if marker not in node:
+            node[marker] = True
+            self.size += 1
+
+    def matches(self, host: str) -> bool:
+        node = self._root
+        labels = host.lower().split(".")
+        for depth, label in enumerate(reversed(labels), 1):
+            node = node.get(label)
+            if node is None:
+                return False
+            if self._END in node:
+                return True
+            if self._SUBDOMAINS in node and depth < len(labels):
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return self.size
+
+
+@dataclass
+class PolicyOverride:
+    """Adjustments applied when an objective matches ``pattern`` (a
+    case-insensitive regular expression)"""
+    pattern: str
+    allow_resource_types: Tuple[str, ...] = ()
+    block_resource_types: Tuple[str, ...] = ()
+    allow_domains: Tuple[str, ...] = ()
+    block_domains: Tuple[str, ...] = ()
+
+    def applies_to(self, objective: str) -> bool:
+        return re.search(self.pattern, objective, re.IGNORECASE) is not None
+
+
+# Objectives about visual content need the media they talk about
+DEFAULT_OVERRIDES = (
+    PolicyOverride(
+        pattern=r"\b(images?|photos?|pictures?|screenshots?|logos?|icons?|thumbnails?)\b",
+        allow_resource_types=("image",),
+    ),
+    PolicyOverride(
+        pattern=r"\b(videos?|audio|podcasts?|stream|watch|listen)\b",
+        allow_resource_types=("media",),
+    ),
+    PolicyOverride(
+        pattern=r"\b(fonts?|typefaces?)\b",
+        allow_resource_types=("font",),
+    ),
+)
+
+
+@dataclass
+class InterceptionPolicy:
+    """Declarative request-blocking policy for a browser context.
+
+    Requests of a ``block_resource_types`` type or to a host under one of
+    ``block_domains`` are aborted before they hit the network;
+    ``allow_domains`` wins over both. The first override whose pattern
+    matches the current objective adjusts the lists for that objective.
+    Top-level document navigations are never blocked.
+    """
+    block_resource_types: Tuple[str, ...] = DEFAULT_BLOCKED_RESOURCE_TYPES
+    block_domains: Tuple[str, ...] = DEFAULT_BLOCKED_DOMAINS
+    allow_domains: Tuple[str, ...] = ()
+    overrides: Tuple[PolicyOverride, ...] = DEFAULT_OVERRIDES
+
+    @classmethod
+    def disabled(cls) -> "InterceptionPolicy":
+        return cls(block_resource_types=(), block_domains=(), overrides=())
+
+    def resolve(self, objective: Optional[str] = None) -> "CompiledPolicy":
+        """Effective rules for ``objective``"""
+        types = set(self.block_resource_types)
+        blocked = list(self.block_domains)
+        allowed = list(self.allow_domains)
+        matched = None
+        if objective:
+            matched = next(
+                (o for o in self.overrides if o.applies_to(objective)), None)
+        if matched:
+            types.difference_update(matched.allow_resource_types)
+            types.update(matched.block_resource_types)
+            blocked.extend(matched.block_domains)
+            allowed.extend(matched.allow_domains)
+        return CompiledPolicy(
+            resource_types=frozenset(types),
+            blocked=DomainTrie(blocked),
+            allowed=DomainTrie(allowed),
+            override=matched.pattern if matched else None,
+        )
+
+
+@dataclass
+class CompiledPolicy:
+    resource_types: FrozenSet[str]
+    blocked: DomainTrie
+    allowed: DomainTrie
+    override: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        return bool(self.resource_types or len(self.blocked))
+
+    def block_reason(self, url: str, resource_type: str) -> Optional[str]:
+        """``type:<resource type>``, ``domain`` or None to let it through"""
+        host = urlsplit(url).hostname or ""
+        if host and self.allowed.matches(host):
+            return None
+        if resource_type in self.resource_types:
+            return f"type:{resource_type}"
+        if host and self.blocked.matches(host):
+            return "domain"
+        return None
+
+
+@dataclass
+class InterceptionStats:
+    allowed_requests: int = 0
+    blocked_requests: int = 0
+    # From TYPICAL_BYTES, not measured: aborted requests report no size
+    estimated_bytes_saved: int = 0
+    by_reason: Dict[str, int] = field(default_factory=dict)
+
+    def record_blocked(self, reason: str, resource_type: str):
+        self.blocked_requests += 1
+        self.estimated_bytes_saved += TYPICAL_BYTES.get(resource_type,
+                                                        DEFAULT_TYPICAL_BYTES)
+        self.by_reason[reason] = self.by_reason.get(reason, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        total = self.allowed_requests + self.blocked_requests
+        return {
+            "blocked_requests": self.blocked_requests,
+            "allowed_requests": self.allowed_requests,
+            "blocked_share": round(self.blocked_requests / total, 3) if total else 0.0,
+            "estimated_bytes_saved": self.estimated_bytes_saved,
+            "by_reason": dict(self.by_reason),
+        }
+
+
+class BaseRequestInterceptor:
+    """Applies an InterceptionPolicy to a context through ``context.route``.
+
+    Passed-through requests go to ``route.fallback()`` so other route
+    handlers on the context still see them. Note that Playwright disables
+    the HTTP cache of a context while any route is installed.
+    """
+
+    def __init__(self, policy: InterceptionPolicy):
+        self.policy = policy
+        self.rules = policy.resolve()
+        self.stats = InterceptionStats()
+
+    def set_objective(self, objective: Optional[str]):
+        """Switch to the rules for ``objective`` and start counting afresh"""
+        self.rules = self.policy.resolve(objective)
+        self.stats = InterceptionStats()
+        if self.rules.override:
+            logger.debug(
+                f"Interception override for objective: {self.rules.override}")
+
+    def _decide(self, request: Any) -> Optional[str]:
+        resource_type = request.resource_type
+        if resource_type == "document":
+            try:
+                if request.frame.parent_frame is None:
+                    return None
+            except Exception:
+                # Service worker requests have no frame
+                pass
+        reason = self.rules.block_reason(request.url, resource_type)
+        if reason:
+            self.stats.record_blocked(reason, resource_type)
+        else:
+            self.stats.allowed_requests += 1
+        return reason
+
+
+class RequestInterceptor(BaseRequestInterceptor):
+    def install(self, context: Any):
+        if self.rules.active or self.policy.overrides:
+            context.route("**/*", self._handle)
+
+    def _handle(self, route: Any):
+        if self._decide(route.request):
+            route.abort("blockedbyclient")
+        else:
+            route.fallback()
+
+
+class AsyncRequestInterceptor(BaseRequestInterceptor):
+    """Asyncio counterpart of RequestInterceptor"""
+
+    async def install(self, context: Any):
+        if self.rules.active or self.policy.overrides:
+            await context.route("**/*", self._handle)
+
+    async def _handle(self, route: Any):
+        if self._decide(route.request):
+            await route.abort("blockedbyclient")
+        else:
+            await route.fallback()
@@ -1,7 +1,28 @@
-from playwright.sync_api import sync_playwright, Playwright, Browser
+from typing import TYPE_CHECKING, List
 from autosurfer.logger import logger
 from .base import BaseBrowserAdapter, BrowserSettings
 
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser, Playwright
+
+DEFAULT_BROWSER_ARGS = [
+    "--start-maximized",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-web-security",
+    "--disable-features=VizDisplayCompositor"
+]
+
+
+def ignored_default_args(settings: BrowserSettings) -> List[str]:
+    """Playwright turns the back/forward cache off by default. History-back
+    navigations (see navigation.Navigator) are much cheaper with it on, but
+    pages it restores bypass ``context.route``, so it stays off when
+    requests are intercepted or replayed"""
+    if settings.interception or settings.record_replay:
+        return []
+    return ["--disable-back-forward-cache"]
+
 
 class PlaywrightAdapter(BaseBrowserAdapter):
     """Playwright browser adapter"""
@@ -9,21 +30,18 @@ class PlaywrightAdapter(BaseBrowserAdapter):
     def __init__(self, settings: BrowserSettings):
         super().__init__(settings)
 
-        self.playwright: Playwright = sync_playwright().start()
+        # Imported here so importing the package does not load Playwright
+        from playwright.sync_api import sync_playwright
+        self.playwright: "Playwright" = sync_playwright().start()
 
-        browser_args = [
-            "--start-maximized",
-            "--no-sandbox",
-            "--disable-dev-shm-usage",
-            "--disable-web-security",
-            "--disable-features=VizDisplayCompositor"
-        ]
+        browser_args = list(DEFAULT_BROWSER_ARGS)
         if settings.args:
             browser_args.extend(settings.args)
 
-        self.browser: Browser = self.playwright.chromium.launch(
+        self.browser: "Browser" = self.playwright.chromium.launch(
             headless=settings.headless,
-            args=browser_args
+            args=browser_args,
+            ignore_default_args=ignored_default_args(settings)
         )
 
         self.setup_browser()
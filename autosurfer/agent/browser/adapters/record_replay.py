@@ -0,0 +1,326 @@
+from autosurfer.logger import logger
+from autosurfer.config import Config
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import fnmatch
+import hashlib
+import json
+import os
+import threading
+
+RECORD = "record"
+REPLAY = "replay"
+
+# Query parameters that change between visits without changing the response
+DEFAULT_NOISE_PARAMS = (
+    "utm_*", "fbclid", "gclid", "msclkid", "_ga", "_gl", "mc_eid",
+    "_", "cb", "cachebust", "cache_bust", "ts", "timestamp", "nonce",
+    "rand", "random", "r",
+)
+
+# Headers that no longer describe the body, which is stored decoded and whole
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+ARCHIVE_VERSION = 1
+
+
+def _default_archive_path() -> Path:
+    if Config.NETWORK_ARCHIVE_PATH:
+        return Path(Config.NETWORK_ARCHIVE_PATH)
+    # project root is four levels up from this file (autosurfer/agent/browser/adapters/)
+    return Path(__file__).resolve().parents[4] / ".temp" / "network_archive"
+
+
+@dataclass
+class MatchPolicy:
+    """How a request is turned into an archive key.
+
+    Query parameters named in ``ignore_params`` (shell-style patterns) are
+    dropped and the rest sorted, so tracking and cache-busting noise does not
+    cause misses. With ``loose_fallback`` a request that still misses is
+    served the response recorded for the same method, host and path.
+    """
+    ignore_params: Tuple[str, ...] = DEFAULT_NOISE_PARAMS
+    ignore_query: bool = False
+    match_post_body: bool = True
+    loose_fallback: bool = True
+
+    def _keep(self, name: str) -> bool:
+        return not any(fnmatch.fnmatchcase(name.lower(), pattern) for pattern in self.ignore_params)
+
+    def normalize_url(self, url: str) -> str:
+        parts = urlsplit(url)
+        query = ""
+        if not self.ignore_query:
+            params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                      if self._keep(k)]
+            query = urlencode(sorted(params))
+        return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path or "/", query, ""))
+
+    def key(self, method: str, url: str, post_data: Optional[bytes] = None) -> str:
+        key = f"{method.upper()} {self.normalize_url(url)}"
+        if post_data and self.match_post_body:
+            key += f" body:{hashlib.sha1(post_data).hexdigest()[:16]}"
+        return key
+
+    @staticmethod
+    def loose_key(method: str, url: str) -> str:
+        parts = urlsplit(url)
+        return f"{method.upper()} {parts.scheme}://{parts.netloc.lower()}{parts.path or '/'}"
+
+
+@dataclass
+class RecordReplay:
+    """Record every response of a context to ``path``, or replay them with
+    no network access. Misses in replay are aborted, or sent to the network
+    when ``on_miss`` is "fallback"."""
+    mode: str = REPLAY
+    path: Optional[Path] = None
+    match: MatchPolicy = field(default_factory=MatchPolicy)
+    on_miss: str = "abort"
+
+
+@dataclass
+class ArchiveStats:
+    recorded: int = 0
+    hits: int = 0
+    loose_hits: int = 0
+    misses: int = 0
+
+    def summary(self) -> Dict[str, Any]:
+        served = self.hits + self.loose_hits
+        total = served + self.misses
+        return {
+            "recorded": self.recorded,
+            "hits": self.hits,
+            "loose_hits": self.loose_hits,
+            "misses": self.misses,
+            "hit_rate": round(served / total, 3) if total else 0.0,
+        }
+
+
+class NetworkArchive:
+    """Content-addressed response archive.
+
+    ``index.json`` maps request keys to the responses recorded for them (in
+    order, so a polled endpoint replays its sequence and then repeats the
+    last one); bodies are stored once per SHA-256 under ``bodies/``. The
+    archive is shared by every context using its path, so the position in
+    each sequence is kept by the caller, one ``cursor`` per replay session.
+    """
+
+    def __init__(self, path: Path, match: MatchPolicy):
+        self.path = Path(path)
+        self.match = match
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._loose: Dict[str, str] = {}
+        # Keys recorded by this process, whose older responses were replaced
+        self._recorded: Set[str] = set()
+        self._bodies: Dict[str, bytes] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.stats = ArchiveStats()
+        self._load()
+
+    def _load(self):
+        index = self.path / "index.json"
+        try:
+            with open(index, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        if data.get("version") != ARCHIVE_VERSION:
+            logger.warn(f"Ignoring network archive {index} of another version")
+            return
+        self._entries = data["entries"]
+        for key, responses in self._entries.items():
+            first = responses[0]
+            self._loose.setdefault(
+                self.match.loose_key(first["method"], first["url"]), key)
+
+    def _body_path(self, digest: str) -> Path:
+        return self.path / "bodies" / digest[:2] / digest
+
+    def record(self, method: str, url: str, post_data: Optional[bytes],
+               status: int, headers: Dict[str, str], body: bytes):
+        digest = hashlib.sha256(body).hexdigest()
+        body_path = self._body_path(digest)
+        if not body_path.exists():
+            body_path.parent.mkdir(parents=True, exist_ok=True)
+            body_path.write_bytes(body)
+        entry = {
+            "method": method,
+            "url": url,
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS},
+            "body": digest,
+        }
+        key = self.match.key(method, url, post_data)
+        with self._lock:
+            if key not in self._recorded:
+                # First response this run replaces what an older recording had
+                self._entries[key] = []
+                self._recorded.add(key)
+            self._entries[key].append(entry)
+            self._loose.setdefault(self.match.loose_key(method, url), key)
+            self.stats.recorded += 1
+            self._dirty = True
+
+    def lookup(self, method: str, url: str, post_data: Optional[bytes],
+               cursor: Dict[str, int]) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        """Next recorded response for the request and its body, or None;
+        ``cursor`` holds the session's position in each sequence"""
+        key = self.match.key(method, url, post_data)
+        with self._lock:
+            responses = self._entries.get(key)
+            if responses:
+                self.stats.hits += 1
+            elif self.match.loose_fallback:
+                key = self._loose.get(self.match.loose_key(method, url))
+                responses = self._entries.get(key) if key else None
+                if responses:
+                    self.stats.loose_hits += 1
+            if not responses:
+                self.stats.misses += 1
+                return None
+            position = cursor.get(key, 0)
+            cursor[key] = position + 1
+            entry = responses[min(position, len(responses) - 1)]
+
+            body = self._bodies.get(entry["body"])
+            if body is None:
+                body = self._body_path(entry["body"]).read_bytes()
+                self._bodies[entry["body"]] = body
+        return entry, body
+
+    def save(self):
+        """Write the index atomically (no-op if nothing was recorded)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.path.mkdir(parents=True, exist_ok=True)
+            index = self.path / "index.json"
+            tmp = index.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": ARCHIVE_VERSION,
+                          "entries": self._entries}, f)
+            os.replace(tmp, index)
+            self._dirty = False
+        logger.info(
+            f"Network archive saved to {self.path} ({len(self._entries)} requests)")
+
+
+_archives: Dict[Path, NetworkArchive] = {}
+
+
+def open_archive(settings: RecordReplay) -> NetworkArchive:
+    """Process-wide archive per path, shared by every context using it"""
+    path = Path(settings.path or _default_archive_path()).resolve()
+    if path not in _archives:
+        _archives[path] = NetworkArchive(path, settings.match)
+    return _archives[path]
+
+
+class BaseRecordReplay:
+    """Serves or records a context's traffic through ``context.route``.
+
+    Install it before other route handlers: Playwright runs the most
+    recently added handler first, so a blocking policy still decides before
+    anything is recorded or replayed.
+    """
+
+    def __init__(self, settings: RecordReplay):
+        if settings.mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown record/replay mode: {settings.mode}")
+        self.settings = settings
+        self.archive = open_archive(settings)
+        # Every replay session starts each recorded sequence from the top
+        self.cursor: Dict[str, int] = {}
+
+    @property
+    def recording(self) -> bool:
+        return self.settings.mode == RECORD
+
+    def _replayed(self, request: Any) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        return self.archive.lookup(request.method, request.url, request.post_data_buffer, self.cursor)
+
+    def _fulfill_args(self, entry: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+        return {"status": entry["status"], "headers": entry["headers"], "body": body}
+
+    def _miss(self, request: Any):
+        logger.debug(f"Replay miss: {request.method} {request.url}")
+
+
+class RecordReplayRouter(BaseRecordReplay):
+    def install(self, context: Any):
+        self.cursor = {}
+        context.route("**/*", self._handle)
+
+    def _handle(self, route: Any):
+        request = route.request
+        if self.recording:
+            # Redirects are recorded as they are so the browser follows them
+            try:
+                response = route.fetch(max_redirects=0)
+                body = response.body()
+            except Exception as e:
+                logger.debug(f"Not recorded: {request.url} ({e})")
+                route.abort("failed")
+                return
+            self.archive.record(request.method, request.url, request.post_data_buffer,
+                                response.status, response.headers, body)
+            route.fulfill(response=response, body=body)
+            return
+
+        replayed = self._replayed(request)
+        if replayed:
+            route.fulfill(**self._fulfill_args(*replayed))
+            return
+        self._miss(request)
+        if self.settings.on_miss == "fallback":
+            route.fallback()
+        else:
+            route.abort("internetdisconnected")
+
+    def close(self):
+        self.archive.save()
+        logger.info(f"Record/replay ({self.settings.mode}): {self.archive.stats.summary()}")
+
+
+class AsyncRecordReplayRouter(BaseRecordReplay):
+    """Asyncio counterpart of RecordReplayRouter"""
+
+    async def install(self, context: Any):
+        self.cursor = {}
+        await context.route("**/*", self._handle)
+
+    async def _handle(self, route: Any):
+        request = route.request
+        if self.recording:
+            try:
+                response = await route.fetch(max_redirects=0)
+                body = await response.body()
+            except Exception as e:
+                logger.debug(f"Not recorded: {request.url} ({e})")
+                await route.abort("failed")
+                return
+            self.archive.record(request.method, request.url, request.post_data_buffer,
+                                response.status, response.headers, body)
+            await route.fulfill(response=response, body=body)
+            return
+
+        replayed = self._replayed(request)
+        if replayed:
+            await route.fulfill(**self._fulfill_args(*replayed))
+            return
+        self._miss(request)
+        if self.settings.on_miss == "fallback":
+            await route.fallback()
+        else:
+            await route.abort("internetdisconnected")
+
+    def close(self):
+        self.archive.save()
+        logger.info(f"Record/replay ({self.settings.mode}): {self.archive.stats.summary()}")
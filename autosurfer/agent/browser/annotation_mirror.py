@@ -0,0 +1,75 @@
+from pathlib import Path
+from typing import Any, Dict, Optional
+import hashlib
+from autosurfer.agent.browser.element_table import ElementTable
+
+ANNOTATOR_JS_PATH = Path(__file__).parent / "dom" / "annotateDom.js"
+
+# Read once per process. The content hash is stamped into the script so a
+# document running another build (older injection, stale init script) can be
+# told apart from one that is current.
+_ANNOTATOR_SOURCE = ANNOTATOR_JS_PATH.read_text()
+ANNOTATOR_VERSION = hashlib.sha1(_ANNOTATOR_SOURCE.encode()).hexdigest()[:12]
+ANNOTATOR_JS = _ANNOTATOR_SOURCE.replace(
+    "__ANNOTATOR_VERSION__", ANNOTATOR_VERSION)
+
+# Render in the page and return only what changed since `sync`;
+# { annotatorMissing: true } if this document lacks the current annotator
+RENDER_DELTA_JS = """
+(args) => {
+    const mgr = window.domAnnotator;
+    if (!mgr || mgr.version !== args.version) return { annotatorMissing: true };
+    if (!mgr._autoHandler) mgr.enableAutoRefresh(150);
+    return mgr.renderDelta(args.sync);
+}
+"""
+
+
+def render_delta_args(sync: Dict[str, Any]) -> Dict[str, Any]:
+    """Argument passed to RENDER_DELTA_JS"""
+    return {"version": ANNOTATOR_VERSION, "sync": sync}
+
+
+class AnnotationMirror:
+    """Python-side copy of the in-page element registry.
+
+    The page sends either a full element list or the elements added, changed
+    and removed since the (session, version) we last acknowledged; a new
+    document or a reinjected annotator has a different session, which makes
+    the page fall back to a full resync on its own. Element lists arrive in
+    the columnar format and are kept as an ElementTable.
+    """
+
+    def __init__(self):
+        self.session: Optional[str] = None
+        self.version: Optional[int] = None
+        self.table = ElementTable()
+        self.last_delta_size: int = 0
+
+    def sync_args(self) -> Dict[str, Any]:
+        return {"session": self.session, "version": self.version}
+
+    def apply(self, delta: Dict[str, Any]) -> ElementTable:
+        """Apply a delta from ``renderDelta`` and return the current elements"""
+        if delta.get("full"):
+            self.table = ElementTable.from_columns(delta["elements"])
+            self.last_delta_size = len(self.table)
+        else:
+            added = ElementTable.from_columns(delta["added"])
+            changed = ElementTable.from_columns(delta["changed"])
+            self.table = self.table.merged([added, changed], delta["removed"])
+            self.last_delta_size = len(
+                added) + len(changed) + len(delta["removed"])
+
+        self.session = delta["session"]
+        self.version = delta["version"]
+        return self.table
+
+    def elements(self) -> ElementTable:
+        """Elements in annotator order: priority first, stable id breaks ties"""
+        return self.table
+
+    def reset(self):
+        self.session = None
+        self.version = None
+        self.table = ElementTable()
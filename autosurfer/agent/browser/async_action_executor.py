@@ -0,0 +1,469 @@
+from autosurfer.logger import logger
+from autosurfer.config import Config
+from autosurfer.llm.plan_stream import AsyncPlanStream
+from autosurfer.llm.response_schema.browser_actions import ActionItem, NextActions
+from autosurfer.agent.browser.action_executor import (
+    ELEMENT_COUNT_POLL_MS,
+    FILL_FORM_JS,
+    RESOLVE_ELEMENT_JS,
+    SCROLL_AND_SETTLE_JS,
+    SCROLL_INFO_JS,
+    action_args,
+    check_form_results,
+    count_reached,
+    scroll_args,
+    stale_action,
+    url_matcher,
+)
+from autosurfer.agent.browser import action_errors
+from autosurfer.agent.browser.action_errors import (
+    DETACHED,
+    NAVIGATION,
+    ActionExecutionError,
+    ElementNotFound,
+)
+from autosurfer.agent.browser.annotation_mirror import (
+    ANNOTATOR_JS,
+    AnnotationMirror,
+    RENDER_DELTA_JS,
+    render_delta_args,
+)
+from autosurfer.agent.browser.element_table import ElementTable
+from autosurfer.agent.browser.navigation import NOOP, AsyncNavigator
+from autosurfer.agent.browser.settle import AsyncPageSettler, SettleResult
+from autosurfer.agent.browser.page_snapshot import PageSnapshot, SNAPSHOT_JS, snapshot_args
+from autosurfer.agent.browser.selector_resolver import (
+    SELECTOR_TIMEOUT_MS,
+    Candidate,
+    SelectorStats,
+    click_selector_candidates,
+    combined_locator,
+    fill_selector_candidates,
+    get_selector_cache,
+    host_of,
+    playwright_selector,
+    visible_locator,
+)
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, Locator, Page
+
+
+class AsyncBrowserActionExecutor:
+    """Asyncio counterpart of BrowserActionExecutor built on playwright.async_api"""
+
+    def __init__(self, page: "Page", browser_session: "Browser"):
+        self.page = page
+        self.browser = browser_session
+        self._dispatch = {
+            "goto": self._goto,
+            "click": self._click,
+            "fill": self._fill,
+            "click_element": self._click_element,
+            "fill_element": self._fill_element,
+            "fill_form": self._fill_form,
+            "press": self._press,
+            "wait": self._wait,
+            "wait_for_selector": self._wait_for_selector,
+            "wait_for_text": self._wait_for_text,
+            "wait_for_url": self._wait_for_url,
+            "wait_for_network_quiet": self._wait_for_network_quiet,
+            "wait_for_element_count": self._wait_for_element_count,
+            "scroll": self._scroll,
+            "scroll_to_bottom": self._scroll_to_bottom,
+            "scroll_to_top": self._scroll_to_top,
+            "more_elements": self._more_elements,
+            "done": self._done,
+        }
+
+        # Python-side copy of the in-page element registry (delta transfer)
+        self.annotations = AnnotationMirror()
+
+        # Per-field results of the last fill_form action
+        self.last_form_results: List[Dict[str, Any]] = []
+
+        # Which selector strategies win their races, in this run and (per
+        # host) across runs
+        self.selector_stats = SelectorStats()
+        self.selector_cache = get_selector_cache()
+
+        # Event-driven replacement for fixed sleeps and networkidle waits
+        self.settler = AsyncPageSettler(page)
+        self.last_settle: Optional[SettleResult] = None
+
+        # Skips redundant gotos and prefers history back (see navigation)
+        self.navigator = AsyncNavigator(page)
+
+        # Wall time spent in wait actions since the plan started
+        self.wait_ms: float = 0.0
+
+        # Scroll info reported by the last scroll action
+        self.last_scroll: Optional[Dict[str, Any]] = None
+
+    async def settle(self, timeout_ms: Optional[int] = None) -> SettleResult:
+        """Wait until the page is stable (or ``timeout_ms`` passes) and
+        report how long that took."""
+        self.last_settle = await self.settler.settle(timeout_ms)
+        return self.last_settle
+
+    async def execute(self, next_actions: NextActions, start_at: int = 0):
+        actions = next_actions.actions
+        if start_at == 0:
+            self.wait_ms = 0.0
+        for index in range(start_at, len(actions)):
+            if await self._run(index, actions[index]):
+                return
+
+    async def execute_stream(self, stream: AsyncPlanStream) -> NextActions:
+        self.wait_ms = 0.0
+        planned_url = self.page.url
+        navigated = False
+        items = stream.__aiter__()
+        index = 0
+        try:
+            async for item in items:
+                if not navigated and stale_action(item.action, planned_url, self.page.url):
+                    logger.info(
+                        f"Page changed to {self.page.url} under the plan; "
+                        f"cancelling it from action {index + 1} ({item.action.type})")
+                    return NextActions(actions=stream.received[:index])
+                try:
+                    if await self._run(index, item):
+                        return stream.current_plan()
+                except ActionExecutionError as e:
+                    async for _ in items:
+                        pass
+                    e.plan = stream.current_plan()
+                    raise
+                navigated = navigated or item.action.type == "goto"
+                index += 1
+            return stream.current_plan()
+        except ActionExecutionError:
+            raise
+        except Exception as e:
+            # The response did not parse or validate before any action
+            # arrived: there is no plan to retry from (``plan`` stays None)
+            logger.error(f"Planner response is not a valid plan: {str(e).splitlines()[0]}")
+            raise ActionExecutionError(0, "plan", e) from e
+        finally:
+            await items.aclose()
+            await stream.aclose()
+
+    async def _run(self, index: int, item: ActionItem) -> bool:
+        logger.info(f"[Agent Thought] {item.thought}")
+        fn = self._dispatch.get(item.action.type)
+        if not fn:
+            logger.warn(f"Unknown action type: {item.action.type}")
+            return False
+
+        try:
+            await fn(*action_args(item.action))
+            # Both end the plan: what follows a view request was planned
+            # without seeing the elements it asks for
+            if item.action.type in ("done", "more_elements"):
+                return True
+
+            await self.settle()
+
+        except Exception as e:
+            logger.error(f"Failed to execute {item.action.type}: {e}")
+            raise ActionExecutionError(index, item.action.type, e) from e
+        return False
+
+    async def recover(self, error: ActionExecutionError):
+        logger.info(
+            f"Recovering from {error.kind} failure before retrying action {error.index + 1}")
+        if error.kind == DETACHED:
+            # Nothing to wait for: the retry resolves the element again
+            return
+        if error.kind == NAVIGATION:
+            # Wait for the document that won the race to commit
+            try:
+                await self.page.wait_for_url(
+                    lambda _: True, wait_until="domcontentloaded", timeout=Config.SETTLE_TIMEOUT_MS)
+            except Exception as e:
+                logger.debug(f"Waiting for navigation failed: {e}")
+        await self.settle()
+
+    async def _evaluate_annotated(self, script: str, arg: Dict[str, Any]) -> Dict[str, Any]:
+        """Evaluate a script that needs the current annotator, injecting it
+        only when the page reports it missing or outdated"""
+        payload = await self.page.evaluate(script, arg)
+        if payload.get("annotatorMissing"):
+            await self.page.evaluate(ANNOTATOR_JS)
+            payload = await self.page.evaluate(script, arg)
+        return payload
+
+    async def annotate_ui(self):
+        # Ensure page settled
+        await self.settle()
+
+        # Render and fetch only the elements that changed since the last call
+        delta = await self._evaluate_annotated(
+            RENDER_DELTA_JS, render_delta_args(self.annotations.sync_args()))
+        if delta.get("annotatorMissing"):
+            return ElementTable()
+        return self.annotations.apply(delta)
+
+    async def snapshot(self, scan_captcha: bool = False) -> PageSnapshot:
+        """Capture URL, title, fresh elements, scroll info, captcha signals and
+        DOM/UI digests in one in-page evaluate."""
+        await self.settle()
+
+        payload = await self._evaluate_annotated(
+            SNAPSHOT_JS, snapshot_args(scan_captcha, self.annotations.sync_args()))
+
+        elements = self.annotations.apply(payload["elementsDelta"])
+        return PageSnapshot.from_payload(payload, elements)
+
+    async def remove_annotation(self):
+        try:
+            await self.page.evaluate(
+                "() => window.domAnnotator ? window.domAnnotator.clear() : (window.clearInteractiveHighlights && window.clearInteractiveHighlights())")
+        except Exception:
+            pass
+
+    async def _goto(self, url):
+        logger.info(f"Navigating to: {url}")
+        result = await self.navigator.goto(url)
+        if result.strategy != NOOP:
+            await self.settle()
+
+    async def _selector_is_valid(self, selector: str) -> bool:
+        try:
+            await self.page.locator(selector).count()
+            return True
+        except action_errors.Error:
+            return False
+
+    async def _race(self, candidates: List[Candidate]) -> Tuple[Optional[str], Optional["Locator"]]:
+        try:
+            await combined_locator(self.page, candidates).wait_for(
+                state="visible", timeout=SELECTOR_TIMEOUT_MS)
+        except action_errors.TimeoutError:
+            return None, None
+        except action_errors.Error:
+            valid = [c for c in candidates if await self._selector_is_valid(c[1])]
+            if not valid or len(valid) == len(candidates):
+                raise
+            return await self._race(valid)
+
+        for strategy, selector in candidates:
+            locator = visible_locator(self.page, selector)
+            if await locator.count():
+                return strategy, locator.first
+        return None, None
+
+    async def _race_selectors(self, selector: str, candidates: List[Candidate]) -> Optional["Locator"]:
+        host = host_of(self.page.url)
+        candidates, learned = self.selector_cache.order(
+            host, selector, candidates)
+        start = time.monotonic()
+
+        strategy, locator = None, None
+        raced = candidates
+        if learned:
+            raced = candidates[:1]
+            probe = visible_locator(self.page, candidates[0][1])
+            try:
+                if await probe.count():
+                    strategy, locator = candidates[0][0], probe.first
+            except action_errors.Error:
+                pass
+        if not locator:
+            raced = candidates
+            strategy, locator = await self._race(candidates)
+
+        elapsed_ms = (time.monotonic() - start) * 1000
+        self.selector_stats.record(raced, strategy, elapsed_ms)
+        self.selector_cache.record(host, selector, strategy, elapsed_ms)
+        if strategy:
+            logger.debug(
+                f"Selector strategy '{strategy}' won for {selector} in {elapsed_ms:.0f}ms")
+        return locator
+
+    async def _click(self, selector: str):
+        logger.info(f"Clicking: {selector}")
+
+        locator = await self._race_selectors(
+            selector, click_selector_candidates(selector))
+        if not locator:
+            raise ElementNotFound(
+                f"Could not click element with selector: {selector}")
+        await locator.click(timeout=SELECTOR_TIMEOUT_MS)
+
+    async def _fill(self, selector: str, value: str):
+        logger.info(f"Filling {selector} with: {value}")
+
+        locator = await self._race_selectors(
+            selector, fill_selector_candidates(selector))
+        if not locator:
+            raise ElementNotFound(
+                f"Could not fill element with selector: {selector}")
+        await locator.fill(value, timeout=SELECTOR_TIMEOUT_MS)
+
+    async def _resolve_element(self, element: int):
+        handle = await self.page.evaluate_handle(
+            RESOLVE_ELEMENT_JS, [element, self.annotations.session])
+        found = handle.as_element()
+        if not found:
+            await handle.dispose()
+        return found
+
+    def _fallback_selector(self, element: int, selector: Optional[str]) -> str:
+        if selector:
+            return selector
+        row = self.annotations.elements().find(element)
+        if row and row.xpath:
+            return row.xpath
+        raise ElementNotFound(
+            f"Element [{element}] is no longer on the page")
+
+    async def _click_element(self, element: int, selector: Optional[str] = None):
+        logger.info(f"Clicking element [{element}]")
+        handle = await self._resolve_element(element)
+        if handle:
+            await handle.click(timeout=SELECTOR_TIMEOUT_MS)
+            return
+        logger.debug(
+            f"Element [{element}] is stale, falling back to selectors")
+        await self._click(self._fallback_selector(element, selector))
+
+    async def _fill_element(self, element: int, value: str, selector: Optional[str] = None):
+        logger.info(f"Filling element [{element}] with: {value}")
+        handle = await self._resolve_element(element)
+        if handle:
+            await handle.fill(value, timeout=SELECTOR_TIMEOUT_MS)
+            return
+        logger.debug(
+            f"Element [{element}] is stale, falling back to selectors")
+        await self._fill(self._fallback_selector(element, selector), value)
+
+    async def _fill_form(self, fields: List[Any]):
+        logger.info(f"Filling form with {len(fields)} fields")
+        self.last_form_results = await self.page.evaluate(FILL_FORM_JS, {
+            "session": self.annotations.session,
+            "fields": [field.model_dump() for field in fields],
+        })
+        check_form_results(fields, self.last_form_results)
+
+    async def _press(self, key: str):
+        logger.info(f"Pressing key: {key}")
+        await self.page.keyboard.press(key)
+
+    async def _wait(self, seconds: float):
+        logger.info(f"Waiting for {seconds} seconds")
+        await asyncio.sleep(seconds)
+        self.wait_ms += seconds * 1000
+
+    async def _wait_until(self, description: str, wait: Callable[[int], Awaitable[Any]], timeout: float):
+        logger.info(f"Waiting for {description} (up to {timeout}s)")
+        start = time.monotonic()
+        try:
+            await wait(int(timeout * 1000))
+            logger.info(
+                f"Done waiting for {description} after {(time.monotonic() - start) * 1000:.0f}ms")
+        except action_errors.TimeoutError:
+            logger.warn(f"Timed out after {timeout}s waiting for {description}")
+            raise
+        finally:
+            self.wait_ms += (time.monotonic() - start) * 1000
+
+    async def _wait_for_selector(self, selector: str, state: str = "visible", timeout: float = 10):
+        locator = self.page.locator(playwright_selector(selector)).first
+        await self._wait_until(f"{selector} to be {state}",
+                               lambda ms: locator.wait_for(state=state, timeout=ms), timeout)
+
+    async def _wait_for_text(self, text: str, timeout: float = 10):
+        locator = self.page.get_by_text(text).first
+        await self._wait_until(f'text "{text}"',
+                               lambda ms: locator.wait_for(state="visible", timeout=ms), timeout)
+
+    async def _wait_for_url(self, url: str, timeout: float = 10):
+        await self._wait_until(f"URL matching {url}", lambda ms: self.page.wait_for_url(
+            url_matcher(url), wait_until="domcontentloaded", timeout=ms), timeout)
+
+    async def _wait_for_network_quiet(self, timeout: float = 10):
+        start = time.monotonic()
+        result = await self.settle(int(timeout * 1000))
+        self.wait_ms += (time.monotonic() - start) * 1000
+        if not result.stable:
+            logger.warn(
+                f"Network not quiet after {timeout}s ({result.pending_requests} requests pending)")
+
+    async def _wait_for_element_count(self, selector: str, count: Optional[int] = None, timeout: float = 10):
+        locator = self.page.locator(playwright_selector(selector))
+        initial = await locator.count()
+        target = "to change" if count is None else f"to reach {count}"
+
+        async def wait(ms: int):
+            deadline = time.monotonic() + ms / 1000
+            while not count_reached(await locator.count(), count, initial):
+                if time.monotonic() >= deadline:
+                    raise action_errors.TimeoutError(
+                        f"Timed out after {ms}ms: count of {selector} ({initial}) {target}")
+                await asyncio.sleep(ELEMENT_COUNT_POLL_MS / 1000)
+
+        await self._wait_until(f"count of {selector} ({initial}) {target}", wait, timeout)
+
+    async def _scroll_and_settle(self, **scroll: Any) -> Dict[str, Any]:
+        """Scroll, wait for the scroll to end and re-render the annotations in
+        one evaluate (see dom/scrollAndSettle.js)"""
+        payload = await self._evaluate_annotated(
+            SCROLL_AND_SETTLE_JS, scroll_args(self.annotations.sync_args(), **scroll))
+        if payload.get("annotatorMissing"):
+            return payload
+        self.annotations.apply(payload["elementsDelta"])
+        self.last_scroll = payload["scroll"]
+        logger.debug(
+            f"Scroll settled by {payload['settledBy']} in {payload['elapsedMs']}ms")
+        return payload
+
+    async def _scroll(self, direction: str, selector: Optional[str] = None):
+        if selector:
+            logger.info(f"Scrolling to element: {selector}")
+            result = await self._scroll_and_settle(selector=selector)
+            if result.get("found") is not False:
+                return
+
+            # The in-page lookup missed; try Playwright's selector engines
+            try:
+                locator = await self._race_selectors(
+                    selector, click_selector_candidates(selector))
+                if not locator:
+                    raise Exception("no visible match")
+                await locator.scroll_into_view_if_needed()
+                await self._scroll_and_settle()
+            except Exception as e:
+                logger.warn(f"Could not scroll to {selector}: {e}")
+                # Fallback to general scroll
+                await self._scroll_and_settle(direction=direction, by=500)
+        else:
+            logger.info(f"Scrolling {direction}")
+            result = await self._scroll_and_settle(direction=direction)
+            logger.info(
+                f"Scrolled {direction} by {abs(result.get('scrolledBy', 0))}px")
+
+    async def get_scroll_info(self):
+        """Get current scroll position and page dimensions"""
+        return await self.page.evaluate(SCROLL_INFO_JS)
+
+    async def _scroll_to_bottom(self):
+        """Scroll to the very bottom of the page"""
+        logger.info("Scrolling to bottom of page")
+        await self._scroll_and_settle(to="bottom")
+
+    async def _scroll_to_top(self):
+        """Scroll to the very top of the page"""
+        logger.info("Scrolling to top of page")
+        await self._scroll_and_settle(to="top")
+
+    async def _more_elements(self, page: int, kind: Optional[str], text: Optional[str]):
+        logger.info(
+            f"Element list requested: page {page}, kind {kind or 'any'}, text {text or 'any'}")
+
+    async def _done(self, summary: str):
+        logger.info(f"[DONE] {summary}")
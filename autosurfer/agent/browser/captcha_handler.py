@@ -1,9 +1,79 @@
 from autosurfer.logger import logger
-from playwright.sync_api import Page
 import time
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 from dataclasses import dataclass
 
+if TYPE_CHECKING:
+    from autosurfer.agent.browser.page_snapshot import PageSnapshot
+    from playwright.sync_api import Page
+    from playwright.async_api import Page as AsyncPage
+
+
+# Common captcha selectors for detection only
+CAPTCHA_SELECTORS = {
+    'recaptcha': [
+        'iframe[src*="recaptcha"]',
+        '.g-recaptcha',
+        '#recaptcha',
+        '[data-sitekey]',
+        'iframe[title*="recaptcha"]'
+    ],
+    'hcaptcha': [
+        'iframe[src*="hcaptcha"]',
+        '.h-captcha',
+        '#hcaptcha',
+        'iframe[title*="hCaptcha"]'
+    ],
+    'image_captcha': [
+        'img[src*="captcha"]',
+        '.captcha-image',
+        '#captcha-image',
+        'img[alt*="captcha"]'
+    ],
+    'text_captcha': [
+        'input[name*="captcha"]',
+        '.captcha-input',
+        '#captcha-input',
+        'input[placeholder*="captcha"]'
+    ],
+    'checkbox_captcha': [
+        'input[type="checkbox"][name*="captcha"]',
+        '.captcha-checkbox',
+        '#captcha-checkbox'
+    ]
+}
+
+# Collect visible page text only (hidden subtrees are rejected)
+VISIBLE_TEXT_JS = """
+    () => {
+        const walker = document.createTreeWalker(
+            document.body,
+            NodeFilter.SHOW_TEXT,
+            {
+                acceptNode: function(node) {
+                    const style = window.getComputedStyle(node.parentElement);
+                    if (style.display === 'none' || style.visibility === 'hidden' || style.opacity === '0') {
+                        return NodeFilter.FILTER_REJECT;
+                    }
+                    return NodeFilter.FILTER_ACCEPT;
+                }
+            }
+        );
+        
+        let text = '';
+        let node;
+        while (node = walker.nextNode()) {
+            text += node.textContent + ' ';
+        }
+        return text.toLowerCase();
+    }
+"""
+
+CAPTCHA_INDICATORS = [
+    'captcha', 'recaptcha', 'hcaptcha', 'verify you are human',
+    'prove you are not a robot', 'security check', 'verification'
+]
+
 
 @dataclass
 class CaptchaInfo:
@@ -12,47 +82,40 @@ class CaptchaInfo:
     selectors: list
 
 
+def match_captcha_indicators(visible_text: str) -> Optional[CaptchaInfo]:
+    """Return a low-confidence CaptchaInfo if the visible text mentions a captcha"""
+    for indicator in CAPTCHA_INDICATORS:
+        if indicator in visible_text:
+            logger.info(
+                f"Detected visible captcha indicator: {indicator}")
+            return CaptchaInfo(
+                type='unknown',
+                confidence=0.7,
+                selectors=[],
+            )
+    return None
+
+
+def report_captcha(captcha_info: Optional[CaptchaInfo]) -> bool:
+    """Log a detected captcha; return False if one was found, otherwise True"""
+    if captcha_info:
+        logger.error(f"🔒 CAPTCHA DETECTED: {captcha_info.type}")
+        logger.error("Task cannot continue due to captcha presence.")
+        logger.error(
+            "Future implementation will stream screen to user for manual solving.")
+        return False
+
+    return True
+
+
 class CaptchaHandler:
-    def __init__(self, page: Page):
+    def __init__(self, page: "Page"):
         self.page = page
         # Cache for recent captcha checks
         self._last_checked_url: str = ""
         self._last_checked_result: Optional[CaptchaInfo] = None
         # Note: we no longer use a time-based cache; we only re-scan when the URL changes.
-
-        # Common captcha selectors for detection only
-        self.captcha_selectors = {
-            'recaptcha': [
-                'iframe[src*="recaptcha"]',
-                '.g-recaptcha',
-                '#recaptcha',
-                '[data-sitekey]',
-                'iframe[title*="recaptcha"]'
-            ],
-            'hcaptcha': [
-                'iframe[src*="hcaptcha"]',
-                '.h-captcha',
-                '#hcaptcha',
-                'iframe[title*="hCaptcha"]'
-            ],
-            'image_captcha': [
-                'img[src*="captcha"]',
-                '.captcha-image',
-                '#captcha-image',
-                'img[alt*="captcha"]'
-            ],
-            'text_captcha': [
-                'input[name*="captcha"]',
-                '.captcha-input',
-                '#captcha-input',
-                'input[placeholder*="captcha"]'
-            ],
-            'checkbox_captcha': [
-                'input[type="checkbox"][name*="captcha"]',
-                '.captcha-checkbox',
-                '#captcha-checkbox'
-            ]
-        }
+        self.captcha_selectors = CAPTCHA_SELECTORS
 
     def detect_captcha(self) -> Optional[CaptchaInfo]:
         """Detect if there's a visible captcha on the current page"""
@@ -86,45 +149,8 @@ class CaptchaHandler:
         # Check for captcha-related text in visible page content only
         try:
             # Get only visible text content
-            visible_text = self.page.evaluate("""
-                () => {
-                    const walker = document.createTreeWalker(
-                        document.body,
-                        NodeFilter.SHOW_TEXT,
-                        {
-                            acceptNode: function(node) {
-                                const style = window.getComputedStyle(node.parentElement);
-                                if (style.display === 'none' || style.visibility === 'hidden' || style.opacity === '0') {
-                                    return NodeFilter.FILTER_REJECT;
-                                }
-                                return NodeFilter.FILTER_ACCEPT;
-                            }
-                        }
-                    );
-                    
-                    let text = '';
-                    let node;
-                    while (node = walker.nextNode()) {
-                        text += node.textContent + ' ';
-                    }
-                    return text.toLowerCase();
-                }
-            """)
-
-            captcha_indicators = [
-                'captcha', 'recaptcha', 'hcaptcha', 'verify you are human',
-                'prove you are not a robot', 'security check', 'verification'
-            ]
-
-            for indicator in captcha_indicators:
-                if indicator in visible_text:
-                    logger.info(
-                        f"Detected visible captcha indicator: {indicator}")
-                    return CaptchaInfo(
-                        type='unknown',
-                        confidence=0.7,
-                        selectors=[],
-                    )
+            visible_text = self.page.evaluate(VISIBLE_TEXT_JS)
+            return match_captcha_indicators(visible_text)
         except Exception as e:
             logger.debug(f"Error checking visible text content: {e}")
 
@@ -146,14 +172,106 @@ class CaptchaHandler:
         captcha_info = self.detect_captcha()
         self._last_checked_result = captcha_info
 
-        if captcha_info:
-            logger.error(f"🔒 CAPTCHA DETECTED: {captcha_info.type}")
-            logger.error("Task cannot continue due to captcha presence.")
-            logger.error(
-                "Future implementation will stream screen to user for manual solving.")
-            return False
+        return report_captcha(captcha_info)
+
+    def needs_scan(self, url: str) -> bool:
+        """Whether the next snapshot should include captcha signals"""
+        return url != self._last_checked_url
+
+    def handle_snapshot(self, snapshot: "PageSnapshot") -> bool:
+        """Same contract as handle_captcha_detection, but uses the captcha
+        signals already captured by a PageSnapshot instead of probing the page."""
+        if snapshot.url == self._last_checked_url:
+            logger.debug(
+                "Skipping captcha scan: URL unchanged since last check")
+            return self._last_checked_result is None
+
+        # URL changed after the snapshot decided not to scan; probe directly
+        if not snapshot.captcha_scanned:
+            return self.handle_captcha_detection()
+
+        self._last_checked_url = snapshot.url
+        self._last_checked_result = snapshot.captcha
+
+        return report_captcha(snapshot.captcha)
+
+    def invalidate_cache(self):
+        """Clear the cached URL so the next call will perform a fresh scan."""
+        self._last_checked_url = ""
+
+
+class AsyncCaptchaHandler:
+    """Asyncio counterpart of CaptchaHandler built on playwright.async_api"""
+
+    def __init__(self, page: "AsyncPage"):
+        self.page = page
+        self._last_checked_url: str = ""
+        self._last_checked_result: Optional[CaptchaInfo] = None
+        self.captcha_selectors = CAPTCHA_SELECTORS
+
+    async def detect_captcha(self) -> Optional[CaptchaInfo]:
+        """Detect if there's a visible captcha on the current page"""
+        logger.info("Scanning for visible captcha elements...")
+
+        for captcha_type, selectors in self.captcha_selectors.items():
+            for selector in selectors:
+                try:
+                    elements = await self.page.query_selector_all(selector)
+                    for element in elements:
+                        if await element.is_visible():
+                            logger.info(
+                                f"Detected visible {captcha_type} captcha with selector: {selector}")
+                            return CaptchaInfo(
+                                type=captcha_type,
+                                confidence=0.9,
+                                selectors=[selector]
+                            )
+                except Exception as e:
+                    logger.debug(f"Selector {selector} failed: {e}")
+                    continue
+
+        try:
+            visible_text = await self.page.evaluate(VISIBLE_TEXT_JS)
+            return match_captcha_indicators(visible_text)
+        except Exception as e:
+            logger.debug(f"Error checking visible text content: {e}")
+
+        return None
+
+    async def handle_captcha_detection(self) -> bool:
+        """Return False if captcha found; otherwise True. Only re-scans when the URL changes."""
+        current_url = self.page.url
+
+        if current_url == self._last_checked_url:
+            logger.debug(
+                "Skipping captcha scan: URL unchanged since last check")
+            return self._last_checked_result is None
+
+        self._last_checked_url = current_url
+
+        captcha_info = await self.detect_captcha()
+        self._last_checked_result = captcha_info
+
+        return report_captcha(captcha_info)
+
+    def needs_scan(self, url: str) -> bool:
+        """Whether the next snapshot should include captcha signals"""
+        return url != self._last_checked_url
+
+    async def handle_snapshot(self, snapshot: "PageSnapshot") -> bool:
+        """Same contract as handle_captcha_detection, using a PageSnapshot's captcha signals"""
+        if snapshot.url == self._last_checked_url:
+            logger.debug(
+                "Skipping captcha scan: URL unchanged since last check")
+            return self._last_checked_result is None
+
+        if not snapshot.captcha_scanned:
+            return await self.handle_captcha_detection()
+
+        self._last_checked_url = snapshot.url
+        self._last_checked_result = snapshot.captcha
 
-        return True
+        return report_captcha(snapshot.captcha)
 
     def invalidate_cache(self):
         """Clear the cached URL so the next call will perform a fresh scan."""
@@ -1,4 +1,9 @@
 (() => {
+  // Replace (not stack) a previously injected instance
+  if (window.domAnnotator && window.domAnnotator.dispose) {
+    window.domAnnotator.dispose();
+  }
+
   const DEFAULTS = {
     highlight: true,
     viewportOnly: true,
@@ -8,25 +13,74 @@
   };
   const cfg = { ...DEFAULTS };
 
+  // --- LAYOUT ACCOUNTING ---
+  // A render is a pure read phase (styles, rects, textContent) followed by a
+  // write phase (the overlay) deferred to one animation frame, so layout is
+  // computed at most once per render. A geometry read after a DOM change that
+  // no frame has laid out yet forces a synchronous reflow; those are counted
+  // in STATS.forcedReflows (an estimate: we only see mutations, not style
+  // changes made through CSSOM).
+  const STATS = {
+    renders: 0,
+    layoutReads: 0,
+    styleReads: 0,
+    forcedReflows: 0,
+    overlayFlushes: 0,
+    lastRenderMs: 0,
+  };
+  const LAYOUT = { dirty: true, token: 0 };
+
+  function noteLayoutRead() {
+    STATS.layoutReads++;
+    if (LAYOUT.dirty) {
+      STATS.forcedReflows++;
+      LAYOUT.dirty = false;
+    }
+  }
+
+  // Layout is clean again once a frame has been rendered after the write
+  function noteDomWrite() {
+    LAYOUT.dirty = true;
+    const token = ++LAYOUT.token;
+    requestAnimationFrame(() =>
+      setTimeout(() => {
+        if (token === LAYOUT.token) LAYOUT.dirty = false;
+      }, 0)
+    );
+  }
+
   // --- CACHING ---
   const CACHE = {
     rects: new WeakMap(),
+    boxes: new WeakMap(),
     styles: new WeakMap(),
     clear() {
       this.rects = new WeakMap();
+      this.boxes = new WeakMap();
       this.styles = new WeakMap();
     },
   };
 
   function getCachedRects(el) {
     if (CACHE.rects.has(el)) return CACHE.rects.get(el);
+    noteLayoutRead();
     const rects = Array.from(el.getClientRects());
     CACHE.rects.set(el, rects);
     return rects;
   }
 
+  // Border box; replaces offsetWidth/offsetHeight reads
+  function getCachedBox(el) {
+    if (CACHE.boxes.has(el)) return CACHE.boxes.get(el);
+    noteLayoutRead();
+    const box = el.getBoundingClientRect();
+    CACHE.boxes.set(el, box);
+    return box;
+  }
+
   function getCachedStyle(el) {
     if (CACHE.styles.has(el)) return CACHE.styles.get(el);
+    STATS.styleReads++;
     const style = window.getComputedStyle(el);
     CACHE.styles.set(el, style);
     return style;
@@ -48,12 +102,21 @@
       segs.unshift(`${node.tagName.toLowerCase()}[${i}]`);
       node = node.parentNode;
     }
-    const path = "/body/" + segs.join("/");
+    // Absolute from the document root, so it resolves as the fallback
+    // selector of a stale element id
+    const path = ["/html/body", ...segs].join("/");
     xpathCache.set(el, path);
     return path;
   }
 
   // --- ENHANCED ELEMENT ANALYSIS ---
+  // textContent needs no layout (innerText does); whitespace is collapsed here
+  // instead, on a bounded prefix so large subtrees stay cheap.
+  function textOf(el) {
+    const raw = el.textContent || "";
+    return raw.slice(0, 400).replace(/\s+/g, " ").trim().slice(0, 100);
+  }
+
   function getElementDetails(el) {
     const details = {
       tag: el.tagName.toLowerCase(),
@@ -71,7 +134,7 @@
       "data-test": el.getAttribute("data-test") || null,
       "aria-label": el.getAttribute("aria-label") || null,
       "aria-labelledby": el.getAttribute("aria-labelledby") || null,
-      text: (el.innerText || "").trim().slice(0, 100),
+      text: textOf(el),
       visible: true,
       enabled: !el.disabled,
       required: el.required || false,
@@ -117,6 +180,7 @@
   }
 
   function cleanupHighlights() {
+    cancelOverlay();
     window._highlightCleanup.forEach((fn) => fn());
     window._highlightCleanup = [];
     CACHE.clear();
@@ -216,10 +280,11 @@
 
     // Skip if it's hidden or has no dimensions
     if (style.visibility === "hidden" || style.display === "none") return false;
-    if (el.offsetWidth === 0 || el.offsetHeight === 0) return false;
+    const box = getCachedBox(el);
+    if (box.width === 0 || box.height === 0) return false;
 
     // Skip very small elements (likely low-level formatting)
-    if (el.offsetWidth < 50 || el.offsetHeight < 20) return false;
+    if (box.width < 50 || box.height < 20) return false;
 
     // Skip if it's just a wrapper with no direct text content
     if (el.children.length > 0) {
@@ -274,7 +339,7 @@
     return score;
   }
 
-  function drawBox(container, r, idx, priority) {
+  function makeBox(r, idx, priority) {
     const colors = [
       "#ff5f5f",
       "#58d365",
@@ -308,81 +373,549 @@
     });
     label.textContent = `${idx}(${priority})`;
     box.appendChild(label);
-    container.appendChild(box);
-    window._highlightCleanup.push(() => box.remove());
+    return box;
   }
 
-  // --- MAIN ---
-  window.collectInteractive = (opts = {}) => {
-    Object.assign(cfg, opts);
-    if (cfg.debug) console.log("collectInteractive config:", cfg);
-    const out = [];
-    const container = cfg.highlight ? initContainer() : null;
-    let idx = 0;
-
-    // Collect all elements first
-    const elements = [];
-    document.querySelectorAll("*").forEach((el) => {
-      const style = getCachedStyle(el);
-      if (style.visibility === "hidden" || style.display === "none") return;
-      if (el.offsetWidth === 0 && el.offsetHeight === 0) return;
-
-      const rects = getCachedRects(el);
-      if (cfg.viewportOnly && !inViewport(rects, cfg.viewportExpansion)) return;
-
-      // Include both interactive elements and text elements
-      if (!isInteractive(el, style) && !isTextElement(el, style)) return;
-
-      rects.forEach((r) => {
-        if (r.width === 0 || r.height === 0) return;
-        if (cfg.focusIndex >= 0 && cfg.focusIndex !== idx) {
-          idx++;
-          return;
+  // --- OVERLAY WRITES ---
+  // Boxes from the latest render are drawn together in the next frame; a
+  // newer render before then replaces the pending batch.
+  const OVERLAY = { pending: null, frame: 0, timer: 0 };
+
+  function scheduleOverlay(items) {
+    OVERLAY.pending = items.map(({ rect, uid, priority }) => ({
+      rect,
+      uid,
+      priority,
+    }));
+    if (OVERLAY.frame) return;
+    OVERLAY.frame = requestAnimationFrame(flushOverlay);
+    // rAF does not fire in background tabs; don't hold the boxes back forever
+    OVERLAY.timer = setTimeout(flushOverlay, 100);
+  }
+
+  function cancelOverlay() {
+    if (OVERLAY.frame) cancelAnimationFrame(OVERLAY.frame);
+    clearTimeout(OVERLAY.timer);
+    OVERLAY.frame = 0;
+    OVERLAY.timer = 0;
+    OVERLAY.pending = null;
+  }
+
+  function flushOverlay() {
+    const items = OVERLAY.pending;
+    cancelOverlay();
+    if (!items) return;
+    const container = initContainer();
+    const frag = document.createDocumentFragment();
+    items.forEach((item) =>
+      frag.appendChild(makeBox(item.rect, item.uid, item.priority))
+    );
+    container.appendChild(frag);
+    STATS.overlayFlushes++;
+  }
+
+  // --- VIEWPORT TRACKING ---
+  // Viewport membership of registered elements comes from one batched
+  // IntersectionObserver instead of per-element rect reads. Rects are still
+  // read for elements the observer has not reported on yet, for the boxes we
+  // draw, and right after a scroll until a frame has updated the observer.
+  const FAR_VIEWPORTS = 3;
+  const VIEWPORT = {
+    observer: null,
+    margin: null,
+    inView: new WeakMap(), // Element -> boolean, as last reported
+    stale: true,
+    scrollToken: 0,
+    deferred: new Set(), // far off-screen subtrees not scanned yet
+    farObserver: null,
+  };
+
+  function ensureViewportObserver() {
+    const margin = `${cfg.viewportExpansion}px`;
+    if (VIEWPORT.observer && VIEWPORT.margin === margin) return;
+    if (VIEWPORT.observer) VIEWPORT.observer.disconnect();
+    VIEWPORT.margin = margin;
+    VIEWPORT.inView = new WeakMap();
+    VIEWPORT.observer = new IntersectionObserver(
+      (records) =>
+        records.forEach((r) => VIEWPORT.inView.set(r.target, r.isIntersecting)),
+      { rootMargin: margin }
+    );
+    REGISTRY.entries.forEach((_, el) => VIEWPORT.observer.observe(el));
+  }
+
+  function observeViewport(el) {
+    if (VIEWPORT.observer) VIEWPORT.observer.observe(el);
+  }
+
+  function unobserveViewport(el) {
+    if (VIEWPORT.observer) VIEWPORT.observer.unobserve(el);
+    VIEWPORT.inView.delete(el);
+  }
+
+  function isFarOffscreen(el) {
+    const r = getCachedBox(el);
+    if (r.width === 0 && r.height === 0) return false;
+    const h = innerHeight * FAR_VIEWPORTS;
+    const w = innerWidth * FAR_VIEWPORTS;
+    return (
+      r.bottom < -h ||
+      r.top > innerHeight + h ||
+      r.right < -w ||
+      r.left > innerWidth + w
+    );
+  }
+
+  // Deferred subtrees are rescanned once they come within FAR_VIEWPORTS
+  function deferSubtree(el) {
+    if (VIEWPORT.deferred.has(el)) return;
+    if (!VIEWPORT.farObserver) {
+      VIEWPORT.farObserver = new IntersectionObserver(
+        (records) =>
+          records.forEach((r) => {
+            if (!r.isIntersecting) return;
+            VIEWPORT.farObserver.unobserve(r.target);
+            VIEWPORT.deferred.delete(r.target);
+            REGISTRY.dirtyRoots.add(r.target);
+          }),
+        { rootMargin: `${FAR_VIEWPORTS * 100}% ${FAR_VIEWPORTS * 100}%` }
+      );
+    }
+    VIEWPORT.deferred.add(el);
+    VIEWPORT.farObserver.observe(el);
+  }
+
+  function resetViewportTracking() {
+    if (VIEWPORT.observer) VIEWPORT.observer.disconnect();
+    if (VIEWPORT.farObserver) VIEWPORT.farObserver.disconnect();
+    VIEWPORT.observer = null;
+    VIEWPORT.farObserver = null;
+    VIEWPORT.deferred.clear();
+    VIEWPORT.stale = true;
+    if (cfg.viewportOnly) ensureViewportObserver();
+  }
+
+  // Observer results lag a scroll by one frame; distrust them until then
+  const onScroll = () => {
+    VIEWPORT.stale = true;
+    const token = ++VIEWPORT.scrollToken;
+    requestAnimationFrame(() =>
+      setTimeout(() => {
+        if (token === VIEWPORT.scrollToken) VIEWPORT.stale = false;
+      }, 0)
+    );
+  };
+  window.addEventListener("scroll", onScroll, { capture: true, passive: true });
+
+  // --- ELEMENT REGISTRY ---
+  // Persistent set of candidate elements (interactive or text), maintained
+  // incrementally from MutationObserver records so a render only rescans the
+  // subtrees that changed. Viewport filtering is applied on top of the
+  // registry, so scrolling never requires a DOM rescan (only deferred
+  // far-off-screen subtrees are scanned as they approach).
+  const MAX_DIRTY = 500;
+  // Stamped on reported elements so their ids are visible in the DOM
+  const ID_ATTR = "data-autosurfer-id";
+  const REGISTRY = {
+    entries: new Map(), // Element -> { uid, el, details, priority }
+    uids: new WeakMap(), // Element -> uid, survives removal/re-insertion
+    byUid: new Map(), // uid -> WeakRef(Element), for resolve()
+    nextUid: 1,
+    dirtyRoots: new Set(), // subtrees to rescan
+    dirtyNodes: new Set(), // single elements to re-evaluate
+    needsFull: true,
+    // Delta bookkeeping towards the Python side
+    session: Math.random().toString(36).slice(2),
+    version: 0,
+    sent: new Map(), // uid -> signature last reported
+    lastWire: [],
+  };
+
+  function uidFor(el) {
+    let uid = REGISTRY.uids.get(el);
+    if (!uid) {
+      uid = REGISTRY.nextUid++;
+      REGISTRY.uids.set(el, uid);
+      REGISTRY.byUid.set(uid, new WeakRef(el));
+    }
+    return uid;
+  }
+
+  function pruneUids() {
+    REGISTRY.byUid.forEach((ref, uid) => {
+      if (!ref.deref()) REGISTRY.byUid.delete(uid);
+    });
+  }
+
+  function isOverlayNode(node) {
+    if (!node || node.nodeType !== 1) return false;
+    return node.id === CONTAINER_ID || !!node.closest(`#${CONTAINER_ID}`);
+  }
+
+  function evaluateCandidate(el) {
+    const style = getCachedStyle(el);
+    if (style.visibility === "hidden" || style.display === "none") return null;
+    const box = getCachedBox(el);
+    if (box.width === 0 && box.height === 0) return null;
+
+    // Include both interactive elements and text elements
+    if (!isInteractive(el, style) && !isTextElement(el, style)) return null;
+
+    const details = getElementDetails(el);
+    return {
+      uid: uidFor(el),
+      el,
+      details,
+      priority: getPriorityScore(el, details),
+    };
+  }
+
+  function upsert(el) {
+    const entry = evaluateCandidate(el);
+    if (entry) {
+      if (!REGISTRY.entries.has(el)) observeViewport(el);
+      REGISTRY.entries.set(el, entry);
+    } else if (REGISTRY.entries.delete(el)) {
+      unobserveViewport(el);
+    }
+  }
+
+  // Whole subtrees that cannot contribute are skipped: display:none,
+  // visibility:hidden (a descendant re-showing itself is rare enough to
+  // ignore) and, in viewport-only mode, containers far off-screen, which are
+  // deferred until they approach the viewport.
+  function subtreeFilter(el) {
+    if (isOverlayNode(el)) return NodeFilter.FILTER_REJECT;
+    const style = getCachedStyle(el);
+    if (style.display === "none" || style.visibility === "hidden")
+      return NodeFilter.FILTER_REJECT;
+    if (
+      cfg.viewportOnly &&
+      el.childElementCount > 0 &&
+      style.position !== "fixed" &&
+      style.position !== "sticky" &&
+      isFarOffscreen(el)
+    ) {
+      deferSubtree(el);
+      return NodeFilter.FILTER_REJECT;
+    }
+    // display:contents has no box of its own but its children do
+    if (style.display === "contents") return NodeFilter.FILTER_SKIP;
+    return NodeFilter.FILTER_ACCEPT;
+  }
+
+  function scanSubtree(root) {
+    if (!root || root.nodeType !== 1) return;
+    const verdict = subtreeFilter(root);
+    if (verdict === NodeFilter.FILTER_REJECT) return;
+    if (verdict === NodeFilter.FILTER_ACCEPT) upsert(root);
+
+    const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT, {
+      acceptNode: subtreeFilter,
+    });
+    let el;
+    while ((el = walker.nextNode())) upsert(el);
+  }
+
+  function fullResync() {
+    REGISTRY.entries.clear();
+    pruneUids();
+    resetViewportTracking();
+    if (document.body) scanSubtree(document.body);
+    REGISTRY.dirtyRoots.clear();
+    REGISTRY.dirtyNodes.clear();
+    REGISTRY.needsFull = false;
+  }
+
+  // Re-evaluate registered ancestors: their textContent includes the change
+  function refreshAncestors(el, seen) {
+    let node = el.parentElement;
+    while (node && !seen.has(node)) {
+      seen.add(node);
+      if (REGISTRY.entries.has(node)) upsert(node);
+      node = node.parentElement;
+    }
+  }
+
+  function flushDirty() {
+    // Records not yet delivered to the observer callback (same task)
+    markDirty(registryObserver.takeRecords());
+    const dirtyCount = REGISTRY.dirtyRoots.size + REGISTRY.dirtyNodes.size;
+    if (REGISTRY.needsFull || dirtyCount > MAX_DIRTY) {
+      fullResync();
+      return;
+    }
+    if (dirtyCount === 0) return;
+
+    for (const el of REGISTRY.entries.keys()) {
+      if (!el.isConnected) {
+        REGISTRY.entries.delete(el);
+        unobserveViewport(el);
+      }
+    }
+
+    const roots = [...REGISTRY.dirtyRoots].filter((el) => el.isConnected);
+    const outermost = roots.filter(
+      (el) => !roots.some((other) => other !== el && other.contains(el))
+    );
+    // Entries under a dirty root are re-derived from scratch (uids persist)
+    const rootSet = new Set(outermost);
+    REGISTRY.entries.forEach((_, el) => {
+      for (let node = el; node; node = node.parentElement) {
+        if (rootSet.has(node)) {
+          REGISTRY.entries.delete(el);
+          unobserveViewport(el);
+          break;
         }
+      }
+    });
 
-        const details = getElementDetails(el);
-        const priority = getPriorityScore(el, details);
+    const seen = new Set();
+    outermost.forEach((root) => {
+      scanSubtree(root);
+      refreshAncestors(root, seen);
+    });
+    REGISTRY.dirtyNodes.forEach((el) => {
+      if (!el.isConnected || isOverlayNode(el)) return;
+      if (outermost.some((root) => root.contains(el))) return;
+      upsert(el);
+      refreshAncestors(el, seen);
+    });
+
+    REGISTRY.dirtyRoots.clear();
+    REGISTRY.dirtyNodes.clear();
+  }
+
+  function markDirty(records) {
+    if (records.length > 0) noteDomWrite();
+    for (const r of records) {
+      if (REGISTRY.needsFull) return;
+      const target =
+        r.target.nodeType === 1 ? r.target : r.target.parentElement;
+      if (!target || isOverlayNode(target)) continue;
+      if (r.type === "attributes" && r.attributeName === ID_ATTR) continue;
 
-        elements.push({
-          element: el,
-          rect: r,
-          details: details,
-          priority: priority,
-          index: idx,
+      if (r.type === "childList") {
+        const nodes = [...r.addedNodes, ...r.removedNodes];
+        if (nodes.length > 0 && nodes.every(isOverlayNode)) continue;
+        r.addedNodes.forEach((node) => {
+          if (node.nodeType === 1 && !isOverlayNode(node))
+            REGISTRY.dirtyRoots.add(node);
         });
-        idx++;
-      });
+        REGISTRY.dirtyNodes.add(target);
+      } else if (r.type === "attributes") {
+        // A class/style change on <html>/<body> can restyle everything
+        if (target === document.body || target === document.documentElement)
+          REGISTRY.needsFull = true;
+        else REGISTRY.dirtyRoots.add(target);
+      } else {
+        REGISTRY.dirtyNodes.add(target);
+      }
+    }
+  }
+
+  const registryObserver = new MutationObserver(markDirty);
+  registryObserver.observe(document, {
+    subtree: true,
+    childList: true,
+    attributes: true,
+    characterData: true,
+  });
+
+  // Layout-dependent candidacy (sizes, media queries) may change on resize
+  const onResize = () => {
+    REGISTRY.needsFull = true;
+  };
+  window.addEventListener("resize", onResize);
+
+  function firstVisibleRect(el) {
+    const rects = getCachedRects(el);
+    for (const r of rects) {
+      if (r.width === 0 || r.height === 0) continue;
+      if (cfg.viewportOnly && !inViewport([r], cfg.viewportExpansion)) continue;
+      return r;
+    }
+    return null;
+  }
+
+  /**
+   * Bring the registry up to date and return the visible entries, sorted by
+   * priority (stable id breaks ties). Highlight boxes, if requested, are
+   * drawn in the next animation frame.
+   */
+  function collectEntries(opts = {}) {
+    const started = performance.now();
+    const { full, ...rest } = opts;
+    Object.assign(cfg, rest);
+    if (cfg.debug) console.log("collectInteractive config:", cfg);
+    if (full) REGISTRY.needsFull = true;
+    // Rects and styles are only valid for this render
+    CACHE.clear();
+    flushDirty();
+
+    if (cfg.viewportOnly) ensureViewportObserver();
+    const trustObserver = cfg.viewportOnly && !VIEWPORT.stale;
+
+    const visible = [];
+    REGISTRY.entries.forEach((entry) => {
+      if (cfg.focusIndex >= 0 && cfg.focusIndex !== entry.uid) return;
+      if (trustObserver && VIEWPORT.inView.get(entry.el) === false) return;
+      const rect = firstVisibleRect(entry.el);
+      if (rect) visible.push({ ...entry, rect });
     });
+    visible.sort((a, b) => b.priority - a.priority || a.uid - b.uid);
 
-    // Sort by priority and add to output
-    elements.sort((a, b) => b.priority - a.priority);
-
-    elements.forEach((item) => {
-      out.push({
-        index: item.index,
-        xpath: getXPath(item.element),
-        ...item.details,
-        rect: {
-          x: item.rect.x,
-          y: item.rect.y,
-          w: item.rect.width,
-          h: item.rect.height,
-        },
-        priority: item.priority,
-      });
+    // Write phase: nothing above touched the DOM. Id stamps are written now
+    // (the caller may act on them right away), the overlay in the next frame.
+    visible.forEach(({ el, uid }) => {
+      const stamp = String(uid);
+      if (el.getAttribute(ID_ATTR) !== stamp) el.setAttribute(ID_ATTR, stamp);
+    });
+    if (cfg.highlight) scheduleOverlay(visible);
+    STATS.renders++;
+    STATS.lastRenderMs = performance.now() - started;
+    return visible;
+  }
+
+  function toLegacy(item) {
+    return {
+      index: item.uid,
+      xpath: getXPath(item.el),
+      ...item.details,
+      rect: {
+        x: item.rect.x,
+        y: item.rect.y,
+        w: item.rect.width,
+        h: item.rect.height,
+      },
+      priority: item.priority,
+    };
+  }
+
+  // Only the fields the Python side keeps
+  function toWire(item) {
+    return {
+      index: item.uid,
+      tag: item.details.tag,
+      id: item.details.id,
+      testid: item.details["data-testid"],
+      label:
+        item.details["aria-label"] ||
+        item.details.placeholder ||
+        item.details.title ||
+        item.details.alt,
+      text: item.details.text,
+      xpath: getXPath(item.el),
+      priority: item.priority,
+    };
+  }
 
-      if (cfg.highlight)
-        drawBox(container, item.rect, item.index, item.priority);
+  /**
+   * Columnar wire format: one array per field instead of one object per
+   * element. Tag names are interned into `tags`; id, testid and label,
+   * absent for most elements, are flat [row, value, row, value, ...] lists
+   * and are left out entirely when no row has them.
+   */
+  function encodeColumns(records) {
+    const tags = [];
+    const tagIds = new Map();
+    const cols = {
+      count: records.length,
+      tags,
+      index: [],
+      tag: [],
+      priority: [],
+      text: [],
+      xpath: [],
+    };
+    const id = [];
+    const testid = [];
+    const label = [];
+    records.forEach((rec, row) => {
+      let t = tagIds.get(rec.tag);
+      if (t === undefined) {
+        t = tags.length;
+        tagIds.set(rec.tag, t);
+        tags.push(rec.tag);
+      }
+      cols.index.push(rec.index);
+      cols.tag.push(t);
+      cols.priority.push(rec.priority);
+      cols.text.push(rec.text || "");
+      cols.xpath.push(rec.xpath);
+      if (rec.id) id.push(row, rec.id);
+      if (rec.testid) testid.push(row, rec.testid);
+      if (rec.label) label.push(row, rec.label);
     });
+    if (id.length) cols.id = id;
+    if (testid.length) cols.testid = testid;
+    if (label.length) cols.label = label;
+    return cols;
+  }
+
+  /**
+   * Diff the current wire records against what the caller last received.
+   * A caller whose session/version does not match gets a full list.
+   * Element lists are encoded with encodeColumns().
+   */
+  function buildDelta(wire, sync = {}) {
+    const full =
+      sync.session !== REGISTRY.session || sync.version !== REGISTRY.version;
+    const next = new Map();
+    wire.forEach((rec) => next.set(rec.index, JSON.stringify(rec)));
+
+    let delta;
+    if (full) {
+      delta = { full: true, elements: encodeColumns(wire) };
+    } else {
+      const added = [];
+      const changed = [];
+      wire.forEach((rec) => {
+        const prev = REGISTRY.sent.get(rec.index);
+        if (prev === undefined) added.push(rec);
+        else if (prev !== next.get(rec.index)) changed.push(rec);
+      });
+      const removed = [];
+      REGISTRY.sent.forEach((_, uid) => {
+        if (!next.has(uid)) removed.push(uid);
+      });
+      delta = {
+        full: false,
+        added: encodeColumns(added),
+        changed: encodeColumns(changed),
+        removed,
+      };
+    }
 
-    return out;
+    REGISTRY.sent = next;
+    REGISTRY.version++;
+    delta.session = REGISTRY.session;
+    delta.version = REGISTRY.version;
+    return delta;
+  }
+
+  // --- MAIN ---
+  // `columnar: true` returns encodeColumns() output instead of legacy objects
+  window.collectInteractive = (opts = {}) => {
+    const { columnar, ...rest } = opts;
+    const items = collectEntries({ full: true, ...rest });
+    return columnar ? encodeColumns(items.map(toWire)) : items.map(toLegacy);
   };
 
-  // Cache for last collected elements (shared across renders)
+  // Entries of the last render; their legacy objects are built only when a
+  // legacy caller (render, getElements) asks for them
+  let _lastItems = [];
   let _lastElements = [];
 
+  function lastElements() {
+    if (!_lastElements) _lastElements = _lastItems.map(toLegacy);
+    return _lastElements;
+  }
+
   // --- ANNOTATION MANAGER API ---
   const AnnotationManager = {
+    // Content hash of this script, filled in when the Python side loads it
+    version: "__ANNOTATOR_VERSION__",
     /**
      * Initialise/overwrite config and return manager for chaining.
      * @param {Object} options Same options accepted by collectInteractive
@@ -398,21 +931,70 @@
       cleanupHighlights();
     },
     /**
-     * Collect elements in the current viewport and draw highlight boxes.
-     * Returns the element metadata array.
+     * Collect elements in the current viewport and schedule highlight boxes
+     * for the next frame. Returns the element metadata array.
      */
     render(options = {}) {
-      _lastElements = window.collectInteractive({
+      _lastItems = collectEntries({
         highlight: true,
         ...options,
       });
-      return _lastElements;
+      _lastElements = null;
+      return lastElements();
+    },
+    /**
+     * Render and return only what changed since the caller's last call.
+     * @param {Object} sync { session, version } from the previous delta; a
+     *   mismatch (new document, first call, reinjection) yields a full list
+     *   ({ full: true, elements }) instead of { added, changed, removed }.
+     */
+    renderDelta(sync = {}, options = {}) {
+      const items = collectEntries({ highlight: true, ...options });
+      _lastItems = items;
+      _lastElements = null;
+      REGISTRY.lastWire = items.map(toWire);
+      return buildDelta(REGISTRY.lastWire, sync);
+    },
+    /**
+     * Wire records from the last renderDelta() (in-page only, for digests).
+     */
+    currentWire() {
+      return REGISTRY.lastWire;
+    },
+    /**
+     * Element reported under `uid`, or null if it has left the document or
+     * `session` names another annotator instance (ids are per instance).
+     */
+    resolve(uid, session) {
+      if (session && session !== REGISTRY.session) return null;
+      const ref = REGISTRY.byUid.get(uid);
+      const el = ref && ref.deref();
+      return el && el.isConnected ? el : null;
+    },
+    /**
+     * Force the next render to rescan the whole document.
+     */
+    invalidate() {
+      REGISTRY.needsFull = true;
+    },
+    /**
+     * Render counters: layout/style reads, estimated forced reflows, overlay
+     * flushes and the duration of the last render.
+     */
+    stats() {
+      return { ...STATS, registered: REGISTRY.entries.size };
+    },
+    /**
+     * Zero the counters returned by stats().
+     */
+    resetStats() {
+      Object.keys(STATS).forEach((k) => (STATS[k] = 0));
     },
     /**
      * Retrieve the last element array without re-scanning the DOM.
      */
     getElements() {
-      return _lastElements;
+      return lastElements();
     },
     /**
      * Enable automatic re-rendering after scroll/resize *after the viewport has
@@ -447,6 +1029,19 @@
         this._autoHandler = null;
       }
     },
+    /**
+     * Detach observers and listeners (called before a re-injection replaces
+     * this instance).
+     */
+    dispose() {
+      this.disableAutoRefresh();
+      registryObserver.disconnect();
+      if (VIEWPORT.observer) VIEWPORT.observer.disconnect();
+      if (VIEWPORT.farObserver) VIEWPORT.farObserver.disconnect();
+      window.removeEventListener("resize", onResize);
+      window.removeEventListener("scroll", onScroll, { capture: true });
+      cleanupHighlights();
+    },
   };
 
   // Expose manager globally under new simplified name
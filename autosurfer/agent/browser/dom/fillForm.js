@@ -0,0 +1,125 @@
+(args) => {
+  // Fill several form fields in one evaluate. Argument:
+  //   { session: string|null,
+  //     fields: [{ element: int|null, selector: string|null, value: string }] }
+  // A field is located by annotator id first (see domAnnotator.resolve),
+  // then by selector: XPath if it starts with "/", CSS otherwise, and for
+  // plain text a label, placeholder, aria-label or name match. Values are
+  // set through the native setters and announced with input/change events
+  // so framework-controlled inputs pick them up. Returns one result per
+  // field: { ok, kind, error? }.
+
+  const TRUTHY = ["true", "1", "yes", "on", "checked"];
+
+  function byXPath(xpath) {
+    return document.evaluate(
+      xpath,
+      document,
+      null,
+      XPathResult.FIRST_ORDERED_NODE_TYPE,
+      null
+    ).singleNodeValue;
+  }
+
+  function byText(text) {
+    const needle = text.trim().toLowerCase();
+    for (const label of document.querySelectorAll("label")) {
+      if (label.textContent.trim().toLowerCase().includes(needle)) {
+        const control =
+          label.control || label.querySelector("input, select, textarea");
+        if (control) return control;
+      }
+    }
+    const quoted = JSON.stringify(text);
+    return document.querySelector(
+      `[placeholder*=${quoted} i], [aria-label*=${quoted} i], [name*=${quoted} i]`
+    );
+  }
+
+  function locate(field) {
+    if (field.element != null && window.domAnnotator) {
+      const el = window.domAnnotator.resolve(field.element, args.session);
+      if (el) return el;
+    }
+    const selector = field.selector;
+    if (!selector) return null;
+    if (selector.startsWith("/")) return byXPath(selector);
+    try {
+      const el = document.querySelector(selector);
+      if (el) return el;
+    } catch (e) {
+      // Not CSS; fall through to a text match
+    }
+    return byText(selector);
+  }
+
+  function setNativeValue(el, value) {
+    const proto = Object.getPrototypeOf(el);
+    const desc = Object.getOwnPropertyDescriptor(proto, "value");
+    if (desc && desc.set) desc.set.call(el, value);
+    else el.value = value;
+  }
+
+  function announce(el) {
+    el.dispatchEvent(new Event("input", { bubbles: true }));
+    el.dispatchEvent(new Event("change", { bubbles: true }));
+  }
+
+  function fillSelect(el, value) {
+    const wanted = String(value).trim().toLowerCase();
+    const option = Array.from(el.options).find(
+      (o) =>
+        o.value.toLowerCase() === wanted ||
+        o.textContent.trim().toLowerCase() === wanted
+    );
+    if (!option) return { ok: false, kind: "select", error: "no such option" };
+    setNativeValue(el, option.value);
+    announce(el);
+    return { ok: true, kind: "select" };
+  }
+
+  function fillToggle(el, value) {
+    const kind = el.type;
+    const wanted = TRUTHY.includes(String(value).trim().toLowerCase());
+    // click() toggles and fires click/input/change like a user would
+    if (el.checked !== wanted && (kind === "checkbox" || wanted)) el.click();
+    return el.checked === wanted
+      ? { ok: true, kind }
+      : { ok: false, kind, error: "state did not change" };
+  }
+
+  function fillField(field) {
+    const el = locate(field);
+    if (!el) return { ok: false, kind: null, error: "not found" };
+    if (el.disabled) return { ok: false, kind: null, error: "disabled" };
+
+    const tag = el.tagName.toLowerCase();
+    if (tag === "select") return fillSelect(el, field.value);
+    if (tag === "input" && (el.type === "checkbox" || el.type === "radio"))
+      return fillToggle(el, field.value);
+    if (tag === "input" || tag === "textarea") {
+      if (el.readOnly) return { ok: false, kind: tag, error: "read-only" };
+      el.focus({ preventScroll: true });
+      setNativeValue(el, field.value);
+      announce(el);
+      el.blur();
+      return { ok: true, kind: tag };
+    }
+    if (el.isContentEditable) {
+      el.focus({ preventScroll: true });
+      el.textContent = field.value;
+      el.dispatchEvent(new Event("input", { bubbles: true }));
+      el.blur();
+      return { ok: true, kind: "contenteditable" };
+    }
+    return { ok: false, kind: tag, error: "not a form field" };
+  }
+
+  return args.fields.map((field) => {
+    try {
+      return fillField(field);
+    } catch (e) {
+      return { ok: false, kind: null, error: String(e) };
+    }
+  });
+}
@@ -0,0 +1,105 @@
+(args) => {
+  // Single-roundtrip page snapshot. Evaluated as a function with one argument:
+  //   { annotatorVersion: string, captchaSelectors: {type: [selector]},
+  //     captchaIndicators: [string], scanCaptcha: bool,
+  //     sync: {session, version} }
+  // Returns URL, title, an element delta against `sync` (see
+  // domAnnotator.renderDelta), scroll info, captcha signals and in-page
+  // digests so no large payload (e.g. innerHTML) has to cross CDP.
+
+  // cyrb53: fast 53-bit string hash, good enough for change detection
+  function digest(str) {
+    let h1 = 0xdeadbeef ^ 0;
+    let h2 = 0x41c6ce57 ^ 0;
+    for (let i = 0; i < str.length; i++) {
+      const ch = str.charCodeAt(i);
+      h1 = Math.imul(h1 ^ ch, 2654435761);
+      h2 = Math.imul(h2 ^ ch, 1597334677);
+    }
+    h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507);
+    h1 ^= Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+    h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507);
+    h2 ^= Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+    return (4294967296 * (2097151 & h2) + (h1 >>> 0)).toString(16);
+  }
+
+  function isVisible(el) {
+    if (el.getClientRects().length === 0) return false;
+    return window.getComputedStyle(el).visibility !== "hidden";
+  }
+
+  function visibleText() {
+    const walker = document.createTreeWalker(
+      document.body,
+      NodeFilter.SHOW_TEXT,
+      {
+        acceptNode(node) {
+          const style = window.getComputedStyle(node.parentElement);
+          if (
+            style.display === "none" ||
+            style.visibility === "hidden" ||
+            style.opacity === "0"
+          ) {
+            return NodeFilter.FILTER_REJECT;
+          }
+          return NodeFilter.FILTER_ACCEPT;
+        },
+      }
+    );
+    let text = "";
+    let node;
+    while ((node = walker.nextNode())) text += node.textContent + " ";
+    return text.toLowerCase();
+  }
+
+  function scanCaptcha() {
+    for (const [type, selectors] of Object.entries(args.captchaSelectors)) {
+      for (const selector of selectors) {
+        try {
+          for (const el of document.querySelectorAll(selector)) {
+            if (isVisible(el)) return { type, selector, confidence: 0.9 };
+          }
+        } catch (e) {
+          // invalid selector for this document; skip
+        }
+      }
+    }
+    if (!document.body) return null;
+    const text = visibleText();
+    for (const indicator of args.captchaIndicators) {
+      if (text.includes(indicator)) {
+        return { type: "unknown", selector: null, indicator, confidence: 0.7 };
+      }
+    }
+    return null;
+  }
+
+  const mgr = window.domAnnotator;
+  if (!mgr || mgr.version !== args.annotatorVersion)
+    return { annotatorMissing: true };
+  if (!mgr._autoHandler) mgr.enableAutoRefresh(150);
+
+  // Only added/changed/removed elements cross CDP (full list on resync)
+  const elementsDelta = mgr.renderDelta(args.sync);
+
+  const body = document.body;
+  const scrollHeight = body ? body.scrollHeight : 0;
+  return {
+    annotatorMissing: false,
+    url: location.href,
+    title: document.title,
+    elementsDelta,
+    scroll: {
+      scrollY: window.scrollY,
+      scrollHeight,
+      clientHeight: document.documentElement.clientHeight,
+      windowHeight: window.innerHeight,
+      isAtBottom: window.scrollY + window.innerHeight >= scrollHeight,
+      isAtTop: window.scrollY === 0,
+    },
+    captchaScanned: !!args.scanCaptcha,
+    captcha: args.scanCaptcha ? scanCaptcha() : null,
+    domDigest: body ? digest(body.innerHTML) : null,
+    uiDigest: digest(JSON.stringify(mgr.currentWire())),
+  };
+}
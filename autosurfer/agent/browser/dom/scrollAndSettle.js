@@ -0,0 +1,171 @@
+async (args) => {
+  // Scroll, wait for the scroll to end and re-render annotations in one
+  // evaluate. Argument:
+  //   { annotatorVersion: string, sync: {session, version},
+  //     selector: string|null, direction: "up"|"down"|null,
+  //     to: "top"|"bottom"|null, by: number|null,
+  //     idleMs: number, timeoutMs: number }
+  // A selector (XPath if it starts with "/", CSS otherwise, else visible
+  // text) takes precedence; `to` jumps to an end of the page; `direction`
+  // scrolls by `by` pixels (a viewport height by default). With none of them
+  // only the settle and render happen. Scroll end is the `scrollend` event
+  // where supported and no frame-to-frame movement for `idleMs` otherwise,
+  // bounded by `timeoutMs`. Returns an element delta against `sync` (see
+  // domAnnotator.renderDelta) and the scroll info of the new viewport.
+
+  const mgr = window.domAnnotator;
+  if (!mgr || mgr.version !== args.annotatorVersion)
+    return { annotatorMissing: true };
+  if (!mgr._autoHandler) mgr.enableAutoRefresh(150);
+
+  const hasScrollEnd = "onscrollend" in window;
+  // rAF does not run in hidden documents; fall back to a frame-sized timer
+  const nextFrame = () =>
+    new Promise((resolve) =>
+      document.hidden ? setTimeout(resolve, 16) : requestAnimationFrame(resolve)
+    );
+
+  function byText(text) {
+    const needle = text.trim().toLowerCase();
+    const walker = document.createTreeWalker(
+      document.body,
+      NodeFilter.SHOW_TEXT,
+      {
+        acceptNode(node) {
+          return node.textContent.toLowerCase().includes(needle)
+            ? NodeFilter.FILTER_ACCEPT
+            : NodeFilter.FILTER_SKIP;
+        },
+      }
+    );
+    let node;
+    while ((node = walker.nextNode())) {
+      const el = node.parentElement;
+      if (el && el.getClientRects().length > 0) return el;
+    }
+    return null;
+  }
+
+  function locate(selector) {
+    if (selector.startsWith("/")) {
+      return document.evaluate(
+        selector,
+        document,
+        null,
+        XPathResult.FIRST_ORDERED_NODE_TYPE,
+        null
+      ).singleNodeValue;
+    }
+    let text = selector;
+    const quoted = /^text="(.*)"$|^:has-text\("(.*)"\)$/.exec(selector);
+    if (quoted) {
+      text = quoted[1] !== undefined ? quoted[1] : quoted[2];
+    } else {
+      try {
+        const el = document.querySelector(selector);
+        if (el) return el;
+      } catch (e) {
+        // Not CSS; fall through to a text match
+      }
+    }
+    return document.body ? byText(text) : null;
+  }
+
+  function scrollInfo() {
+    const scrollHeight = document.body ? document.body.scrollHeight : 0;
+    return {
+      scrollY: window.scrollY,
+      scrollHeight,
+      clientHeight: document.documentElement.clientHeight,
+      windowHeight: window.innerHeight,
+      isAtBottom: window.scrollY + window.innerHeight >= scrollHeight,
+      isAtTop: window.scrollY === 0,
+    };
+  }
+
+  // Resolves with how the scroll ended: "scrollend", "idle" or "timeout".
+  // `target` is tracked too, so scrolling inside a nested container counts.
+  function scrollEnded(target) {
+    return new Promise((resolve) => {
+      const start = performance.now();
+      let scrolling = false;
+      let settled = false;
+      let position = null;
+      let stillSince = start;
+
+      const onScroll = () => (scrolling = true);
+      const onScrollEnd = () => finish("scrollend");
+      const finish = (how) => {
+        if (settled) return;
+        settled = true;
+        window.removeEventListener("scroll", onScroll, true);
+        window.removeEventListener("scrollend", onScrollEnd, true);
+        resolve(how);
+      };
+      window.addEventListener("scroll", onScroll, true);
+      if (hasScrollEnd)
+        window.addEventListener("scrollend", onScrollEnd, true);
+
+      const tick = async () => {
+        while (!settled) {
+          await nextFrame();
+          const now = performance.now();
+          const top = target ? target.getBoundingClientRect().top : 0;
+          const current = `${window.scrollX},${window.scrollY},${top}`;
+          if (current !== position) {
+            position = current;
+            stillSince = now;
+          } else if (
+            now - stillSince >= args.idleMs &&
+            // Still while a scrollend is pending means a paused smooth
+            // scroll; it only counts when no scroll started at all
+            (!hasScrollEnd || !scrolling)
+          ) {
+            finish("idle");
+          }
+          if (now - start >= args.timeoutMs) finish("timeout");
+        }
+      };
+      tick();
+    });
+  }
+
+  const start = performance.now();
+  const before = window.scrollY;
+  let target = null;
+  let found = null;
+
+  // Boxes drawn for the old viewport would drift while scrolling
+  mgr.clear();
+
+  if (args.selector) {
+    target = locate(args.selector);
+    found = !!target;
+    if (target) {
+      if (target.scrollIntoViewIfNeeded) target.scrollIntoViewIfNeeded(true);
+      else target.scrollIntoView({ block: "center" });
+    }
+  } else if (args.to === "top") {
+    window.scrollTo(0, 0);
+  } else if (args.to === "bottom") {
+    window.scrollTo(0, document.body ? document.body.scrollHeight : 0);
+  } else if (args.direction) {
+    const by = args.by || window.innerHeight;
+    window.scrollBy(0, args.direction === "up" ? -by : by);
+  }
+
+  const settledBy = await scrollEnded(target);
+  // The annotator distrusts viewport observations until a frame has passed
+  // since the last scroll event
+  await nextFrame();
+
+  return {
+    annotatorMissing: false,
+    found,
+    settledBy,
+    scrolledBy: window.scrollY - before,
+    elapsedMs: Math.round(performance.now() - start),
+    elementsDelta: mgr.renderDelta(args.sync),
+    scroll: scrollInfo(),
+  };
+}
@@ -0,0 +1,85 @@
+(() => {
+  // Page-settle probe. Installed as an init script so the MutationObserver sees
+  // the document from the start; evaluating it again is a no-op.
+  if (window.__autosurferSettle) return;
+
+  const OVERLAY_ID = "autosurfer-overlay";
+  // Stamped on elements by annotateDom.js
+  const ID_ATTR = "data-autosurfer-id";
+  let lastMutation = performance.now();
+
+  // Mutations caused by our own highlight overlay or element ids do not
+  // count as page activity
+  function isOverlayNode(node) {
+    if (!node || node.nodeType !== 1) return false;
+    return node.id === OVERLAY_ID || !!(node.closest && node.closest(`#${OVERLAY_ID}`));
+  }
+
+  function isOverlayRecord(record) {
+    if (record.type === "attributes" && record.attributeName === ID_ATTR) return true;
+    if (isOverlayNode(record.target)) return true;
+    if (record.type !== "childList") return false;
+    const nodes = [...record.addedNodes, ...record.removedNodes];
+    return nodes.length > 0 && nodes.every(isOverlayNode);
+  }
+
+  const observer = new MutationObserver((records) => {
+    if (records.some((r) => !isOverlayRecord(r))) lastMutation = performance.now();
+  });
+  observer.observe(document, {
+    subtree: true,
+    childList: true,
+    attributes: true,
+    characterData: true,
+  });
+
+  function layoutSignature() {
+    const root = document.documentElement;
+    if (!root) return "";
+    return `${root.scrollWidth}x${root.scrollHeight}`;
+  }
+
+  /**
+   * Resolve once the DOM has had no mutations for `quietMs` and the document
+   * size has not changed for the same window, or after `timeoutMs`.
+   * Resolves with { stable, waitedMs, reason }.
+   */
+  function waitForQuiet({ quietMs = 300, timeoutMs = 5000, pollMs = 50 } = {}) {
+    const start = performance.now();
+    let layout = layoutSignature();
+    let layoutSince = start;
+
+    return new Promise((resolve) => {
+      function tick() {
+        const now = performance.now();
+        const current = layoutSignature();
+        if (current !== layout) {
+          layout = current;
+          layoutSince = now;
+        }
+        const domQuiet = now - lastMutation >= quietMs;
+        // An unchanged layout from the first tick counts as stable already
+        const layoutQuiet = layoutSince === start || now - layoutSince >= quietMs;
+        if (domQuiet && layoutQuiet) {
+          resolve({ stable: true, waitedMs: now - start, reason: null });
+          return;
+        }
+        if (now - start >= timeoutMs) {
+          resolve({
+            stable: false,
+            waitedMs: now - start,
+            reason: domQuiet ? "layout" : "mutations",
+          });
+          return;
+        }
+        setTimeout(tick, pollMs);
+      }
+      tick();
+    });
+  }
+
+  window.__autosurferSettle = {
+    waitForQuiet,
+    msSinceMutation: () => performance.now() - lastMutation,
+  };
+})();
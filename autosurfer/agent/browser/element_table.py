@@ -0,0 +1,174 @@
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+FIELDS = ("index", "tag", "id", "testid", "label", "text", "xpath", "priority")
+
+
+def _pairs(flat: Optional[List[Any]]) -> Dict[int, str]:
+    """Decode a flat [row, value, row, value, ...] list"""
+    if not flat:
+        return {}
+    return dict(zip(flat[0::2], flat[1::2]))
+
+
+class ElementRow:
+    """View of one row of an ElementTable.
+
+    Supports the dict-style access the planner and older callers use
+    (``row["tag"]``, ``row.get("text")``) without allocating a dict.
+    """
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: "ElementTable", row: int):
+        self._table = table
+        self._row = row
+
+    @property
+    def index(self) -> int:
+        return self._table.index[self._row]
+
+    @property
+    def tag(self) -> str:
+        return self._table.tag[self._row]
+
+    @property
+    def id(self) -> Optional[str]:
+        return self._table.id.get(self._row)
+
+    @property
+    def testid(self) -> Optional[str]:
+        return self._table.testid.get(self._row)
+
+    @property
+    def label(self) -> Optional[str]:
+        """aria-label, placeholder, title or alt, whichever comes first"""
+        return self._table.label.get(self._row)
+
+    @property
+    def text(self) -> str:
+        return self._table.text[self._row]
+
+    @property
+    def xpath(self) -> str:
+        return self._table.xpath[self._row]
+
+    @property
+    def priority(self) -> int:
+        return self._table.priority[self._row]
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in FIELDS else default
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in FIELDS}
+
+    def __repr__(self) -> str:
+        return f"ElementRow({self.to_dict()!r})"
+
+
+class ElementTable:
+    """Annotated elements stored column by column, in annotator order
+    (priority first, stable id breaks ties).
+
+    Decoded straight from the columnar wire format produced by
+    ``encodeColumns`` in dom/annotateDom.js; rows are exposed as
+    ElementRow views.
+    """
+
+    __slots__ = ("index", "priority", "tag", "text",
+                 "xpath", "id", "testid", "label", "_rows")
+
+    def __init__(self):
+        self.index = array("q")
+        self.priority = array("q")
+        self.tag: List[str] = []
+        self.text: List[str] = []
+        self.xpath: List[str] = []
+        # Sparse columns: row -> value
+        self.id: Dict[int, str] = {}
+        self.testid: Dict[int, str] = {}
+        self.label: Dict[int, str] = {}
+        self._rows: Optional[Dict[int, int]] = None
+
+    @classmethod
+    def from_columns(cls, cols: Dict[str, Any]) -> "ElementTable":
+        table = cls()
+        tags = cols["tags"]
+        table.index = array("q", cols["index"])
+        table.priority = array("q", cols["priority"])
+        table.tag = [tags[t] for t in cols["tag"]]
+        table.text = cols["text"]
+        table.xpath = cols["xpath"]
+        table.id = _pairs(cols.get("id"))
+        table.testid = _pairs(cols.get("testid"))
+        table.label = _pairs(cols.get("label"))
+        return table
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __iter__(self) -> Iterator[ElementRow]:
+        return (ElementRow(self, row) for row in range(len(self.index)))
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[ElementRow, List[ElementRow]]:
+        if isinstance(item, slice):
+            return [ElementRow(self, row) for row in range(*item.indices(len(self.index)))]
+        if item < 0:
+            item += len(self.index)
+        if not 0 <= item < len(self.index):
+            raise IndexError("element row out of range")
+        return ElementRow(self, item)
+
+    def find(self, index: int) -> Optional[ElementRow]:
+        """Row for a stable element id, or None"""
+        if self._rows is None:
+            self._rows = {uid: row for row, uid in enumerate(self.index)}
+        row = self._rows.get(index)
+        return None if row is None else ElementRow(self, row)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [row.to_dict() for row in self]
+
+    def _extend(self, other: "ElementTable", rows: Iterable[int]):
+        for row in rows:
+            new_row = len(self.index)
+            self.index.append(other.index[row])
+            self.priority.append(other.priority[row])
+            self.tag.append(other.tag[row])
+            self.text.append(other.text[row])
+            self.xpath.append(other.xpath[row])
+            if row in other.id:
+                self.id[new_row] = other.id[row]
+            if row in other.testid:
+                self.testid[new_row] = other.testid[row]
+            if row in other.label:
+                self.label[new_row] = other.label[row]
+
+    def merged(self, updates: Sequence["ElementTable"], removed: Iterable[int]) -> "ElementTable":
+        """New table without the ``removed`` ids and with the rows of
+        ``updates`` added or replacing rows with the same id"""
+        drop = set(removed)
+        for update in updates:
+            drop.update(update.index)
+        if not drop:
+            return self
+
+        table = ElementTable()
+        table._extend(self, (row for row, uid in enumerate(self.index)
+                             if uid not in drop))
+        for update in updates:
+            table._extend(update, range(len(update)))
+
+        order = sorted(range(len(table)),
+                       key=lambda row: (-table.priority[row], table.index[row]))
+        if order == list(range(len(table))):
+            return table
+        ordered = ElementTable()
+        ordered._extend(table, order)
+        return ordered
@@ -0,0 +1,196 @@
+from autosurfer.logger import logger
+from autosurfer.config import Config
+from autosurfer.agent.browser import action_errors
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+import time
+
+# Navigation strategies, cheapest first
+NOOP = "noop"            # already on the target
+BACK = "back"            # target is the previous history entry
+GOTO = "goto"            # regular navigation
+COMMITTED = "committed"  # goto timed out after the new document committed
+
+NAVIGATION_TIMEOUT_MS = 30000
+HISTORY_SIZE = 20
+
+_NON_HTTP_SCHEMES = ("about:", "data:", "file:", "javascript:", "blob:", "chrome:")
+
+
+def with_scheme(url: str) -> str:
+    """``example.com/x`` as ``https://example.com/x``; full URLs unchanged"""
+    url = url.strip()
+    if "://" in url or url.startswith(_NON_HTTP_SCHEMES):
+        return url
+    return f"https://{url}"
+
+
+def normalize_url(url: str) -> str:
+    """Form under which two URLs of the same page compare equal: default
+    ports and trailing slashes are ignored; scheme and host are kept, as an
+    http to https upgrade or a www host may serve another page"""
+    parts = urlsplit(with_scheme(url))
+    if parts.scheme not in ("http", "https"):
+        return url
+    host = (parts.hostname or "").lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    default_port = 80 if parts.scheme == "http" else 443
+    netloc = host if port in (None, default_port) else f"{host}:{port}"
+    return urlunsplit((parts.scheme, netloc, parts.path.rstrip("/"), parts.query, parts.fragment))
+
+
+def same_page(a: str, b: str) -> bool:
+    return normalize_url(a) == normalize_url(b)
+
+
+@dataclass
+class NavigationResult:
+    strategy: str
+    url: str
+    elapsed_ms: float
+
+
+class BaseNavigator:
+    """Reaches a URL the cheapest way it can.
+
+    A goto to the page we are on is skipped, a goto to the previous history
+    entry goes back instead (restored from the back/forward cache where the
+    browser allows it), and a goto whose document committed but did not
+    finish loading in time is kept instead of being loaded again. Main-frame
+    navigations are tracked from ``framenavigated`` to know the history.
+    """
+
+    def __init__(self, page: Any):
+        self.page = page
+        self.history: List[str] = []
+        if page.url and page.url != "about:blank":
+            self.history.append(page.url)
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.last: Optional[NavigationResult] = None
+        self._going_back = False
+        page.on("framenavigated", self._on_navigated)
+
+    def _on_navigated(self, frame: Any):
+        if frame.parent_frame is not None or self._going_back:
+            return
+        if self.history and self.history[-1] == frame.url:
+            return
+        self.history.append(frame.url)
+        del self.history[:-HISTORY_SIZE]
+
+    def _plan(self, url: str) -> str:
+        if same_page(self.page.url, url):
+            return NOOP
+        if len(self.history) >= 2 and same_page(self.history[-2], url):
+            return BACK
+        return GOTO
+
+    def _went_back(self, url: str) -> bool:
+        if not same_page(self.page.url, url):
+            logger.debug(
+                f"History back landed on {self.page.url}, not {url}")
+            return False
+        self.history.pop()
+        return True
+
+    def _done(self, strategy: str, url: str, start: float) -> NavigationResult:
+        result = NavigationResult(
+            strategy=strategy,
+            url=url,
+            elapsed_ms=(time.monotonic() - start) * 1000,
+        )
+        self.counts[strategy] += 1
+        self.last = result
+        logger.info(
+            f"Navigation to {url}: {strategy} ({result.elapsed_ms:.0f}ms)")
+        return result
+
+    def _keep_committed(self, url: str, start_url: str) -> bool:
+        """After a timeout: whether a new document committed and can stay"""
+        if self.page.url == start_url:
+            return False
+        logger.warn(
+            f"Navigation to {url} timed out; keeping the committed document {self.page.url}")
+        return True
+
+    def summary(self) -> Dict[str, int]:
+        return dict(self.counts)
+
+
+class Navigator(BaseNavigator):
+    def goto(self, url: str) -> NavigationResult:
+        start = time.monotonic()
+        url = with_scheme(url)
+        strategy = self._plan(url)
+        if strategy == BACK and not self._go_back(url):
+            strategy = GOTO
+        if strategy == GOTO:
+            strategy = self._goto(url)
+        return self._done(strategy, url, start)
+
+    def _go_back(self, url: str) -> bool:
+        self._going_back = True
+        try:
+            self.page.go_back(wait_until="domcontentloaded",
+                              timeout=Config.SETTLE_TIMEOUT_MS)
+        except Exception as e:
+            logger.debug(f"History back failed: {e}")
+            return False
+        finally:
+            self._going_back = False
+        return self._went_back(url)
+
+    def _goto(self, url: str) -> str:
+        start_url = self.page.url
+        try:
+            self.page.goto(url, wait_until="domcontentloaded",
+                           timeout=NAVIGATION_TIMEOUT_MS)
+        except action_errors.TimeoutError:
+            # Nothing committed: let the action fail and be retried
+            if not self._keep_committed(url, start_url):
+                raise
+            return COMMITTED
+        return GOTO
+
+
+class AsyncNavigator(BaseNavigator):
+    """Asyncio counterpart of Navigator"""
+
+    async def goto(self, url: str) -> NavigationResult:
+        start = time.monotonic()
+        url = with_scheme(url)
+        strategy = self._plan(url)
+        if strategy == BACK and not await self._go_back(url):
+            strategy = GOTO
+        if strategy == GOTO:
+            strategy = await self._goto(url)
+        return self._done(strategy, url, start)
+
+    async def _go_back(self, url: str) -> bool:
+        self._going_back = True
+        try:
+            await self.page.go_back(wait_until="domcontentloaded",
+                                    timeout=Config.SETTLE_TIMEOUT_MS)
+        except Exception as e:
+            logger.debug(f"History back failed: {e}")
+            return False
+        finally:
+            self._going_back = False
+        return self._went_back(url)
+
+    async def _goto(self, url: str) -> str:
+        start_url = self.page.url
+        try:
+            await self.page.goto(url, wait_until="domcontentloaded",
+                                 timeout=NAVIGATION_TIMEOUT_MS)
+        except action_errors.TimeoutError:
+            # Nothing committed: let the action fail and be retried
+            if not self._keep_committed(url, start_url):
+                raise
+            return COMMITTED
+        return GOTO
@@ -0,0 +1,62 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+from autosurfer.agent.browser.annotation_mirror import ANNOTATOR_VERSION
+from autosurfer.agent.browser.element_table import ElementTable
+from autosurfer.agent.browser.captcha_handler import (
+    CAPTCHA_INDICATORS,
+    CAPTCHA_SELECTORS,
+    CaptchaInfo,
+)
+
+SNAPSHOT_JS = (Path(__file__).parent / "dom" / "pageSnapshot.js").read_text()
+
+
+def snapshot_args(scan_captcha: bool, sync: Dict[str, Any]) -> Dict[str, Any]:
+    """Argument passed to SNAPSHOT_JS; ``sync`` comes from AnnotationMirror.sync_args()"""
+    return {
+        "annotatorVersion": ANNOTATOR_VERSION,
+        "captchaSelectors": CAPTCHA_SELECTORS,
+        "captchaIndicators": CAPTCHA_INDICATORS,
+        "scanCaptcha": scan_captcha,
+        "sync": sync,
+    }
+
+
+@dataclass
+class PageSnapshot:
+    """Everything the agent needs about the page for one step, captured by a
+    single in-page evaluate (see dom/pageSnapshot.js)."""
+    url: str
+    title: str
+    elements: ElementTable = field(default_factory=ElementTable)
+    scroll_info: Dict[str, Any] = field(default_factory=dict)
+    captcha_scanned: bool = False
+    captcha: Optional[CaptchaInfo] = None
+    dom_hash: Optional[str] = None
+    ui_state_hash: Optional[str] = None
+
+    @property
+    def scroll_position(self) -> Optional[int]:
+        return self.scroll_info.get("scrollY")
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any], elements: ElementTable) -> "PageSnapshot":
+        """Build from the SNAPSHOT_JS result; ``elements`` is the element table
+        after applying ``payload["elementsDelta"]`` to the mirror."""
+        captcha = payload.get("captcha")
+        return cls(
+            url=payload.get("url", ""),
+            title=payload.get("title", ""),
+            elements=elements,
+            scroll_info=payload.get("scroll") or {},
+            captcha_scanned=payload.get("captchaScanned", False),
+            captcha=CaptchaInfo(
+                type=captcha["type"],
+                confidence=captcha["confidence"],
+                selectors=[captcha["selector"]] if captcha.get(
+                    "selector") else [],
+            ) if captcha else None,
+            dom_hash=payload.get("domDigest"),
+            ui_state_hash=payload.get("uiDigest"),
+        )
@@ -0,0 +1,230 @@
+from autosurfer.logger import logger
+from autosurfer.config import Config
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import json
+import os
+import re
+import threading
+
+# One wait window shared by all candidates of a race
+SELECTOR_TIMEOUT_MS = 5000
+
+# (strategy name, Playwright selector)
+Candidate = Tuple[str, str]
+
+
+def playwright_selector(selector: str) -> str:
+    """A planner selector as Playwright expects it (XPaths need a prefix)"""
+    return f"xpath={selector}" if selector.startswith("/") else selector
+
+
+def _is_plain_text(selector: str) -> bool:
+    return not any(char in selector for char in ["#", ".", "[", "="])
+
+
+def click_selector_candidates(selector: str) -> List[Candidate]:
+    """Selector strategies to try, in order of preference, when clicking"""
+    if selector.startswith("/"):
+        return [("xpath", f"xpath={selector}")]
+    if selector.startswith("text="):
+        return [("text", selector)]
+    if selector.startswith(":has-text("):
+        return [("has-text", selector)]
+
+    # The original selector first, then text matches for plain text
+    candidates = [("selector", selector)]
+    if _is_plain_text(selector):
+        candidates.append(("text", f'text="{selector}"'))
+        candidates.append(("has-text", f':has-text("{selector}")'))
+    return candidates
+
+
+def fill_selector_candidates(selector: str) -> List[Candidate]:
+    """Selector strategies to try, in order of preference, when filling"""
+    if selector.startswith("/"):
+        return [("xpath", f"xpath={selector}")]
+
+    # For plain text, also look for an input by placeholder or name
+    candidates = [("selector", selector)]
+    if _is_plain_text(selector):
+        candidates.append(
+            ("placeholder", f'input[placeholder*="{selector}"]'))
+        candidates.append(("name", f'input[name*="{selector}"]'))
+    return candidates
+
+
+def visible_locator(page: Any, selector: str) -> Any:
+    return page.locator(selector).filter(visible=True)
+
+
+def combined_locator(page: Any, candidates: List[Candidate]) -> Any:
+    """One locator matching a visible element of any candidate, so all
+    strategies are waited on together instead of one timeout each"""
+    combined = None
+    for _, selector in candidates:
+        locator = visible_locator(page, selector)
+        combined = locator if combined is None else combined.or_(locator)
+    return combined.first
+
+
+@dataclass
+class StrategyStats:
+    raced: int = 0
+    hits: int = 0
+    total_ms: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.raced if self.raced else 0.0
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_ms / self.hits if self.hits else 0.0
+
+
+class SelectorStats:
+    """How often each selector strategy wins the race it takes part in"""
+
+    def __init__(self):
+        self.strategies: Dict[str, StrategyStats] = defaultdict(StrategyStats)
+        self.failures = 0
+
+    def record(self, candidates: List[Candidate], winner: Optional[str], elapsed_ms: float):
+        for strategy, _ in candidates:
+            self.strategies[strategy].raced += 1
+        if winner is None:
+            self.failures += 1
+            return
+        stats = self.strategies[winner]
+        stats.hits += 1
+        stats.total_ms += elapsed_ms
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {
+                "raced": s.raced,
+                "hits": s.hits,
+                "hit_rate": round(s.hit_rate, 3),
+                "avg_ms": round(s.avg_ms, 1),
+            }
+            for name, s in self.strategies.items()
+        }
+
+
+def normalize_selector(selector: str) -> str:
+    return re.sub(r"\s+", " ", selector.strip())
+
+
+def host_of(url: str) -> str:
+    return (urlsplit(url).hostname or "").lower()
+
+
+def _default_cache_path() -> Path:
+    if Config.SELECTOR_CACHE_PATH:
+        return Path(Config.SELECTOR_CACHE_PATH)
+    # project root is three levels up from this file (autosurfer/agent/browser/)
+    return Path(__file__).resolve().parents[3] / ".temp" / "selector_cache.json"
+
+
+class SelectorCache:
+    """Which strategy resolved a selector on a given host, and how fast.
+
+    Keyed by (host, normalized selector); each entry maps strategy name to
+    [wins, average ms]. Least recently used entries are evicted beyond
+    ``max_entries``. Loaded lazily from and saved to a JSON file so recurring
+    runs on the same sites start with what earlier runs learned.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_entries: Optional[int] = None):
+        self.path = path or _default_cache_path()
+        self.max_entries = max_entries or Config.SELECTOR_CACHE_SIZE
+        self._entries: "OrderedDict[str, Dict[str, List[float]]]" = OrderedDict()
+        self._loaded = False
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+
+    @staticmethod
+    def _key(host: str, selector: str) -> str:
+        return f"{host} {normalize_selector(selector)}"
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._entries = OrderedDict(json.load(f))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warn(f"Ignoring unreadable selector cache {self.path}: {e}")
+
+    def order(self, host: str, selector: str, candidates: List[Candidate]) -> Tuple[List[Candidate], bool]:
+        """Candidates with strategies that won before first, fastest first;
+        the rest keep their default preference order. The flag tells whether
+        the first candidate is a learned winner."""
+        with self._lock:
+            self._load()
+            self.lookups += 1
+            key = self._key(host, selector)
+            entry = self._entries.get(key)
+            if not entry:
+                return candidates, False
+            self.hits += 1
+            self._entries.move_to_end(key)
+
+        def rank(candidate: Candidate):
+            won = entry.get(candidate[0])
+            return (0, won[1]) if won else (1, 0.0)
+        ordered = sorted(candidates, key=rank)
+        return ordered, ordered[0][0] in entry
+
+    def record(self, host: str, selector: str, strategy: Optional[str], elapsed_ms: float):
+        if strategy is None:
+            return
+        with self._lock:
+            self._load()
+            key = self._key(host, selector)
+            entry = self._entries.pop(key, {})
+            wins, avg_ms = entry.get(strategy, [0, 0.0])
+            entry[strategy] = [wins + 1,
+                               round((avg_ms * wins + elapsed_ms) / (wins + 1), 1)]
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def save(self):
+        """Write the cache atomically (no-op if nothing was learned)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            self._dirty = False
+        logger.debug(
+            f"Selector cache saved ({len(self._entries)} entries, hit rate {self.hit_rate:.0%})")
+
+
+_shared_cache: Optional[SelectorCache] = None
+
+
+def get_selector_cache() -> SelectorCache:
+    """Process-wide cache shared by every executor"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = SelectorCache()
+    return _shared_cache
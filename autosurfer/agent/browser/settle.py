@@ -0,0 +1,162 @@
+from autosurfer.logger import logger
+from autosurfer.config import Config
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+import asyncio
+import time
+
+SETTLE_JS = (Path(__file__).parent / "dom" / "settle.js").read_text()
+
+# Resolves to null when the settle probe is not installed in this document
+WAIT_FOR_QUIET_JS = "(opts) => window.__autosurferSettle ? window.__autosurferSettle.waitForQuiet(opts) : null"
+
+# Traffic that never "finishes" in a useful sense: sockets, server-sent
+# events, sendBeacon pings and streamed media
+IGNORED_RESOURCE_TYPES = {"websocket", "eventsource", "ping", "media"}
+
+POLL_INTERVAL_MS = 50
+
+
+@dataclass
+class SettleResult:
+    stable: bool
+    waited_ms: float
+    reason: Optional[str] = None
+    pending_requests: int = 0
+
+
+class RequestTracker:
+    """Count in-flight requests from page events, ignoring long-lived traffic.
+
+    Requests still open after ``long_request_ms`` (long-polling, analytics
+    that never complete) stop counting against settle.
+    """
+
+    def __init__(self, page: Any, long_request_ms: int):
+        self.long_request_ms = long_request_ms
+        self._inflight: Dict[Any, float] = {}
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_done)
+        page.on("requestfailed", self._on_done)
+
+    def _on_request(self, request):
+        if request.resource_type in IGNORED_RESOURCE_TYPES:
+            return
+        self._inflight[request] = time.monotonic()
+
+    def _on_done(self, request):
+        self._inflight.pop(request, None)
+
+    def pending(self) -> int:
+        now = time.monotonic()
+        cutoff = self.long_request_ms / 1000
+        # Drop requests that never reported completion (e.g. aborted by navigation)
+        for request in [r for r, t in self._inflight.items() if now - t > cutoff * 10]:
+            del self._inflight[request]
+        return sum(1 for t in self._inflight.values() if now - t < cutoff)
+
+
+class BasePageSettler:
+    def __init__(
+        self,
+        page: Any,
+        timeout_ms: Optional[int] = None,
+        quiet_ms: Optional[int] = None,
+        long_request_ms: Optional[int] = None,
+    ):
+        self.page = page
+        self.timeout_ms = timeout_ms or Config.SETTLE_TIMEOUT_MS
+        self.quiet_ms = quiet_ms or Config.SETTLE_QUIET_MS
+        self.requests = RequestTracker(
+            page, long_request_ms or Config.SETTLE_LONG_REQUEST_MS)
+
+    def _result(self, start: float, dom: Optional[Dict[str, Any]]) -> SettleResult:
+        pending = self.requests.pending()
+        stable = bool(dom and dom.get("stable")) and pending == 0
+        reason = None
+        if not stable:
+            reason = (dom or {}).get("reason") or (
+                "network" if pending else "timeout")
+        result = SettleResult(
+            stable=stable,
+            waited_ms=(time.monotonic() - start) * 1000,
+            reason=reason,
+            pending_requests=pending,
+        )
+        logger.debug(
+            f"Page settle: {'stable' if stable else f'gave up ({reason})'} after {result.waited_ms:.0f}ms")
+        return result
+
+
+class PageSettler(BasePageSettler):
+    """Wait until the page is stable: DOM quiet, layout unchanged and no
+    short-lived requests in flight, bounded by ``timeout_ms``."""
+
+    def settle(self, timeout_ms: Optional[int] = None) -> SettleResult:
+        start = time.monotonic()
+        deadline = start + (timeout_ms or self.timeout_ms) / 1000
+        dom = None
+
+        while True:
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms <= 0:
+                break
+            try:
+                self.page.wait_for_load_state(
+                    "domcontentloaded", timeout=remaining_ms)
+                dom = self.page.evaluate(
+                    WAIT_FOR_QUIET_JS, {"quietMs": self.quiet_ms, "timeoutMs": remaining_ms})
+                if dom is None:
+                    self.page.evaluate(SETTLE_JS)
+                    continue
+            except Exception as e:
+                # Execution context destroyed by a navigation; wait for the new document
+                logger.debug(f"Settle probe interrupted: {e}")
+                dom = None
+                if self.page.is_closed():
+                    break
+                # Back off as a probe that ran does, rather than spinning
+                self.page.wait_for_timeout(POLL_INTERVAL_MS)
+                continue
+
+            if dom.get("stable") and self.requests.pending() == 0:
+                break
+            self.page.wait_for_timeout(POLL_INTERVAL_MS)
+
+        return self._result(start, dom)
+
+
+class AsyncPageSettler(BasePageSettler):
+    """Asyncio counterpart of PageSettler"""
+
+    async def settle(self, timeout_ms: Optional[int] = None) -> SettleResult:
+        start = time.monotonic()
+        deadline = start + (timeout_ms or self.timeout_ms) / 1000
+        dom = None
+
+        while True:
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms <= 0:
+                break
+            try:
+                await self.page.wait_for_load_state(
+                    "domcontentloaded", timeout=remaining_ms)
+                dom = await self.page.evaluate(
+                    WAIT_FOR_QUIET_JS, {"quietMs": self.quiet_ms, "timeoutMs": remaining_ms})
+                if dom is None:
+                    await self.page.evaluate(SETTLE_JS)
+                    continue
+            except Exception as e:
+                logger.debug(f"Settle probe interrupted: {e}")
+                dom = None
+                if self.page.is_closed():
+                    break
+                await asyncio.sleep(POLL_INTERVAL_MS / 1000)
+                continue
+
+            if dom.get("stable") and self.requests.pending() == 0:
+                break
+            await asyncio.sleep(POLL_INTERVAL_MS / 1000)
+
+        return self._result(start, dom)
@@ -1,55 +1,221 @@
 from autosurfer.logger import logger
-from autosurfer.agent.brain.task_planner import next_action
+from autosurfer.agent.brain.task_planner import next_action, stream_next_action
 from autosurfer.agent.brain.memory import AgentMemory, MemoryEntry
+from autosurfer.agent.brain.prompt_builder import PromptBuilder
 from autosurfer.agent.browser.adapters import BrowserAdapter, BrowserSettings, create_browser_adapter
 from autosurfer.config import Config
-from autosurfer.agent.browser.action_executor import BrowserActionExecutor
+from autosurfer.llm.response_schema.browser_actions import MoreElementsAction
+from autosurfer.llm.plan_cache import get_plan_cache
+from autosurfer.llm.plan_stream import PlanStream
+from autosurfer.agent.browser.action_errors import ActionExecutionError
+from autosurfer.agent.browser.action_executor import BrowserActionExecutor, element_ids
 from autosurfer.agent.browser.captcha_handler import CaptchaHandler
+from autosurfer.agent.browser.page_snapshot import PageSnapshot
 import time
 from typing import List, Dict, Any, Optional
 import re
-import hashlib
 
 
-class AutoSurferAgent:
-    def __init__(self, objective: str, browser_session: BrowserAdapter, max_retries: int = 3, enable_memory: bool = False):
+class BaseAutoSurferAgent:
+    """State and bookkeeping shared by the sync and asyncio agents"""
+
+    def __init__(self, objective: str, browser_session: Any, max_retries: int = 3, enable_memory: bool = False, cache_plans: bool = True, stream_plans: bool = True):
         self.objective = objective
         self.browser_session = browser_session
         self.max_retries = max_retries
         self.enable_memory = enable_memory
+        # Opt out for objectives whose plans must never be reused
+        self.cache_plans = cache_plans
+        # Start executing a plan while the planner is still generating it
+        self.stream_plans = stream_plans and Config.PLANNER_STREAMING
 
         self.memory = AgentMemory(
             objective=objective) if enable_memory else None
+        self.prompt_builder = PromptBuilder()
+        self.action_count = 0  # Simple counter for non-memory mode
+
+    def _remember(self, memory_entry: MemoryEntry):
+        """Add the entry to memory (if enabled) and log a concise snapshot"""
+        if self.memory:
+            self.memory.add_entry(memory_entry)
+
+            # Build concise memory snapshot
+            snapshot = self.memory.get_progress_context()
+            extra = []
+            if self.memory.accomplishments:
+                extra.append(
+                    f"Accomplishments: {len(self.memory.accomplishments)}")
+            if self.memory.failures:
+                extra.append(f"Failures: {len(self.memory.failures)}")
+            if extra:
+                snapshot += "\n" + " | ".join(extra)
+
+            logger.info(f"[MEM] {snapshot}")
+        else:
+            self.action_count += 1
+
+    def _plan_failed(self, plan):
+        """A plan that failed must not be served again for the same prompt"""
+        if self.cache_plans:
+            get_plan_cache().forget(plan)
+
+    def _save_plan_cache(self):
+        if self.cache_plans:
+            cache = get_plan_cache()
+            logger.debug(f"Plan cache: {cache.summary()}")
+            cache.save()
+
+    def _build_memory_entry(self, plan, success: bool, attempt: int, error_message: Optional[str], before: PageSnapshot, after: PageSnapshot, wait_ms: Optional[float] = None) -> MemoryEntry:
+        """Memory entry for one step: page identity from the pre-action
+        snapshot, loop-detection signals from the post-action snapshot."""
+        return MemoryEntry(
+            timestamp=time.time(),
+            action_type=self._get_primary_action_type(plan),
+            description=self._get_action_description(plan),
+            success=success,
+            page_url=before.url,
+            page_title=str(before.title),
+            attempts=attempt + 1 if not success else 1,
+            error_message=error_message,
+            ui_elements_count=len(before.elements),
+            dom_hash=after.dom_hash,
+            ui_state_hash=after.ui_state_hash,
+            scroll_position=after.scroll_position,
+            retry_count=attempt + 1,
+            wait_ms=wait_ms
+        )
+
+    def _requested_view(self, plan) -> Optional[MoreElementsAction]:
+        """The more_elements action that ended the plan, if any"""
+        return next((item.action for item in plan.actions
+                     if item.action.type == "more_elements"), None)
+
+    def _touched_page(self, plan) -> bool:
+        """Whether actions ran on the page before the plan's more_elements"""
+        return bool(plan.actions) and plan.actions[0].action.type != "more_elements"
+
+    def _should_stop(self, plan, consecutive_failures: int) -> bool:
+        """Check completion, failure and loop conditions after a step"""
+        # Check if task is complete
+        if hasattr(plan, 'actions') and any(item.action.type == "done" for item in plan.actions):
+            logger.info("✅ Task completed by agent.")
+            return True
+
+        # Check for too many consecutive failures
+        if consecutive_failures >= 3:
+            logger.error(
+                "Too many consecutive failures. Stopping agent.")
+            return True
+
+        # Check if agent is stuck using memory system
+        if self.memory and self.memory.is_stuck():
+            logger.warn(
+                "Agent appears to be stuck in a loop. Stopping agent.")
+            return True
+
+        # Simple loop detection without memory
+        if not self.memory and self.action_count > 10:
+            logger.warn(
+                "Agent has performed many actions. Stopping to prevent infinite loop.")
+            return True
+
+        return False
+
+    def _get_action_description(self, plan) -> str:
+        """Extract a human-readable description of the planned actions"""
+        descriptions = []
+        if not hasattr(plan, 'actions'):
+            return "Unknown action"
+
+        for item in plan.actions:
+            if item.action.type == "goto":
+                descriptions.append(f"Navigate to {item.action.url}")
+            elif item.action.type == "click":
+                descriptions.append(f"Click {item.action.selector}")
+            elif item.action.type == "fill":
+                descriptions.append(
+                    f"Fill {item.action.selector} with {item.action.value}")
+            elif item.action.type == "click_element":
+                descriptions.append(f"Click element [{item.action.element}]")
+            elif item.action.type == "fill_element":
+                descriptions.append(
+                    f"Fill element [{item.action.element}] with {item.action.value}")
+            elif item.action.type == "fill_form":
+                descriptions.append(
+                    f"Fill form ({len(item.action.fields)} fields)")
+            elif item.action.type == "more_elements":
+                view = f"page {item.action.page}"
+                if item.action.kind:
+                    view += f", {item.action.kind}"
+                if item.action.text:
+                    view += f", containing '{item.action.text}'"
+                descriptions.append(f"Show more elements ({view})")
+            elif item.action.type == "done":
+                descriptions.append(f"Complete task: {item.action.summary}")
+            else:
+                descriptions.append(f"{item.action.type}: {item.thought}")
+
+        return "; ".join(descriptions)
+
+    def _get_primary_action_type(self, plan) -> str:
+        """Get the primary action type from the plan"""
+        if not hasattr(plan, 'actions') or not plan.actions:
+            return "unknown"
+
+        # Prioritize done action
+        for item in plan.actions:
+            if item.action.type == "done":
+                return "done"
+
+        # Return the first action type
+        return plan.actions[0].action.type
+
+
+class AutoSurferAgent(BaseAutoSurferAgent):
+    def __init__(self, objective: str, browser_session: BrowserAdapter, max_retries: int = 3, enable_memory: bool = False, cache_plans: bool = True, stream_plans: bool = True):
+        super().__init__(objective, browser_session,
+                         max_retries, enable_memory, cache_plans, stream_plans)
 
     def run(self):
         logger.info(f"🎯 Objective: {self.objective}")
+        page = self.browser_session.page
         executor = BrowserActionExecutor(
-            page=self.browser_session.page,
+            page=page,
             browser_session=self.browser_session.browser
         )
 
         # Initialize captcha handler
-        captcha_handler = CaptchaHandler(self.browser_session.page)
+        captcha_handler = CaptchaHandler(page)
+
+        # Blocking rules can depend on what the objective is about
+        interceptor = getattr(self.browser_session, "interceptor", None)
+        if interceptor:
+            interceptor.set_objective(self.objective)
 
         try:
             retry_count = 0
             consecutive_failures = 0
-            action_count = 0  # Simple counter for non-memory mode
+            # more_elements action of the previous step: served from its snapshot
+            element_view = None
+
+            # The post-action snapshot of one step is the pre-action state of the next
+            snapshot = executor.snapshot(
+                scan_captcha=captcha_handler.needs_scan(page.url))
 
             while True:
                 # Get current page state
-                current_url = self.browser_session.page.url
-                page_title = self.browser_session.page.title()
+                current_url = snapshot.url
+                page_title = snapshot.title
                 logger.info(f"📍 Current URL: {current_url}")
                 logger.info(f"📄 Page Title: {page_title}")
 
                 # Check for captcha before proceeding
-                if not captcha_handler.handle_captcha_detection():
+                if not captcha_handler.handle_snapshot(snapshot):
                     logger.error("❌ Task terminated due to captcha detection")
                     break
 
                 # Get UI elements
-                ui_elements = executor.annotate_ui()
+                ui_elements = snapshot.elements
 
                 # Add page context to memory
                 page_context = {
@@ -60,36 +226,48 @@ class AutoSurferAgent:
                     "consecutive_failures": consecutive_failures
                 }
 
-                # Plan next action
-                plan = next_action(
-                    objective=self.objective,
-                    ui_elements=ui_elements,
-                    memory=self.memory,
-                    page_context=page_context
-                )
+                # Plan next action (a streamed plan runs as it arrives)
+                planner = stream_next_action if self.stream_plans else next_action
+
+                def request_plan():
+                    return planner(
+                        objective=self.objective,
+                        ui_elements=ui_elements,
+                        memory=self.memory,
+                        page_context=page_context,
+                        use_cache=self.cache_plans,
+                        prompt_builder=self.prompt_builder,
+                        element_view=element_view
+                    )
+
+                plan = request_plan()
 
                 # Execute action with retry logic
                 execution_success = False
                 error_message = None
+                # Retries resume at the failed action, not the start of the plan
+                resume_at = 0
                 for attempt in range(self.max_retries):
                     try:
-                        executor.execute(plan)
+                        if isinstance(plan, PlanStream):
+                            plan = executor.execute_stream(plan)
+                        else:
+                            executor.execute(plan, start_at=resume_at)
                         execution_success = True
                         consecutive_failures = 0
                         logger.info(
                             f"✅ Action executed successfully on attempt {attempt + 1}")
-
-                        # If the plan started with a navigation, log new URL/title
-                        if any(it.action.type == "goto" for it in plan.actions):
-                            new_url = self.browser_session.page.url
-                            new_title = self.browser_session.page.title()
-                            logger.info(f"📍 URL after navigation: {new_url}")
-                            logger.info(
-                                f"📄 Title after navigation: {new_title}")
-
                         break
-                    except Exception as e:
+                    except ActionExecutionError as e:
                         error_message = str(e)
+                        resume_at = e.index
+                        replan = False
+                        if e.plan is not None:
+                            plan = e.plan
+                        elif isinstance(plan, PlanStream):
+                            # The response did not parse: nothing of it ran
+                            plan = plan.current_plan()
+                            replan = True
                         logger.warn(f"❌ Attempt {attempt + 1} failed: {e}")
 
                         # Check if failure might be due to captcha
@@ -99,103 +277,54 @@ class AutoSurferAgent:
                             break
 
                         if attempt < self.max_retries - 1:
-                            time.sleep(1)  # Brief pause before retry
+                            executor.recover(e)
+                            if replan:
+                                plan = request_plan()
                         else:
                             consecutive_failures += 1
                             logger.error(
                                 f"❌ All retry attempts failed for action: {e}")
 
                 # If the action we just executed could spawn a captcha overlay, invalidate the captcha cache so the next loop re-checks.
-                if execution_success and any(it.action.type in {"click", "fill", "press"} for it in plan.actions):
+                if execution_success and any(it.action.type in {"click", "fill", "click_element", "fill_element", "fill_form", "press"} for it in plan.actions):
                     captcha_handler.invalidate_cache()
 
+                if execution_success:
+                    self.prompt_builder.record_used(
+                        page_context["url"], (element for item in plan.actions
+                                              for element in element_ids(item.action)))
+                else:
+                    self._plan_failed(plan)
+
                 # If captcha was detected, break out of the loop
                 if not execution_success and not captcha_handler.handle_captcha_detection():
                     break
 
-                # Create memory entry
-                action_description = self._get_action_description(plan)
-
-                # --- Capture signals for robust loop detection ---
-                # DOM hash
-                dom_html = executor.page.evaluate(
-                    "() => document.body.innerHTML")
-                dom_hash = hashlib.sha256(dom_html.encode(
-                    "utf-8")).hexdigest() if dom_html else None
-                # UI state hash (hash the stringified list of UI elements)
-                ui_elements_state = executor.annotate_ui()
-                ui_state_str = str(ui_elements_state)
-                ui_state_hash = hashlib.sha256(ui_state_str.encode(
-                    "utf-8")).hexdigest() if ui_state_str else None
-                # Scroll position
-                scroll_info = executor.get_scroll_info() if hasattr(
-                    executor, 'get_scroll_info') else None
-                scroll_position = scroll_info["scrollY"] if scroll_info and "scrollY" in scroll_info else None
-                # Retry count (attempts for this action)
-                retry_count = attempt + 1
-                # --- End capture signals ---
-
-                memory_entry = MemoryEntry(
-                    timestamp=time.time(),
-                    action_type=self._get_primary_action_type(plan),
-                    description=action_description,
-                    success=execution_success,
-                    page_url=current_url,
-                    page_title=str(page_title),
-                    attempts=attempt + 1 if not execution_success else 1,
-                    error_message=error_message,
-                    ui_elements_count=len(ui_elements),
-                    dom_hash=dom_hash,
-                    ui_state_hash=ui_state_hash,
-                    scroll_position=scroll_position,
-                    retry_count=retry_count
-                )
-
-                # Add to memory if enabled
-                if self.memory:
-                    self.memory.add_entry(memory_entry)
-
-                    # Build concise memory snapshot
-                    snapshot = self.memory.get_progress_context()
-                    extra = []
-                    if self.memory.accomplishments:
-                        extra.append(
-                            f"Accomplishments: {len(self.memory.accomplishments)}")
-                    if self.memory.failures:
-                        extra.append(f"Failures: {len(self.memory.failures)}")
-                    if extra:
-                        snapshot += "\n" + " | ".join(extra)
-
-                    logger.info(f"[MEM] {snapshot}")
-                else:
-                    action_count += 1
+                # Post-action snapshot (settles first): loop-detection signals now, page state next step
+                element_view = self._requested_view(
+                    plan) if execution_success else None
+                previous_snapshot = snapshot
+                # A plan that only asked for more elements left the page as it was
+                if element_view is None or self._touched_page(plan):
+                    snapshot = executor.snapshot(
+                        scan_captcha=captcha_handler.needs_scan(page.url))
 
-                # Check if task is complete
-                if hasattr(plan, 'actions') and any(item.action.type == "done" for item in plan.actions):
-                    logger.info("✅ Task completed by agent.")
-                    break
+                # If the plan contained a navigation, log new URL/title
+                if any(it.action.type == "goto" for it in plan.actions):
+                    logger.info(f"📍 URL after navigation: {snapshot.url}")
+                    logger.info(f"📄 Title after navigation: {snapshot.title}")
 
-                # Check for too many consecutive failures
-                if consecutive_failures >= 3:
-                    logger.error(
-                        "Too many consecutive failures. Stopping agent.")
-                    break
+                # Retry count (attempts for this action)
+                retry_count = attempt + 1
 
-                # Check if agent is stuck using memory system
-                if self.memory and self.memory.is_stuck():
-                    logger.warn(
-                        "Agent appears to be stuck in a loop. Stopping agent.")
-                    break
+                memory_entry = self._build_memory_entry(
+                    plan, execution_success, attempt, error_message,
+                    before=previous_snapshot, after=snapshot, wait_ms=executor.wait_ms)
+                self._remember(memory_entry)
 
-                # Simple loop detection without memory
-                if not self.memory and action_count > 10:
-                    logger.warn(
-                        "Agent has performed many actions. Stopping to prevent infinite loop.")
+                if self._should_stop(plan, consecutive_failures):
                     break
 
-                # Simple delay
-                time.sleep(2)
-
         except Exception as e:
             logger.error(f"Agent execution failed: {e}")
             raise
@@ -204,39 +333,15 @@ class AutoSurferAgent:
             if self.memory:
                 self.memory.save_to_file()
 
+            logger.debug(
+                f"Selector strategy stats: {executor.selector_stats.summary()}")
+            logger.debug(
+                f"Navigation strategies: {executor.navigator.summary()}")
+            executor.selector_cache.save()
+            self._save_plan_cache()
+            logger.info(f"Planner prompts: {self.prompt_builder.summary()}")
+            if interceptor:
+                logger.info(
+                    f"Request interception: {interceptor.stats.summary()}")
             logger.info("Agent execution finished!")
             self.browser_session.close()
-
-    def _get_action_description(self, plan) -> str:
-        """Extract a human-readable description of the planned actions"""
-        descriptions = []
-        if not hasattr(plan, 'actions'):
-            return "Unknown action"
-
-        for item in plan.actions:
-            if item.action.type == "goto":
-                descriptions.append(f"Navigate to {item.action.url}")
-            elif item.action.type == "click":
-                descriptions.append(f"Click {item.action.selector}")
-            elif item.action.type == "fill":
-                descriptions.append(
-                    f"Fill {item.action.selector} with {item.action.value}")
-            elif item.action.type == "done":
-                descriptions.append(f"Complete task: {item.action.summary}")
-            else:
-                descriptions.append(f"{item.action.type}: {item.thought}")
-
-        return "; ".join(descriptions)
-
-    def _get_primary_action_type(self, plan) -> str:
-        """Get the primary action type from the plan"""
-        if not hasattr(plan, 'actions') or not plan.actions:
-            return "unknown"
-
-        # Prioritize done action
-        for item in plan.actions:
-            if item.action.type == "done":
-                return "done"
-
-        # Return the first action type
-        return plan.actions[0].action.type
@@ -19,3 +19,50 @@ class Config:
     # BrowserBase configuration
     BROWSERBASE_API_KEY = os.getenv("BROWSERBASE_API_KEY")
     BROWSERBASE_PROJECT_ID = os.getenv("BROWSERBASE_PROJECT_ID")
+
+    # Page settle bounds (milliseconds)
+    SETTLE_TIMEOUT_MS = int(os.getenv("AUTOSURFER_SETTLE_TIMEOUT_MS", "5000"))
+    SETTLE_QUIET_MS = int(os.getenv("AUTOSURFER_SETTLE_QUIET_MS", "300"))
+    SETTLE_LONG_REQUEST_MS = int(
+        os.getenv("AUTOSURFER_SETTLE_LONG_REQUEST_MS", "3000"))
+
+    # Scroll end detection: frames without movement that count as idle where
+    # `scrollend` is unsupported, and the overall bound (milliseconds)
+    SCROLL_IDLE_MS = int(os.getenv("AUTOSURFER_SCROLL_IDLE_MS", "200"))
+    SCROLL_TIMEOUT_MS = int(os.getenv("AUTOSURFER_SCROLL_TIMEOUT_MS", "2000"))
+
+    # Per-domain selector strategy cache (JSON file, LRU-bounded)
+    SELECTOR_CACHE_PATH = os.getenv("AUTOSURFER_SELECTOR_CACHE_PATH")
+    SELECTOR_CACHE_SIZE = int(
+        os.getenv("AUTOSURFER_SELECTOR_CACHE_SIZE", "5000"))
+
+    # Planner response cache (JSON file, LRU-bounded, entries expire after TTL)
+    PLAN_CACHE = os.getenv("AUTOSURFER_PLAN_CACHE", "1") != "0"
+    PLAN_CACHE_PATH = os.getenv("AUTOSURFER_PLAN_CACHE_PATH")
+    PLAN_CACHE_SIZE = int(os.getenv("AUTOSURFER_PLAN_CACHE_SIZE", "2000"))
+    PLAN_CACHE_TTL_S = float(
+        os.getenv("AUTOSURFER_PLAN_CACHE_TTL_S", str(7 * 24 * 3600)))
+
+    # Planner prompt: hard token budget (counted locally), elements per page
+    # of the element table, characters of element text per row
+    PROMPT_TOKEN_BUDGET = int(os.getenv("AUTOSURFER_PROMPT_TOKEN_BUDGET", "4000"))
+    PROMPT_MAX_ELEMENTS = int(os.getenv("AUTOSURFER_PROMPT_MAX_ELEMENTS", "20"))
+    PROMPT_TEXT_CHARS = int(os.getenv("AUTOSURFER_PROMPT_TEXT_CHARS", "60"))
+
+    # After the first full element table on a page, send only the elements
+    # that changed, unless they outnumber this share of the table
+    PROMPT_DELTA = os.getenv("AUTOSURFER_PROMPT_DELTA", "1") != "0"
+    PROMPT_DELTA_MAX_RATIO = float(
+        os.getenv("AUTOSURFER_PROMPT_DELTA_MAX_RATIO", "0.5"))
+
+    # Order elements by relevance to the objective (mixed with the
+    # annotator's priority by this weight) before the prompt's cut
+    RANK_ELEMENTS = os.getenv("AUTOSURFER_RANK_ELEMENTS", "1") != "0"
+    RANK_RELEVANCE_WEIGHT = float(
+        os.getenv("AUTOSURFER_RANK_RELEVANCE_WEIGHT", "0.7"))
+
+    # Execute planned actions while the planner response is still streaming
+    PLANNER_STREAMING = os.getenv("AUTOSURFER_PLANNER_STREAMING", "1") != "0"
+
+    # Directory of the record/replay network archive
+    NETWORK_ARCHIVE_PATH = os.getenv("AUTOSURFER_NETWORK_ARCHIVE_PATH")
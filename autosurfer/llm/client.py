@@ -1,18 +1,38 @@
-from langchain_openai import ChatOpenAI
 from autosurfer.config import Config
 from autosurfer.llm.response_schema.browser_actions import NextActions
-from langchain_core.utils import get_from_env
 
+OPENAI_MODEL = "gpt-4o"
 
-def get_llm_client(client):
+
+def get_llm_client(client, streaming: bool = False):
+    """Planner client. The default one returns the validated NextActions as
+    ``parsed`` next to the ``raw`` message; the streaming one yields the raw JSON of a NextActions in chunks, to be
+    parsed incrementally (see autosurfer.llm.plan_stream)"""
     if client == "openai":
         if not Config.OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY environment variable is required")
 
+        # langchain_openai takes over a second to import; only pay for it
+        # when a client is actually built
+        from langchain_openai import ChatOpenAI
+
         openai_model = ChatOpenAI(
-            model="gpt-4o",
+            model=OPENAI_MODEL,
             temperature=0,
+            # Token usage (incl. cached prompt tokens) on the last chunk
+            stream_usage=True,
         )
-        return openai_model.with_structured_output(NextActions)
+        if streaming:
+            # Not strict: strict schemas cannot have optional fields or defaults
+            return openai_model.bind(response_format={
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "NextActions",
+                    "schema": NextActions.model_json_schema(),
+                    "strict": False,
+                },
+            })
+        # Raw message kept for its token usage
+        return openai_model.with_structured_output(NextActions, include_raw=True)
     else:
         raise ValueError(f"Unsupported LLM client: {client}")
@@ -0,0 +1,240 @@
+from autosurfer.logger import logger
+from autosurfer.config import Config
+from autosurfer.llm.response_schema.browser_actions import NextActions
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+
+# Changes whenever the action schema does, so plans of an older schema are
+# never replayed
+SCHEMA_FINGERPRINT = hashlib.sha1(json.dumps(
+    NextActions.model_json_schema(), sort_keys=True).encode()).hexdigest()[:12]
+
+# Plans handed out recently, so a plan that failed can be traced to its key
+_ORIGINS_SIZE = 256
+
+
+def _default_cache_path() -> Path:
+    if Config.PLAN_CACHE_PATH:
+        return Path(Config.PLAN_CACHE_PATH)
+    # project root is two levels up from this file (autosurfer/llm/)
+    return Path(__file__).resolve().parents[2] / ".temp" / "plan_cache.json"
+
+
+def _canonical(message: Any) -> Dict[str, Any]:
+    return {"type": message.type, "content": message.content}
+
+
+def plan_key(messages: List[Any], model: str) -> str:
+    """Hash of everything the model sees: the rendered prompt (objective,
+    page context, elements, memory), the model and the action schema"""
+    payload = json.dumps(
+        {"model": model, "schema": SCHEMA_FINGERPRINT,
+         "messages": [_canonical(m) for m in messages]},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class PlanCache:
+    """NextActions by prompt hash, with TTL and LRU eviction.
+
+    Kept in memory and loaded lazily from / saved atomically to a JSON file,
+    so repeated runs of the same objectives start warm. Concurrent requests
+    for the same key share one in-flight LLM call (single flight), whether
+    they come from threads or from tasks on one event loop.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_entries: Optional[int] = None,
+                 ttl_s: Optional[float] = None):
+        self.path = path or _default_cache_path()
+        self.max_entries = max_entries or Config.PLAN_CACHE_SIZE
+        self.ttl_s = ttl_s if ttl_s is not None else Config.PLAN_CACHE_TTL_S
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._origins: "OrderedDict[int, Tuple[NextActions, str]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._async_inflight: Dict[str, "asyncio.Future"] = {}
+        self._loaded = False
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._entries = OrderedDict(json.load(f))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warn(f"Ignoring unreadable plan cache {self.path}: {e}")
+
+    def _lookup(self, key: str) -> Optional[NextActions]:
+        """Cached plan or None; caller holds the lock"""
+        self._load()
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry["created"] > self.ttl_s:
+            del self._entries[key]
+            self._dirty = True
+            return None
+        self._entries.move_to_end(key)
+        plan = NextActions.model_validate(entry["plan"])
+        self._remember_origin(plan, key)
+        return plan
+
+    def _store(self, key: str, plan: NextActions):
+        """Cache a plan; caller holds the lock"""
+        self._load()
+        self._entries[key] = {"created": time.time(),
+                              "plan": plan.model_dump(mode="json")}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._remember_origin(plan, key)
+        self._dirty = True
+
+    def _remember_origin(self, plan: NextActions, key: str):
+        self._origins[id(plan)] = (plan, key)
+        while len(self._origins) > _ORIGINS_SIZE:
+            self._origins.popitem(last=False)
+
+    def forget(self, plan: NextActions):
+        """Drop the entry a plan came from (e.g. because it failed), so the
+        same prompt asks the model again"""
+        with self._lock:
+            origin = self._origins.pop(id(plan), None)
+            if origin and origin[0] is plan and self._entries.pop(origin[1], None):
+                self._dirty = True
+                logger.debug("Dropped failed plan from the plan cache")
+
+    def get(self, key: str) -> Optional[NextActions]:
+        """Cached plan or None, for callers that produce the plan themselves
+        (e.g. by streaming it) and ``put`` it when complete"""
+        with self._lock:
+            plan = self._lookup(key)
+            if plan is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return plan
+
+    def put(self, key: str, plan: NextActions):
+        with self._lock:
+            self._store(key, plan)
+
+    def get_or_compute(self, key: str, compute: Callable[[], NextActions]) -> NextActions:
+        with self._lock:
+            plan = self._lookup(key)
+            if plan is not None:
+                self.hits += 1
+                return plan
+            pending = self._inflight.get(key)
+            if pending is None:
+                pending = self._inflight[key] = Future()
+                owner = True
+                self.misses += 1
+            else:
+                owner = False
+                self.coalesced += 1
+
+        if not owner:
+            return pending.result()
+        try:
+            plan = compute()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.set_exception(e)
+            raise
+        # Cached before the call stops being in flight, so a request in
+        # between finds one or the other and never calls the model again
+        with self._lock:
+            self._store(key, plan)
+            self._inflight.pop(key, None)
+        pending.set_result(plan)
+        return plan
+
+    async def aget_or_compute(self, key: str, compute: Callable[[], Awaitable[NextActions]]) -> NextActions:
+        with self._lock:
+            plan = self._lookup(key)
+            if plan is not None:
+                self.hits += 1
+                return plan
+            pending = self._async_inflight.get(key)
+            if pending is None or pending.get_loop() is not asyncio.get_running_loop():
+                pending = self._async_inflight[key] = asyncio.get_running_loop(
+                ).create_future()
+                owner = True
+                self.misses += 1
+            else:
+                owner = False
+                self.coalesced += 1
+
+        if not owner:
+            # shield: a cancelled waiter must not cancel the shared call
+            return await asyncio.shield(pending)
+        try:
+            plan = await compute()
+        except BaseException as e:
+            with self._lock:
+                if self._async_inflight.get(key) is pending:
+                    del self._async_inflight[key]
+            if isinstance(e, asyncio.CancelledError):
+                pending.cancel()
+            else:
+                pending.set_exception(e)
+                # Retrieved here so a failure nobody waited for is not logged as lost
+                pending.exception()
+            raise
+        with self._lock:
+            self._store(key, plan)
+            if self._async_inflight.get(key) is pending:
+                del self._async_inflight[key]
+        pending.set_result(plan)
+        return plan
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / lookups if lookups else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced,
+                "hit_rate": round(self.hit_rate, 3)}
+
+    def save(self):
+        """Write the cache atomically (no-op if nothing changed)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            self._dirty = False
+        logger.debug(
+            f"Plan cache saved ({len(self._entries)} entries, {self.summary()})")
+
+
+_shared_cache: Optional[PlanCache] = None
+
+
+def get_plan_cache() -> PlanCache:
+    """Process-wide cache shared by every agent"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = PlanCache()
+    return _shared_cache
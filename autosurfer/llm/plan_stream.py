@@ -0,0 +1,211 @@
+from autosurfer.logger import logger
+from autosurfer.llm.response_schema.browser_actions import ActionItem, NextActions
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional
+import json
+import time
+
+
+class ActionStreamParser:
+    """Incremental parser of a streamed NextActions JSON document.
+
+    Scans each chunk once, tracking string state and the brace/bracket depth
+    of the ``actions`` array: an item is validated and returned as soon as
+    its closing brace brings the array back to item depth, without waiting
+    for the next item or the end of the document. When an item does not
+    validate, the items before it are still returned and the error is kept
+    in ``error``.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.emitted = 0
+        self.error: Optional[Exception] = None
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._key: Optional[str] = None
+        self._in_actions = False
+        self._item_start: Optional[int] = None
+
+    def feed(self, text: str) -> List[ActionItem]:
+        self.buffer += text
+        buffer = self.buffer
+        items: List[ActionItem] = []
+        for pos in range(self._pos, len(buffer)):
+            char = buffer[pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        # Keys (and values) of the top-level object
+                        self._key = buffer[self._string_start + 1:pos]
+                continue
+            if char == '"':
+                self._in_string = True
+                self._string_start = pos
+            elif char in "{[":
+                self._depth += 1
+                if char == "[" and self._depth == 2 and self._key == "actions":
+                    self._in_actions = True
+                elif char == "{" and self._in_actions and self._depth == 3:
+                    self._item_start = pos
+            elif char in "}]":
+                self._depth -= 1
+                if char == "}" and self._in_actions and self._depth == 2:
+                    try:
+                        items.append(ActionItem.model_validate(
+                            json.loads(buffer[self._item_start:pos + 1])))
+                    except Exception as e:
+                        self.error = e
+                        self._pos = pos + 1
+                        break
+                    self._item_start = None
+                elif char == "]" and self._depth == 1:
+                    self._in_actions = False
+        else:
+            self._pos = len(buffer)
+        self.emitted += len(items)
+        return items
+
+    def close(self) -> NextActions:
+        """The whole plan; raises if the document is not a valid NextActions"""
+        return NextActions.model_validate(json.loads(self.buffer))
+
+    def remaining(self, plan: NextActions) -> List[ActionItem]:
+        items = plan.actions[self.emitted:]
+        self.emitted = len(plan.actions)
+        return items
+
+
+class BasePlanStream:
+    """Actions of one planner response, handed out as soon as each one
+    validates against the action schema.
+
+    ``plan`` is the complete NextActions once the response was read to the
+    end (``on_complete`` is called with it, e.g. to cache it, and
+    ``on_usage`` with the token usage reported on the last chunk); it stays None
+    when the stream was closed early or a later action did not validate, in
+    which case the actions handed out so far are the plan.
+    """
+
+    def __init__(self, on_complete: Optional[Callable[[NextActions], None]] = None,
+                 plan: Optional[NextActions] = None,
+                 on_usage: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.parser = ActionStreamParser()
+        self.on_complete = on_complete
+        self.on_usage = on_usage
+        self.plan = plan
+        self.received: List[ActionItem] = []
+        self.started = time.monotonic()
+        self.first_action_ms: Optional[float] = None
+
+    def _read(self, chunk: Any) -> List[ActionItem]:
+        usage = getattr(chunk, "usage_metadata", None)
+        if usage and self.on_usage:
+            self.on_usage(usage)
+        content = getattr(chunk, "content", chunk)
+        return self._hand_out(self.parser.feed(content if isinstance(content, str) else ""))
+
+    def _hand_out(self, items: Iterable[ActionItem]) -> List[ActionItem]:
+        items = list(items)
+        if items and self.first_action_ms is None:
+            self.first_action_ms = (time.monotonic() - self.started) * 1000
+        self.received.extend(items)
+        return items
+
+    def _invalid(self, error: Exception):
+        """A later action did not validate (or the response broke off): the
+        actions already handed out are the plan"""
+        if not self.received:
+            raise error
+        logger.warn(
+            f"Planner stream failed after {len(self.received)} actions; "
+            f"cancelling the rest: {str(error).splitlines()[0]}")
+
+    def _complete(self, plan: NextActions) -> List[ActionItem]:
+        self.plan = plan
+        items = self._hand_out(self.parser.remaining(plan))
+        logger.debug(
+            f"Planner streamed {len(plan.actions)} actions "
+            f"(first after {self.first_action_ms or 0:.0f}ms, "
+            f"complete after {(time.monotonic() - self.started) * 1000:.0f}ms)")
+        if self.on_complete:
+            self.on_complete(plan)
+        return items
+
+    def current_plan(self) -> NextActions:
+        """The complete plan, or the actions received before the stream ended"""
+        return self.plan or NextActions(actions=list(self.received))
+
+
+class PlanStream(BasePlanStream):
+    def __init__(self, chunks: Optional[Iterator[Any]] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.chunks = chunks
+
+    @classmethod
+    def of(cls, plan: NextActions) -> "PlanStream":
+        """Stream of a plan that is already known (e.g. cached)"""
+        return cls(plan=plan)
+
+    def __iter__(self) -> Iterator[ActionItem]:
+        if self.chunks is None:
+            yield from self._hand_out(self.plan.actions)
+            return
+        try:
+            for chunk in self.chunks:
+                yield from self._read(chunk)
+                if self.parser.error:
+                    raise self.parser.error
+            plan = self.parser.close()
+        except Exception as e:
+            self._invalid(e)
+            return
+        yield from self._complete(plan)
+
+    def close(self):
+        """Stop reading the response (closes the HTTP stream)"""
+        close = getattr(self.chunks, "close", None)
+        if close:
+            close()
+
+
+class AsyncPlanStream(BasePlanStream):
+    """Asyncio counterpart of PlanStream"""
+
+    def __init__(self, chunks: Optional[AsyncIterator[Any]] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.chunks = chunks
+
+    @classmethod
+    def of(cls, plan: NextActions) -> "AsyncPlanStream":
+        return cls(plan=plan)
+
+    async def __aiter__(self) -> AsyncIterator[ActionItem]:
+        if self.chunks is None:
+            for item in self._hand_out(self.plan.actions):
+                yield item
+            return
+        try:
+            async for chunk in self.chunks:
+                for item in self._read(chunk):
+                    yield item
+                if self.parser.error:
+                    raise self.parser.error
+            plan = self.parser.close()
+        except Exception as e:
+            self._invalid(e)
+            return
+        for item in self._complete(plan):
+            yield item
+
+    async def aclose(self):
+        aclose = getattr(self.chunks, "aclose", None)
+        if aclose:
+            await aclose()
@@ -20,6 +20,39 @@ class FillAction(BaseModel):
     value: str
 
 
+class ClickElementAction(BaseModel):
+    """Click an annotated element by its [index]; ``selector`` is only used
+    if the element is no longer on the page"""
+    type: Literal["click_element"]
+    element: int = Field(...,
+                         description="Index of the element in the UI element list")
+    selector: Optional[str] = None
+
+
+class FillElementAction(BaseModel):
+    """Fill an annotated element by its [index]; ``selector`` is only used
+    if the element is no longer on the page"""
+    type: Literal["fill_element"]
+    element: int = Field(...,
+                         description="Index of the element in the UI element list")
+    value: str
+    selector: Optional[str] = None
+
+
+class FormField(BaseModel):
+    """One field of a fill_form action; ``element`` (the [index]) wins over
+    ``selector`` while it is still on the page"""
+    element: Optional[int] = None
+    selector: Optional[str] = None
+    value: str = Field(...,
+                       description="Text to enter, option value/label for selects, true/false for checkboxes")
+
+
+class FillFormAction(BaseModel):
+    type: Literal["fill_form"]
+    fields: List[FormField]
+
+
 class PressAction(BaseModel):
     type: Literal["press"]
     key: str
@@ -30,6 +63,39 @@ class WaitAction(BaseModel):
     seconds: float
 
 
+class WaitForSelectorAction(BaseModel):
+    type: Literal["wait_for_selector"]
+    selector: str
+    state: Literal["visible", "hidden"] = "visible"
+    timeout: float = Field(10, description="Give up after this many seconds")
+
+
+class WaitForTextAction(BaseModel):
+    type: Literal["wait_for_text"]
+    text: str
+    timeout: float = Field(10, description="Give up after this many seconds")
+
+
+class WaitForUrlAction(BaseModel):
+    type: Literal["wait_for_url"]
+    url: str = Field(...,
+                     description="Substring of the expected URL, or a glob pattern with *")
+    timeout: float = Field(10, description="Give up after this many seconds")
+
+
+class WaitForNetworkQuietAction(BaseModel):
+    type: Literal["wait_for_network_quiet"]
+    timeout: float = Field(10, description="Give up after this many seconds")
+
+
+class WaitForElementCountAction(BaseModel):
+    type: Literal["wait_for_element_count"]
+    selector: str
+    count: Optional[int] = Field(
+        None, description="Expected number of matches; omit to wait for any change")
+    timeout: float = Field(10, description="Give up after this many seconds")
+
+
 class ScrollAction(BaseModel):
     type: Literal["scroll"]
     direction: Literal["up", "down"]
@@ -55,6 +121,17 @@ class SelectAction(BaseModel):
     value: str
 
 
+class MoreElementsAction(BaseModel):
+    """Show another page or a filtered view of the UI element list in the
+    next step; answered from the elements already collected"""
+    type: Literal["more_elements"]
+    page: int = Field(1, description="Page of the (filtered) element list, starting at 1")
+    kind: Optional[Literal["inputs", "buttons", "links", "text"]] = Field(
+        None, description="Only elements of this kind")
+    text: Optional[str] = Field(
+        None, description="Only elements whose text, label, id or testid contains this")
+
+
 class DoneAction(BaseModel):
     type: Literal["done"]
     summary: str
@@ -64,13 +141,22 @@ Action = Union[
     GotoAction,
     ClickAction,
     FillAction,
+    ClickElementAction,
+    FillElementAction,
+    FillFormAction,
     PressAction,
     WaitAction,
+    WaitForSelectorAction,
+    WaitForTextAction,
+    WaitForUrlAction,
+    WaitForNetworkQuietAction,
+    WaitForElementCountAction,
     ScrollAction,
     ScrollToBottomAction,
     ScrollToTopAction,
     HoverAction,
     SelectAction,
+    MoreElementsAction,
     DoneAction,
 ]
 
@@ -1,5 +1,6 @@
 from autosurfer.agent.browser_agent import AutoSurferAgent
-from autosurfer.agent.browser.adapters import BrowserSettings, create_browser_adapter
+from autosurfer.agent.browser.adapters import BrowserSettings, InterceptionPolicy, create_browser_adapter
+import argparse
 
 
 def is_browser_session_valid(browser_session):
@@ -13,6 +14,11 @@ def is_browser_session_valid(browser_session):
 
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--block-resources", action="store_true",
+                        help="block images, fonts, media and trackers the objective does not need")
+    args = parser.parse_args()
+
     print("AutoSurfer Agent Started")
     print("Type 'quit', 'exit', or press Ctrl+C to stop")
 
@@ -29,10 +35,13 @@ def main():
 
     print(f"Memory: {'ENABLED' if enable_memory else 'DISABLED'}")
     print(f"Browser: {browser_provider.upper()}")
+    print(f"Resource blocking: {'ENABLED' if args.block_resources else 'DISABLED'}")
     print("Configuration set for all objectives.")
 
     # Create browser session once
-    settings = BrowserSettings(headless=False)
+    settings = BrowserSettings(
+        headless=False,
+        interception=InterceptionPolicy() if args.block_resources else None)
     browser_session = create_browser_adapter(browser_provider, settings)
 
     while True:
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark annotateDom.js on synthetic DOMs of 10k, 100k and 500k nodes.
+
+Measures a full scan, an incremental render after a small mutation and a
+render after scrolling. Pass --baseline with an older annotateDom.js to get
+before/after numbers for its full scan, e.g.:
+
+    git show <rev>:autosurfer/agent/browser/dom/annotateDom.js > /tmp/annotateDom_old.js
+    python -m examples.benchmark_annotator --baseline /tmp/annotateDom_old.js
+"""
+
+from autosurfer.logger import logger
+from autosurfer.agent.browser.annotation_mirror import ANNOTATOR_JS
+from playwright.sync_api import sync_playwright
+from pathlib import Path
+import argparse
+
+SIZES = [10_000, 100_000, 500_000]
+RUNS = 3
+
+# Builds `total` elements: sections of buttons, links, inputs, paragraphs and
+# plain wrappers; every tenth section is display:none.
+BUILD_DOM_JS = """
+(total) => {
+    document.body.innerHTML = "";
+    const frag = document.createDocumentFragment();
+    let made = 0, s = 0;
+    while (made < total) {
+        const section = document.createElement("section");
+        if (s % 10 === 9) section.style.display = "none";
+        for (let i = 0; i < 48 && made < total; i += 6) {
+            const wrap = document.createElement("div");
+            const p = document.createElement("p");
+            p.textContent = `Paragraph ${s}-${i} with some readable text content`;
+            const b = document.createElement("button");
+            b.textContent = `Button ${s}-${i}`;
+            const a = document.createElement("a");
+            a.href = `#${s}-${i}`;
+            a.textContent = `Link ${s}-${i}`;
+            const input = document.createElement("input");
+            input.name = `field-${s}-${i}`;
+            const span = document.createElement("span");
+            span.textContent = "decoration";
+            wrap.append(p, b, a, input, span);
+            section.appendChild(wrap);
+            made += 6;
+        }
+        frag.appendChild(section);
+        made += 1;
+        s += 1;
+    }
+    document.body.appendChild(frag);
+    return document.getElementsByTagName("*").length;
+}
+"""
+
+TIME_JS = """
+(expr) => {
+    const t0 = performance.now();
+    const out = (0, eval)(expr);
+    return { ms: performance.now() - t0, count: Array.isArray(out) ? out.length : null };
+}
+"""
+
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def _time(page, expr: str, runs: int = RUNS):
+    results = [page.evaluate(TIME_JS, expr) for _ in range(runs)]
+    return _median([r["ms"] for r in results]), results[-1]["count"]
+
+
+def bench_current(page, size: int):
+    nodes = page.evaluate(BUILD_DOM_JS, size)
+    page.evaluate(ANNOTATOR_JS)
+
+    full_ms, count = _time(
+        page, "window.domAnnotator.render({highlight:false, full:true})")
+    mutate = ("document.querySelector('button').textContent = 'x' + Math.random(),"
+              " window.domAnnotator.render({highlight:false})")
+    incremental_ms, _ = _time(page, mutate)
+    page.evaluate("window.scrollBy(0, window.innerHeight * 5)")
+    page.wait_for_timeout(100)
+    scroll_ms, _ = _time(page, "window.domAnnotator.render({highlight:false})")
+    stats = page.evaluate(
+        "window.domAnnotator.stats ? window.domAnnotator.stats() : null")
+
+    logger.info(
+        f"[current]  nodes={nodes:>7} elements={count:>5} full={full_ms:8.1f}ms "
+        f"incremental={incremental_ms:7.1f}ms after-scroll={scroll_ms:7.1f}ms")
+    if stats:
+        logger.info(f"           stats={stats}")
+
+
+def bench_baseline(page, size: int, baseline_js: str):
+    nodes = page.evaluate(BUILD_DOM_JS, size)
+    page.evaluate(baseline_js)
+    full_ms, count = _time(
+        page, "window.collectInteractive({highlight:false})")
+    logger.info(
+        f"[baseline] nodes={nodes:>7} elements={count:>5} full={full_ms:8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--baseline", type=Path,
+                        help="older annotateDom.js to compare against")
+    parser.add_argument("--sizes", type=int, nargs="*", default=SIZES)
+    args = parser.parse_args()
+
+    baseline_js = args.baseline.read_text() if args.baseline else None
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        for size in args.sizes:
+            logger.info("\n" + "="*60)
+            logger.info(f"Synthetic DOM: {size} nodes")
+            logger.info("="*60)
+
+            page = browser.new_page(viewport={"width": 1280, "height": 800})
+            bench_current(page, size)
+            page.close()
+
+            if baseline_js:
+                page = browser.new_page(
+                    viewport={"width": 1280, "height": 800})
+                bench_baseline(page, size, baseline_js)
+                page.close()
+        browser.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Measure the import time of the package's entry points.
+
+Each module is imported in a fresh interpreter with ``-X importtime`` and its
+cumulative time (the module and everything it pulls in) is reported; the
+median over a few runs is printed as one number per module plus a total.
+Pass --budget-ms to fail when the total goes over it, e.g. in CI:
+
+    python -m examples.benchmark_importtime --budget-ms 1000
+"""
+
+from autosurfer.logger import logger
+import argparse
+import os
+import subprocess
+import sys
+
+MODULES = [
+    "autosurfer.main",
+    "autosurfer.agent.browser_agent",
+    "autosurfer.agent.async_browser_agent",
+    "autosurfer.agent.browser.adapters",
+]
+RUNS = 5
+
+# Modules that should only load once a browser or LLM client is created
+DEFERRED = ["playwright.sync_api", "playwright.async_api", "langchain_openai",
+            "langchain_core", "playwright_stealth", "browserbase"]
+
+
+def import_time_ms(module: str) -> float:
+    """Cumulative import time of ``module`` in a fresh interpreter"""
+    env = dict(os.environ)
+    # Importing must not need credentials
+    env.pop("OPENAI_API_KEY", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, check=True)
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    raise RuntimeError(f"No importtime line for {module}")
+
+
+def eagerly_loaded(module: str) -> list:
+    code = (f"import sys, {module}; "
+            f"print(' '.join(m for m in {DEFERRED!r} if m in sys.modules))")
+    env = dict(os.environ)
+    env.pop("OPENAI_API_KEY", None)
+    result = subprocess.run([sys.executable, "-c", code],
+                            capture_output=True, text=True, env=env, check=True)
+    return result.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modules", nargs="*", default=MODULES)
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--budget-ms", type=float,
+                        help="fail if the total exceeds this many milliseconds")
+    args = parser.parse_args()
+
+    total = 0.0
+    for module in args.modules:
+        times = sorted(import_time_ms(module) for _ in range(args.runs))
+        median = times[len(times) // 2]
+        total += median
+        loaded = eagerly_loaded(module)
+        note = f"  (eagerly loads: {', '.join(loaded)})" if loaded else ""
+        logger.info(f"{module:<40} {median:8.1f}ms{note}")
+
+    logger.info(f"{'total':<40} {total:8.1f}ms")
+    if args.budget_ms is not None and total > args.budget_ms:
+        logger.error(
+            f"Import time {total:.1f}ms exceeds the budget of {args.budget_ms:.0f}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
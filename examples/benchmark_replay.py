@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Run a fixed set of objectives against recorded network traffic.
+
+Record once against the live sites, then replay as often as needed: replayed
+runs have no network access, so timings compare changes to annotateDom.js,
+the executor or the planner on the same pages. Planner calls still go to the
+LLM API.
+
+    python -m examples.benchmark_replay --record
+    python -m examples.benchmark_replay --runs 3
+"""
+
+from autosurfer.logger import logger
+from autosurfer.agent.async_browser_agent import run_objectives
+from autosurfer.agent.browser.adapters import BrowserSettings, RecordReplay
+from pathlib import Path
+import argparse
+import asyncio
+import time
+
+
+OBJECTIVES = [
+    "Go to https://example.com and click on the 'More information...' link",
+    "Go to https://news.ycombinator.com and tell me the title of the top story",
+    "Go to https://en.wikipedia.org/wiki/Web_browser and summarize the first paragraph",
+]
+
+
+async def run_once(settings: BrowserSettings) -> float:
+    start_time = time.time()
+    results = await run_objectives(OBJECTIVES, settings=settings, max_concurrency=1)
+    elapsed = time.time() - start_time
+    for objective, result in zip(OBJECTIVES, results):
+        status = "✅" if result is None else f"❌ {result}"
+        logger.info(f"{status} {objective}")
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--record", action="store_true",
+                        help="record live traffic instead of replaying it")
+    parser.add_argument("--archive", type=Path,
+                        help="archive directory (default .temp/network_archive)")
+    parser.add_argument("--runs", type=int, default=1)
+    args = parser.parse_args()
+
+    mode = "record" if args.record else "replay"
+    settings = BrowserSettings(
+        headless=True,
+        record_replay=RecordReplay(mode=mode, path=args.archive),
+    )
+
+    timings = []
+    for run in range(1 if args.record else args.runs):
+        logger.info("\n" + "="*60)
+        logger.info(f"{mode.capitalize()} run {run + 1}")
+        logger.info("="*60)
+        timings.append(await run_once(settings))
+
+    logger.info(
+        f"{mode}: {', '.join(f'{t:.2f}s' for t in timings)} "
+        f"(best {min(timings):.2f}s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
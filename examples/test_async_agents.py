@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Test script to run several objectives concurrently with AsyncAutoSurferAgent.
+
+All objectives share one Chromium process; each gets its own browser context.
+"""
+
+from autosurfer.logger import logger
+from autosurfer.agent.async_browser_agent import run_objectives
+from autosurfer.agent.browser.adapters import BrowserSettings
+import asyncio
+import time
+
+
+OBJECTIVES = [
+    "Go to https://example.com and click on the 'More information...' link",
+    "Go to https://httpbin.org/status/200 and verify the page loads",
+    "Go to https://news.ycombinator.com and tell me the title of the top story",
+]
+
+
+async def test_concurrent_objectives():
+    logger.info("\n" + "="*60)
+    logger.info("🧪 TEST: Concurrent objectives in one process")
+    logger.info("="*60)
+
+    settings = BrowserSettings(headless=True)
+    start_time = time.time()
+    results = await run_objectives(OBJECTIVES, settings=settings, max_concurrency=3)
+    elapsed = time.time() - start_time
+
+    for objective, result in zip(OBJECTIVES, results):
+        status = "✅" if result is None else f"❌ {result}"
+        logger.info(f"{status} {objective}")
+    logger.info(f"Completed {len(OBJECTIVES)} objectives in {elapsed:.2f} seconds")
+
+
+if __name__ == "__main__":
+    asyncio.run(test_concurrent_objectives())
@@ -0,0 +1,66 @@
+from autosurfer.agent.browser import action_errors
+from autosurfer.agent.browser.action_errors import (
+    DETACHED,
+    NAVIGATION,
+    OTHER,
+    TIMEOUT,
+    ActionExecutionError,
+    ElementNotFound,
+    classify_error,
+)
+import pytest
+
+
+@pytest.mark.parametrize("message", [
+    "Execution context was destroyed, most likely because of a navigation",
+    "Frame was detached",
+    "Navigation interrupted by another one",
+    "page.goto: net::ERR_ABORTED at https://shop.example/",
+])
+def test_navigation_errors(message):
+    assert classify_error(action_errors.Error(message)) == NAVIGATION
+
+
+@pytest.mark.parametrize("message", [
+    "Element is not attached to the DOM",
+    "Element is detached from document",
+    "JSHandle is disposed",
+])
+def test_detached_errors(message):
+    assert classify_error(action_errors.Error(message)) == DETACHED
+
+
+@pytest.mark.parametrize("error", [
+    action_errors.TimeoutError("locator.click: exceeded while waiting"),
+    ElementNotFound("No strategy matched #buy"),
+    action_errors.Error("Timeout 5000ms exceeded"),
+])
+def test_timeout_errors(error):
+    assert classify_error(error) == TIMEOUT
+
+
+def test_navigation_wins_over_timeout():
+    error = action_errors.TimeoutError(
+        "Timeout 5000ms exceeded: execution context was destroyed")
+    assert classify_error(error) == NAVIGATION
+
+
+@pytest.mark.parametrize("error", [
+    action_errors.Error("Element is not an <input>, <textarea> or <select> element"),
+    ValueError("Unexpected token in JSON"),
+])
+def test_unknown_errors_fall_back_to_other(error):
+    assert classify_error(error) == OTHER
+
+
+def test_action_error_carries_the_kind_and_resume_index():
+    error = ActionExecutionError(2, "click", action_errors.Error("Frame was detached"))
+    assert error.kind == NAVIGATION
+    assert error.index == 2
+    assert error.plan is None
+    assert str(error) == "click (action 3): Frame was detached"
+
+
+def test_unknown_attribute_raises():
+    with pytest.raises(AttributeError):
+        action_errors.NotAnError
@@ -0,0 +1,50 @@
+from autosurfer.agent.brain import element_ranker
+from autosurfer.agent.brain.element_ranker import ElementRanker, query_terms, tokens
+import pytest
+
+ELEMENTS = [
+    {"index": 1, "tag": "a", "text": "Home", "priority": 9},
+    {"index": 2, "tag": "a", "text": "Careers", "priority": 8},
+    {"index": 3, "tag": "button", "text": "Accept cookies", "priority": 7},
+    {"index": 4, "tag": "input", "text": "", "label": "Search products", "priority": 2},
+    {"index": 5, "tag": "button", "text": "", "testid": "checkoutButton", "priority": 1},
+]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(element_ranker, "_numpy", lambda: None)
+    return request.param
+
+
+def test_tokens_split_identifiers_and_drop_stopwords():
+    assert tokens("Click the checkoutButton") == ("checkout", "button")
+    assert tokens("search_products") == ("search", "product")
+
+
+def test_matching_element_moves_to_the_top(backend):
+    ranked = ElementRanker(relevance_weight=0.7).rank(ELEMENTS, "search for red shoes")
+    assert ranked[0]["index"] == 4
+
+
+def test_testid_words_count(backend):
+    ranked = ElementRanker().rank(ELEMENTS, "go to checkout")
+    assert ranked[0]["index"] == 5
+
+
+def test_no_matching_term_keeps_the_annotator_order(backend):
+    ranked = ElementRanker().rank(ELEMENTS, "book a flight")
+    assert [element["index"] for element in ranked] == [1, 2, 3, 4, 5]
+
+
+def test_backends_score_the_same(monkeypatch):
+    pytest.importorskip("numpy")
+    documents = [element_ranker.element_tokens(element) for element in ELEMENTS]
+    query = query_terms("accept cookies then search products")
+    vectorized = ElementRanker().relevance(documents, query)
+    monkeypatch.setattr(element_ranker, "_numpy", lambda: None)
+    plain = ElementRanker().relevance(documents, query)
+    assert vectorized == pytest.approx(plain)
@@ -0,0 +1,52 @@
+from autosurfer.agent.browser.element_table import ElementTable
+
+
+def table(rows):
+    """Columnar wire format of ``(index, priority, tag, text, label)`` rows"""
+    tags = sorted({row[2] for row in rows})
+    label = []
+    for i, row in enumerate(rows):
+        if row[4]:
+            label += [i, row[4]]
+    return ElementTable.from_columns({
+        "tags": tags,
+        "index": [row[0] for row in rows],
+        "priority": [row[1] for row in rows],
+        "tag": [tags.index(row[2]) for row in rows],
+        "text": [row[3] for row in rows],
+        "xpath": [f"/html/body/{row[2]}[{row[0]}]" for row in rows],
+        "label": label,
+    })
+
+
+BASE = table([
+    (1, 9, "a", "Home", None),
+    (2, 5, "input", "", "Search"),
+    (3, 5, "button", "Go", None),
+])
+
+
+def test_rows_decode_sparse_columns():
+    row = BASE.find(2)
+    assert row["tag"] == "input"
+    assert row.get("label") == "Search"
+    assert BASE.find(1).label is None
+    assert BASE.find(99) is None
+
+
+def test_merged_without_changes_is_the_same_table():
+    assert BASE.merged([], []) is BASE
+
+
+def test_merged_replaces_adds_and_removes():
+    update = table([(3, 5, "button", "Search now", "Submit search"),
+                    (4, 7, "a", "Deals", None)])
+    merged = BASE.merged([update], removed=[1])
+    assert [row.index for row in merged] == [4, 2, 3]
+    assert merged.find(3)["text"] == "Search now"
+    assert merged.find(3)["label"] == "Submit search"
+    assert merged.find(2)["label"] == "Search"
+    assert merged.find(1) is None
+    # The original table is left as it was
+    assert [row.index for row in BASE] == [1, 2, 3]
+    assert BASE.find(3)["label"] is None
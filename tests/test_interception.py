@@ -0,0 +1,100 @@
+from autosurfer.agent.browser.adapters.interception import (
+    DomainTrie,
+    InterceptionPolicy,
+    InterceptionStats,
+    PolicyOverride,
+    RequestInterceptor,
+)
+from types import SimpleNamespace
+import pytest
+
+
+@pytest.mark.parametrize("host, expected", [
+    ("example.com", True),
+    ("EXAMPLE.com", True),
+    ("cdn.example.com", True),
+    ("a.b.example.com", True),
+    ("notexample.com", False),
+    ("example.org", False),
+    ("com", False),
+])
+def test_domain_matches_itself_and_subdomains(host, expected):
+    assert DomainTrie(["example.com"]).matches(host) is expected
+
+
+@pytest.mark.parametrize("host, expected", [
+    ("ads.tracker.net", True),
+    ("x.ads.tracker.net", True),
+    ("tracker.net", False),
+])
+def test_wildcard_matches_subdomains_only(host, expected):
+    assert DomainTrie(["*.tracker.net"]).matches(host) is expected
+
+
+def test_parent_domain_covers_a_listed_subdomain():
+    trie = DomainTrie(["ads.example.com", "example.com", "example.com."])
+    assert len(trie) == 2
+    assert trie.matches("www.example.com")
+
+
+def test_default_policy_blocks_heavy_types_and_trackers():
+    rules = InterceptionPolicy().resolve()
+    assert rules.block_reason("https://shop.example/a.png", "image") == "type:image"
+    assert rules.block_reason("https://www.google-analytics.com/g/collect", "xhr") == "domain"
+    assert rules.block_reason("https://shop.example/app.js", "script") is None
+
+
+def test_allowed_domain_wins_over_blocks():
+    rules = InterceptionPolicy(allow_domains=("cdn.shop.example",),
+                               block_domains=("shop.example",)).resolve()
+    assert rules.block_reason("https://img.cdn.shop.example/a.png", "image") is None
+    assert rules.block_reason("https://api.shop.example/cart", "fetch") == "domain"
+
+
+def test_objective_about_images_lets_images_through():
+    policy = InterceptionPolicy()
+    rules = policy.resolve("Describe the product photos")
+    assert rules.override is not None
+    assert rules.block_reason("https://shop.example/a.png", "image") is None
+    assert rules.block_reason("https://shop.example/a.woff2", "font") == "type:font"
+    assert policy.resolve("Add shoes to the basket").override is None
+
+
+def test_first_matching_override_applies():
+    policy = InterceptionPolicy(overrides=(
+        PolicyOverride(pattern=r"checkout", block_domains=("payments.example",)),
+        PolicyOverride(pattern=r"check", allow_domains=("payments.example",)),
+    ))
+    rules = policy.resolve("Go to CHECKOUT")
+    assert rules.override == "checkout"
+    assert rules.block_reason("https://payments.example/pay", "script") == "domain"
+
+
+def test_disabled_policy_blocks_nothing():
+    rules = InterceptionPolicy.disabled().resolve("anything")
+    assert not rules.active
+    assert rules.block_reason("https://doubleclick.net/x", "image") is None
+
+
+def request(url, resource_type, top_level=False):
+    frame = SimpleNamespace(parent_frame=None if top_level else object())
+    return SimpleNamespace(url=url, resource_type=resource_type, frame=frame)
+
+
+def test_top_level_documents_are_never_blocked():
+    interceptor = RequestInterceptor(InterceptionPolicy(block_domains=("shop.example",)))
+    assert interceptor._decide(request("https://shop.example/", "document", top_level=True)) is None
+    assert interceptor._decide(request("https://shop.example/frame", "document")) == "domain"
+
+
+def test_stats_count_estimated_savings_per_reason():
+    interceptor = RequestInterceptor(InterceptionPolicy())
+    interceptor._decide(request("https://shop.example/a.png", "image"))
+    interceptor._decide(request("https://shop.example/b.png", "image"))
+    interceptor._decide(request("https://shop.example/app.js", "script"))
+    summary = interceptor.stats.summary()
+    assert summary["blocked_requests"] == 2
+    assert summary["allowed_requests"] == 1
+    assert summary["by_reason"] == {"type:image": 2}
+    assert summary["estimated_bytes_saved"] > 0
+    assert InterceptionStats().summary()["blocked_share"] == 0.0
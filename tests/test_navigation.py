@@ -0,0 +1,112 @@
+from autosurfer.agent.browser.navigation import (
+    BACK,
+    COMMITTED,
+    GOTO,
+    HISTORY_SIZE,
+    NOOP,
+    Navigator,
+    normalize_url,
+    same_page,
+    with_scheme,
+)
+from autosurfer.agent.browser import action_errors
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+import pytest
+
+
+@pytest.mark.parametrize("a, b, same", [
+    ("https://shop.example/cart/", "https://shop.example/cart", True),
+    ("https://shop.example", "https://shop.example/", True),
+    ("https://shop.example:443/", "https://shop.example/", True),
+    ("http://shop.example:80/a", "http://shop.example/a", True),
+    ("https://SHOP.example/a", "https://shop.example/a", True),
+    ("shop.example/a", "https://shop.example/a", True),
+    ("https://shop.example:8443/", "https://shop.example/", False),
+    ("http://shop.example:443/", "http://shop.example/", False),
+    ("http://shop.example/", "https://shop.example/", False),
+    ("https://www.shop.example/", "https://shop.example/", False),
+    ("https://shop.example/#reviews", "https://shop.example/", False),
+    ("https://shop.example/#reviews", "https://shop.example/#reviews", True),
+    ("https://shop.example/?q=1", "https://shop.example/?q=2", False),
+    ("https://shop.example/A", "https://shop.example/a", False),
+])
+def test_same_page(a, b, same):
+    assert same_page(a, b) is same
+
+
+def test_non_http_urls_are_left_alone():
+    assert with_scheme("about:blank") == "about:blank"
+    assert normalize_url("data:text/html,hi") == "data:text/html,hi"
+
+
+def make_navigator(*visited):
+    page = MagicMock()
+    page.url = visited[0] if visited else "about:blank"
+    navigator = Navigator(page)
+    for url in visited[1:]:
+        page.url = url
+        navigator._on_navigated(SimpleNamespace(parent_frame=None, url=url))
+    return navigator
+
+
+@pytest.mark.parametrize("visited, target, strategy", [
+    (["https://shop.example/"], "https://shop.example", NOOP),
+    (["https://shop.example/cart/"], "shop.example/cart", NOOP),
+    (["https://shop.example/", "https://shop.example/cart"], "https://shop.example/", BACK),
+    (["https://shop.example/", "https://shop.example/cart"], "https://shop.example:443", BACK),
+    (["https://a.example/", "https://b.example/", "https://c.example/"], "https://a.example/", GOTO),
+    (["https://shop.example/"], "https://shop.example/#reviews", GOTO),
+    (["http://shop.example/"], "https://shop.example/", GOTO),
+    ([], "https://shop.example/", GOTO),
+])
+def test_plan(visited, target, strategy):
+    assert make_navigator(*visited)._plan(with_scheme(target)) == strategy
+
+
+def test_subframe_navigations_are_not_history():
+    navigator = make_navigator("https://shop.example/")
+    navigator._on_navigated(SimpleNamespace(parent_frame=object(), url="https://ads.example/"))
+    navigator._on_navigated(SimpleNamespace(parent_frame=None, url="https://shop.example/"))
+    assert navigator.history == ["https://shop.example/"]
+
+
+def test_history_is_bounded():
+    navigator = make_navigator(*[f"https://shop.example/{i}" for i in range(HISTORY_SIZE + 5)])
+    assert len(navigator.history) == HISTORY_SIZE
+    assert navigator.history[-1] == f"https://shop.example/{HISTORY_SIZE + 4}"
+
+
+def test_goto_to_the_previous_page_goes_back():
+    navigator = make_navigator("https://shop.example/", "https://shop.example/cart")
+
+    def go_back(**_):
+        navigator.page.url = "https://shop.example/"
+    navigator.page.go_back.side_effect = go_back
+
+    result = navigator.goto("https://shop.example/")
+    assert result.strategy == BACK
+    navigator.page.goto.assert_not_called()
+    assert navigator.history == ["https://shop.example/"]
+
+
+def test_back_landing_elsewhere_falls_back_to_goto():
+    navigator = make_navigator("https://shop.example/", "https://shop.example/cart")
+    navigator.page.go_back.side_effect = lambda **_: None
+    assert navigator.goto("https://shop.example/").strategy == GOTO
+    navigator.page.goto.assert_called_once()
+
+
+def test_timed_out_goto_keeps_a_committed_document():
+    navigator = make_navigator("https://shop.example/")
+
+    def slow_goto(url, **_):
+        navigator.page.url = url
+        raise action_errors.TimeoutError("Timeout 30000ms exceeded")
+    navigator.page.goto.side_effect = slow_goto
+    assert navigator.goto("https://other.example/").strategy == COMMITTED
+
+    navigator.page.goto.side_effect = action_errors.TimeoutError("Timeout 30000ms exceeded")
+    with pytest.raises(action_errors.TimeoutError):
+        navigator.goto("https://third.example/")
+    assert navigator.summary() == {COMMITTED: 1}
@@ -0,0 +1,133 @@
+from autosurfer.llm.plan_cache import PlanCache
+from autosurfer.llm.response_schema.browser_actions import NextActions
+import asyncio
+import threading
+import time
+
+
+def make_plan(summary: str) -> NextActions:
+    return NextActions.model_validate(
+        {"actions": [{"thought": "finish", "action": {"type": "done", "summary": summary}}]})
+
+
+def test_threads_share_one_call(tmp_path):
+    cache = PlanCache(path=tmp_path / "plans.json")
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return make_plan("shared")
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("key", compute)))
+               for _ in range(4)]
+    threads[0].start()
+    started.wait(1)
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert [plan.actions[0].action.summary for plan in results] == ["shared"] * 4
+    assert (cache.misses, cache.coalesced) == (1, 3)
+
+
+def test_request_while_the_plan_is_stored_is_a_hit(tmp_path):
+    cache = PlanCache(path=tmp_path / "plans.json")
+    storing = threading.Event()
+    store = cache._store
+
+    def slow_store(key, plan):
+        storing.set()
+        time.sleep(0.1)
+        store(key, plan)
+
+    cache._store = slow_store
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return make_plan("once")
+
+    owner = threading.Thread(target=lambda: cache.get_or_compute("key", compute))
+    owner.start()
+    storing.wait(1)
+    late = cache.get_or_compute("key", compute)
+    owner.join()
+
+    assert len(calls) == 1
+    assert late.actions[0].action.summary == "once"
+
+
+def test_tasks_share_one_call(tmp_path):
+    cache = PlanCache(path=tmp_path / "plans.json")
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return make_plan("shared")
+
+    async def run():
+        return await asyncio.gather(*(cache.aget_or_compute("key", compute) for _ in range(3)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert len(results) == 3
+    assert cache.coalesced == 2
+
+
+def test_failed_call_is_not_cached(tmp_path):
+    cache = PlanCache(path=tmp_path / "plans.json")
+
+    def fail():
+        raise RuntimeError("rate limited")
+
+    try:
+        cache.get_or_compute("key", fail)
+    except RuntimeError:
+        pass
+    assert cache.get("key") is None
+    assert cache.get_or_compute("key", lambda: make_plan("retried")).actions[0].action.summary == "retried"
+
+
+def test_expired_entry_is_a_miss(tmp_path):
+    cache = PlanCache(path=tmp_path / "plans.json", ttl_s=60)
+    cache.put("key", make_plan("old"))
+    assert cache.get("key") is not None
+    cache._entries["key"]["created"] -= 61
+    assert cache.get("key") is None
+    assert "key" not in cache._entries
+
+
+def test_least_recently_used_is_evicted(tmp_path):
+    cache = PlanCache(path=tmp_path / "plans.json", max_entries=2)
+    cache.put("a", make_plan("a"))
+    cache.put("b", make_plan("b"))
+    cache.get("a")
+    cache.put("c", make_plan("c"))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_saved_cache_loads_warm(tmp_path):
+    path = tmp_path / "plans.json"
+    cache = PlanCache(path=path)
+    cache.put("key", make_plan("saved"))
+    cache.save()
+
+    reloaded = PlanCache(path=path)
+    assert reloaded.get("key").actions[0].action.summary == "saved"
+
+
+def test_forget_drops_the_failed_plan(tmp_path):
+    cache = PlanCache(path=tmp_path / "plans.json")
+    cache.put("key", make_plan("bad"))
+    plan = cache.get("key")
+    cache.forget(plan)
+    assert cache.get("key") is None
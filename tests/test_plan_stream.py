@@ -0,0 +1,85 @@
+from autosurfer.agent.browser.action_errors import ActionExecutionError
+from autosurfer.agent.browser.action_executor import BrowserActionExecutor
+from autosurfer.llm.plan_stream import ActionStreamParser, AsyncPlanStream, PlanStream
+from unittest.mock import MagicMock
+import asyncio
+import json
+import pytest
+
+PLAN = {"actions": [
+    {"thought": "open {the} \"site\" [now]",
+     "action": {"type": "goto", "url": "https://example.com/?q={x}"}},
+    {"thought": "search", "action": {"type": "fill", "selector": "input", "value": "shoes"}},
+    {"thought": "finish", "action": {"type": "done", "summary": "done"}},
+]}
+
+
+def test_item_is_emitted_when_it_closes():
+    document = json.dumps(PLAN)
+    first_end = document.index("}}") + 2
+    parser = ActionStreamParser()
+    emitted_at = []
+    for position, char in enumerate(document, 1):
+        for item in parser.feed(char):
+            emitted_at.append((position, item.action.type))
+
+    assert emitted_at[0] == (first_end, "goto")
+    assert [action for _, action in emitted_at] == ["goto", "fill", "done"]
+    assert parser.emitted == 3
+    assert parser.remaining(parser.close()) == []
+
+
+def test_braces_in_strings_do_not_end_an_item():
+    parser = ActionStreamParser()
+    items = parser.feed(json.dumps(PLAN)[:40])
+    assert items == []
+    assert parser.error is None
+
+
+def test_invalid_item_keeps_the_ones_before_it():
+    document = json.dumps({"actions": [PLAN["actions"][0],
+                                       {"thought": "?", "action": {"type": "teleport"}}]})
+    parser = ActionStreamParser()
+    items = parser.feed(document)
+    assert [item.action.type for item in items] == ["goto"]
+    assert parser.error is not None
+
+
+def test_stream_hands_out_items_and_completes():
+    document = json.dumps(PLAN)
+    completed = []
+    stream = PlanStream(chunks=iter([document[i:i + 7] for i in range(0, len(document), 7)]),
+                        on_complete=completed.append)
+    assert [item.action.type for item in stream] == ["goto", "fill", "done"]
+    assert stream.plan is not None
+    assert completed == [stream.plan]
+
+
+def test_stream_failing_later_keeps_received_actions():
+    document = json.dumps(PLAN)[:-30]
+    stream = PlanStream(chunks=iter([document]))
+    assert [item.action.type for item in stream] == ["goto", "fill"]
+    assert stream.plan is None
+    assert len(stream.current_plan().actions) == 2
+
+
+def test_async_stream_matches_sync():
+    document = json.dumps(PLAN)
+
+    async def chunks():
+        for i in range(0, len(document), 11):
+            yield document[i:i + 11]
+
+    async def run():
+        return [item.action.type async for item in AsyncPlanStream(chunks=chunks())]
+
+    assert asyncio.run(run()) == ["goto", "fill", "done"]
+
+
+def test_unparsable_response_is_an_action_error():
+    executor = BrowserActionExecutor.__new__(BrowserActionExecutor)
+    executor.page = MagicMock(url="https://example.com/")
+    with pytest.raises(ActionExecutionError) as raised:
+        executor.execute_stream(PlanStream(chunks=iter(['{"actions": [{"thou'])))
+    assert raised.value.index == 0
+    assert raised.value.plan is None
@@ -0,0 +1,157 @@
+from autosurfer.agent.brain.memory import AgentMemory, MemoryEntry
+from autosurfer.agent.brain.prompt_builder import PromptBuilder, count_tokens
+from autosurfer.llm.prompts import SYSTEM_PROMPT
+from autosurfer.llm.response_schema.browser_actions import MoreElementsAction
+
+PAGE = {"url": "https://shop.example/", "title": "Shop"}
+
+
+def buttons(count: int, start: int = 0):
+    return [{"index": i, "tag": "button", "text": f"Product {i} add to basket", "priority": 1}
+            for i in range(start, start + count)]
+
+
+def texts(prompt):
+    return [part["text"] for part in prompt.messages[1].content]
+
+
+def busy_memory() -> AgentMemory:
+    memory = AgentMemory("buy shoes")
+    for i in range(5):
+        memory.add_entry(MemoryEntry(
+            timestamp=0, action_type="click", description=f"clicked product {i} " * 10,
+            success=i % 2 == 0, page_url=PAGE["url"], page_title="Shop",
+            error_message="element not found " * 10))
+    return memory
+
+
+def test_empty_sections_are_left_out():
+    prompt = PromptBuilder(ranker=None, delta=False).build("buy shoes", buttons(3), None, PAGE)
+    parts = texts(prompt)
+    assert parts[0] == "Objective: buy shoes"
+    assert parts[1].startswith("Available UI Elements")
+    assert parts[2].startswith("Page Context:")
+    assert len(parts) == 3
+
+
+def test_identical_elements_share_a_row():
+    elements = [{"index": i, "tag": "button", "text": "Add", "priority": 1} for i in range(3)]
+    prompt = PromptBuilder(ranker=None, delta=False).build("buy shoes", elements, None, PAGE)
+    assert "0,1,2|button|Add|" in texts(prompt)[1]
+    assert prompt.metrics.elements_shown == 3
+
+
+def test_prompt_stays_within_budget():
+    memory = busy_memory()
+    for extra in (600, 400, 250, 120):
+        budget = count_tokens(SYSTEM_PROMPT) + extra
+        prompt = PromptBuilder(ranker=None, delta=False, token_budget=budget).build(
+            "buy shoes", buttons(30), memory, PAGE)
+        assert prompt.metrics.prompt_tokens <= budget
+
+
+def test_history_gives_way_before_memory_and_table():
+    memory = busy_memory()
+    builder = PromptBuilder(ranker=None, delta=False, token_budget=100_000)
+    full = builder.build("buy shoes", buttons(20), memory, PAGE)
+    history = next(text for text in texts(full) if text.startswith("Recent Actions"))
+
+    budget = full.metrics.prompt_tokens - count_tokens(history)
+    prompt = PromptBuilder(ranker=None, delta=False, token_budget=budget).build(
+        "buy shoes", buttons(20), memory, PAGE)
+    parts = texts(prompt)
+    assert prompt.metrics.elements_shown == 20
+    assert any(text.startswith("Memory Context") for text in parts)
+    assert not any(text.startswith("Recent Actions") for text in parts)
+
+
+def listed(prompt):
+    """Element ids in the rows of the prompt's table"""
+    table = texts(prompt)[1].splitlines()[1:]
+    return [int(uid) for row in table for uid in row.split("|")[0].split(",")]
+
+
+def test_elements_are_listed_a_page_at_a_time():
+    builder = PromptBuilder(ranker=None, delta=False, max_elements=10)
+    first = builder.build("buy shoes", buttons(25), None, PAGE)
+    assert listed(first) == list(range(10))
+    assert "(page 1 of 3" in texts(first)[1]
+    assert "15 more, see more_elements" in texts(first)[1]
+
+    third = builder.build("buy shoes", buttons(25), None, PAGE,
+                          view=MoreElementsAction(type="more_elements", page=3))
+    assert listed(third) == list(range(20, 25))
+    assert "more_elements" not in texts(third)[1].splitlines()[0]
+
+
+def test_view_filters_by_kind_and_text():
+    elements = buttons(5) + [
+        {"index": 10, "tag": "input", "text": "", "label": "Email", "priority": 1},
+        {"index": 11, "tag": "input", "text": "", "label": "Password", "priority": 1},
+        {"index": 12, "tag": "a", "text": "Forgot password?", "priority": 1},
+    ]
+    builder = PromptBuilder(ranker=None, delta=False)
+    inputs = builder.build("log in", elements, None, PAGE,
+                           view=MoreElementsAction(type="more_elements", kind="inputs"))
+    assert listed(inputs) == [10, 11]
+    assert "inputs: 2 of 8 elements" in texts(inputs)[1]
+
+    password = builder.build("log in", elements, None, PAGE,
+                             view=MoreElementsAction(type="more_elements", text="password"))
+    assert listed(password) == [11, 12]
+
+
+def test_same_page_sends_changes_after_the_unchanged_table():
+    builder = PromptBuilder(ranker=None, delta=True)
+    first = builder.build("buy shoes", buttons(10), None, PAGE)
+    changed = buttons(10)
+    changed[3] = {**changed[3], "text": "Product 3 in basket"}
+    second = builder.build("buy shoes", changed[1:] + buttons(1, start=50), None, PAGE)
+
+    assert second.metrics.delta
+    assert texts(second)[:2] == texts(first)[:2]
+    changes = texts(second)[-1]
+    assert changes.startswith("Element changes since the list above")
+    assert "added:\n50|button|Product 50 add to basket|" in changes
+    assert "changed:\n3|button|Product 3 in basket|" in changes
+    assert "removed: 0" in changes
+    assert second.metrics.elements_shown == 10
+
+
+def test_no_changes_are_reported_as_such():
+    builder = PromptBuilder(ranker=None, delta=True)
+    builder.build("buy shoes", buttons(5), None, PAGE)
+    prompt = builder.build("buy shoes", buttons(5), None, PAGE)
+    assert prompt.metrics.delta
+    assert texts(prompt)[-1] == "No element changes since the list above"
+
+
+def test_full_table_after_navigation_or_many_changes():
+    builder = PromptBuilder(ranker=None, delta=True, delta_max_ratio=0.5)
+    builder.build("buy shoes", buttons(10), None, PAGE)
+
+    moved = builder.build("buy shoes", buttons(10), None,
+                          {"url": "https://shop.example/cart", "title": "Cart"})
+    assert not moved.metrics.delta
+
+    replaced = builder.build("buy shoes", buttons(10, start=100), None,
+                             {"url": "https://shop.example/cart", "title": "Cart"})
+    assert not replaced.metrics.delta
+    assert listed(replaced) == list(range(100, 110))
+    assert builder.summary()["delta_prompts"] == 0
+
+
+def test_plain_step_after_a_view_lists_the_page_in_full():
+    elements = buttons(30) + [
+        {"index": 40, "tag": "input", "text": "", "label": "Email", "priority": 1}]
+    builder = PromptBuilder(ranker=None, delta=True)
+    builder.build("sign up", elements, None, PAGE)
+    view = builder.build("sign up", elements, None, PAGE,
+                         view=MoreElementsAction(type="more_elements", kind="inputs"))
+    assert listed(view) == [40]
+
+    plain = builder.build("sign up", elements, None, PAGE)
+    assert not plain.metrics.delta
+    assert "inputs" not in texts(plain)[1].splitlines()[0]
+    assert listed(plain) == list(range(20))
+    assert builder.build("sign up", elements, None, PAGE).metrics.delta
@@ -0,0 +1,127 @@
+from autosurfer.agent.browser.adapters.record_replay import (
+    RECORD,
+    MatchPolicy,
+    NetworkArchive,
+    RecordReplay,
+    RecordReplayRouter,
+)
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+import pytest
+
+
+@pytest.mark.parametrize("a, b", [
+    ("https://shop.example/?q=shoes&utm_source=mail", "https://shop.example/?q=shoes"),
+    ("https://shop.example/?b=2&a=1", "https://shop.example/?a=1&b=2"),
+    ("https://SHOP.example?q=1&_=123", "https://shop.example/?q=1"),
+    ("https://shop.example/#top", "https://shop.example/"),
+])
+def test_noise_does_not_change_the_key(a, b):
+    assert MatchPolicy().key("GET", a) == MatchPolicy().key("GET", b)
+
+
+@pytest.mark.parametrize("a, b", [
+    ("https://shop.example/?q=shoes", "https://shop.example/?q=boots"),
+    ("http://shop.example/", "https://shop.example/"),
+    ("https://shop.example/a", "https://shop.example/b"),
+])
+def test_meaningful_differences_change_the_key(a, b):
+    assert MatchPolicy().key("GET", a) != MatchPolicy().key("GET", b)
+
+
+def test_post_body_is_part_of_the_key():
+    policy = MatchPolicy()
+    url = "https://shop.example/api"
+    assert policy.key("POST", url, b'{"q":1}') != policy.key("POST", url, b'{"q":2}')
+    assert MatchPolicy(match_post_body=False).key("POST", url, b'{"q":1}') == \
+        MatchPolicy(match_post_body=False).key("POST", url, b'{"q":2}')
+
+
+def recorded(tmp_path, *bodies, url="https://shop.example/poll"):
+    archive = NetworkArchive(tmp_path, MatchPolicy())
+    for body in bodies:
+        archive.record("GET", url, None, 200, {"Content-Type": "text/plain",
+                                               "Content-Length": "1"}, body)
+    archive.save()
+    return NetworkArchive(tmp_path, MatchPolicy())
+
+
+def test_repeated_requests_replay_in_order_then_repeat_the_last(tmp_path):
+    archive = recorded(tmp_path, b"1", b"2")
+    cursor = {}
+    bodies = [archive.lookup("GET", "https://shop.example/poll", None, cursor)[1]
+              for _ in range(3)]
+    assert bodies == [b"1", b"2", b"2"]
+    assert archive.stats.hits == 3
+
+
+def test_recorded_headers_no_longer_describe_the_encoding(tmp_path):
+    entry, _ = recorded(tmp_path, b"1").lookup("GET", "https://shop.example/poll", None, {})
+    assert entry["headers"] == {"Content-Type": "text/plain"}
+
+
+def test_each_cursor_starts_from_the_top(tmp_path):
+    archive = recorded(tmp_path, b"1", b"2")
+    first, second = {}, {}
+    assert archive.lookup("GET", "https://shop.example/poll", None, first)[1] == b"1"
+    assert archive.lookup("GET", "https://shop.example/poll", None, first)[1] == b"2"
+    assert archive.lookup("GET", "https://shop.example/poll", None, second)[1] == b"1"
+
+
+def test_loose_fallback_serves_the_same_path(tmp_path):
+    archive = recorded(tmp_path, b"1", url="https://shop.example/search?q=shoes")
+    assert archive.lookup("GET", "https://shop.example/search?q=boots", None, {})[1] == b"1"
+    assert archive.stats.loose_hits == 1
+
+
+def test_miss_returns_none(tmp_path):
+    archive = recorded(tmp_path, b"1")
+    assert archive.lookup("GET", "https://other.example/", None, {}) is None
+    assert archive.lookup("POST", "https://shop.example/poll", None, {}) is None
+    assert archive.stats.summary()["misses"] == 2
+
+
+def test_rerecording_replaces_the_old_responses(tmp_path):
+    recorded(tmp_path, b"old")
+    archive = recorded(tmp_path, b"new")
+    assert archive.lookup("GET", "https://shop.example/poll", None, {})[1] == b"new"
+
+
+def route_for(url):
+    route = MagicMock()
+    route.request = SimpleNamespace(method="GET", url=url, post_data_buffer=None)
+    return route
+
+
+def test_replay_router_fulfills_hits_and_aborts_misses(tmp_path):
+    recorded(tmp_path, b"1", b"2")
+    router = RecordReplayRouter(RecordReplay(path=tmp_path / "other"))
+    router.archive = NetworkArchive(tmp_path, MatchPolicy())
+    router.install(MagicMock())
+
+    hit = route_for("https://shop.example/poll")
+    router._handle(hit)
+    assert hit.fulfill.call_args.kwargs["body"] == b"1"
+
+    miss = route_for("https://shop.example/missing-path")
+    router._handle(miss)
+    miss.abort.assert_called_once_with("internetdisconnected")
+
+    # A new session starts each sequence from the top again
+    router.install(MagicMock())
+    again = route_for("https://shop.example/poll")
+    router._handle(again)
+    assert again.fulfill.call_args.kwargs["body"] == b"1"
+
+
+def test_miss_falls_back_to_the_network_when_asked(tmp_path):
+    router = RecordReplayRouter(RecordReplay(path=tmp_path, on_miss="fallback"))
+    miss = route_for("https://shop.example/")
+    router._handle(miss)
+    miss.fallback.assert_called_once_with()
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        RecordReplayRouter(RecordReplay(mode="rewind", path=tmp_path))
+    assert RecordReplayRouter(RecordReplay(mode=RECORD, path=tmp_path)).recording
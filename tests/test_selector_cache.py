@@ -0,0 +1,89 @@
+from autosurfer.agent.browser.selector_resolver import (
+    SelectorCache,
+    click_selector_candidates,
+    normalize_selector,
+)
+
+HOST = "shop.example"
+CANDIDATES = click_selector_candidates("Add to basket")
+
+
+def names(candidates):
+    return [name for name, _ in candidates]
+
+
+def test_unknown_selector_keeps_the_default_order(tmp_path):
+    cache = SelectorCache(path=tmp_path / "selectors.json")
+    ordered, learned = cache.order(HOST, "Add to basket", CANDIDATES)
+    assert ordered == CANDIDATES
+    assert not learned
+    assert (cache.lookups, cache.hits) == (1, 0)
+
+
+def test_winning_strategy_goes_first(tmp_path):
+    cache = SelectorCache(path=tmp_path / "selectors.json")
+    cache.record(HOST, "Add to basket", "has-text", 40)
+    ordered, learned = cache.order(HOST, "Add to basket", CANDIDATES)
+    assert names(ordered) == ["has-text", "selector", "text"]
+    assert learned
+    assert cache.hit_rate == 1.0
+
+
+def test_faster_winner_goes_first(tmp_path):
+    cache = SelectorCache(path=tmp_path / "selectors.json")
+    cache.record(HOST, "Add to basket", "text", 90)
+    cache.record(HOST, "Add to basket", "has-text", 30)
+    ordered, _ = cache.order(HOST, "Add to basket", CANDIDATES)
+    assert names(ordered)[:2] == ["has-text", "text"]
+
+
+def test_average_time_is_kept_per_strategy(tmp_path):
+    cache = SelectorCache(path=tmp_path / "selectors.json")
+    cache.record(HOST, "#buy", "selector", 10)
+    cache.record(HOST, "#buy", "selector", 30)
+    assert cache._entries[f"{HOST} {normalize_selector('#buy')}"]["selector"] == [2, 20.0]
+
+
+def test_no_winner_records_nothing(tmp_path):
+    cache = SelectorCache(path=tmp_path / "selectors.json")
+    cache.record(HOST, "#buy", None, 10)
+    cache.save()
+    assert not (tmp_path / "selectors.json").exists()
+
+
+def test_hosts_are_learned_separately(tmp_path):
+    cache = SelectorCache(path=tmp_path / "selectors.json")
+    cache.record("other.example", "Add to basket", "has-text", 40)
+    ordered, learned = cache.order(HOST, "Add to basket", CANDIDATES)
+    assert ordered == CANDIDATES
+    assert not learned
+
+
+def test_least_recently_used_is_evicted(tmp_path):
+    cache = SelectorCache(path=tmp_path / "selectors.json", max_entries=2)
+    cache.record(HOST, "#a", "selector", 10)
+    cache.record(HOST, "#b", "selector", 10)
+    cache.order(HOST, "#a", click_selector_candidates("#a"))
+    cache.record(HOST, "#c", "selector", 10)
+    assert cache.order(HOST, "#b", click_selector_candidates("#b"))[1] is False
+    assert cache.order(HOST, "#a", click_selector_candidates("#a"))[1] is True
+
+
+def test_saved_cache_loads_warm(tmp_path):
+    path = tmp_path / "selectors.json"
+    cache = SelectorCache(path=path)
+    cache.record(HOST, "Add to basket", "has-text", 40)
+    cache.save()
+
+    reloaded = SelectorCache(path=path)
+    ordered, learned = reloaded.order(HOST, "Add to basket", CANDIDATES)
+    assert names(ordered)[0] == "has-text"
+    assert learned
+
+
+def test_unreadable_cache_starts_empty(tmp_path):
+    path = tmp_path / "selectors.json"
+    path.write_text("{not json")
+    cache = SelectorCache(path=path)
+    assert cache.order(HOST, "#buy", click_selector_candidates("#buy")) == (
+        click_selector_candidates("#buy"), False)